@@ -0,0 +1,85 @@
+"""
+Generates the test classes of a synthetic tree of drawio models with the static single sweep CodeGenerator.build
+and the former loop generating and expanding the steps of every orphan model.
+
+    python -m benchmarks.code_generator_benchmark [models] [workers]
+"""
+import os
+import sys
+import shutil
+import tempfile
+from time import perf_counter
+
+from uiautomationtools.models.code_generator import CodeGenerator
+from uiautomationtools.models.model_conversion import generate_steps, step_expander, clear_import_cache
+from uiautomationtools.models.project_index import get_index
+
+
+def legacy_build(code):
+    def compare(e):
+        return len(e.split(os.sep))
+
+    models = sorted(code.get_orphan_test_cases(), key=compare, reverse=True)
+    created_files = []
+    while len(models) > 0:
+        test_classes = {}
+        steps = generate_steps(model_name=models[0].split(os.sep)[-1], new_steps=True, app_dir=code.app)
+        steps = step_expander(steps, app_dir=code.app)
+        for step in steps:
+            methods = test_classes.setdefault(step['modelName'], set())
+            if step['name'].startswith('e_') or step['name'].startswith('v_'):
+                methods.add(step['name'])
+        for model, methods in test_classes.items():
+            created_files += [f for f in code.create_test_class_file(model, methods) if f is not None]
+        models = sorted(code.get_orphan_test_cases(), key=compare, reverse=True)
+    return created_files
+
+
+def drawio(names):
+    cells = ['<mxCell id="0"/><mxCell id="1" parent="0"/><mxCell id="s" value="Start" parent="1" vertex="1"/>']
+    source = 's'
+    for i, (edge, vertex) in enumerate(zip(names[::2], names[1::2])):
+        cells.append(f'<mxCell id="v{i}" value="{vertex}" parent="1" vertex="1"/>'
+                     f'<mxCell id="e{i}" parent="1" source="{source}" target="v{i}" edge="1"/>'
+                     f'<mxCell id="l{i}" value="{edge}" parent="e{i}" vertex="1"/>')
+        source = f'v{i}'
+    return f'<mxfile><diagram id="d"><mxGraphModel><root>{"".join(cells)}</root></mxGraphModel></diagram></mxfile>'
+
+
+def synthetic_project(root, models):
+    models_dir = f'{root}/tests/app/models'
+    os.makedirs(models_dir)
+    open(f'{root}/Pipfile', 'w').close()
+    for m in range(models):
+        names = [f'i_model_{m - 1}', f'iv_model_{m - 1}'] if m % 4 else []
+        for i in range(20):
+            names += [f'e_step_{m}_{i}', f'v_step_{m}_{i}']
+        with open(f'{models_dir}/test_model_{m}.drawio', 'w') as f:
+            f.write(drawio(names))
+
+
+def timed(build, models):
+    root = tempfile.mkdtemp()
+    cwd = os.getcwd()
+    try:
+        synthetic_project(root, models)
+        os.chdir(root)
+        clear_import_cache()
+        get_index(root)
+        start = perf_counter()
+        created_files = build(CodeGenerator('app'))
+        return perf_counter() - start, len(created_files)
+    finally:
+        os.chdir(cwd)
+        shutil.rmtree(root)
+
+
+def main(models=200, workers=4):
+    for name, build in (('legacy loop', legacy_build), ('static sweep', lambda code: code.build()),
+                        (f'static sweep, {workers} workers', lambda code: code.build(workers))):
+        elapsed, created = timed(build, models)
+        print(f'{name:>24}: {elapsed * 1000:9.1f} ms ({created} files, {models} models)')
+
+
+if __name__ == '__main__':
+    main(*[int(a) for a in sys.argv[1:3]])
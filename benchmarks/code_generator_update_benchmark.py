@@ -0,0 +1,54 @@
+"""
+Finds and appends the methods missing from the test classes of a synthetic tree, cold (every module parsed) and warm
+(parsed modules and models cached by mtime/content hash).
+
+    python -m benchmarks.code_generator_update_benchmark [classes]
+"""
+import os
+import sys
+import shutil
+import tempfile
+from time import perf_counter
+
+from uiautomationtools.models.code_generator import CodeGenerator
+from uiautomationtools.models.project_index import get_index
+from benchmarks.code_generator_benchmark import drawio
+
+
+def synthetic_project(root, classes):
+    models_dir = f'{root}/tests/app/models'
+    os.makedirs(models_dir)
+    open(f'{root}/Pipfile', 'w').close()
+    for m in range(classes):
+        names = [name for i in range(10) for name in (f'e_step_{m}_{i}', f'v_step_{m}_{i}')]
+        with open(f'{models_dir}/test_model_{m}.drawio', 'w') as f:
+            f.write(drawio(names))
+
+
+def main(classes=2000):
+    root = tempfile.mkdtemp()
+    cwd = os.getcwd()
+    try:
+        synthetic_project(root, classes)
+        os.chdir(root)
+        get_index(root)
+        CodeGenerator('app').build()
+        for m in range(0, classes, 10):
+            with open(f'{root}/tests/app/models/test_model_{m}.drawio', 'w') as f:
+                f.write(drawio([f'e_step_{m}_0', f'v_step_{m}_0', f'e_new_{m}', f'v_new_{m}']))
+
+        for name, dry_run in (('cold dry run', True), ('warm dry run', True), ('update', False),
+                              ('up to date', True)):
+            start = perf_counter()
+            missing = CodeGenerator('app').add_missing_methods(dry_run)
+            elapsed = perf_counter() - start
+            methods = sum(len(m) for c in missing.values() for m in c.values())
+            print(f'{name:>12}: {elapsed * 1000:9.1f} ms ({methods} methods missing in {len(missing)} of '
+                  f'{classes} classes)')
+    finally:
+        os.chdir(cwd)
+        shutil.rmtree(root)
+
+
+if __name__ == '__main__':
+    main(*[int(a) for a in sys.argv[1:2]])
@@ -0,0 +1,65 @@
+"""
+Measures comparing references of up to 100k flattened keys: the set based async_compare_dictionaries against the
+former per key comparison with list scans (run sequentially - without the pypeln/asyncio fan-out it used, so its
+times are a lower bound). The former comparison is only run up to 10k keys.
+
+    python -m benchmarks.compare_dictionaries_benchmark [max_keys]
+"""
+import sys
+from time import perf_counter
+
+from uiautomationtools.helpers.dictionary_helpers import flatten, async_compare_dictionaries
+
+
+def legacy_compare_dictionaries(d1, d2, skipped_keys=None, normalize=False):
+    flat_d1 = flatten(d1)
+    flat_d2 = flatten(d2)
+    skipped_keys = skipped_keys or []
+    thin_keys = list(dict.fromkeys(list(flat_d1.keys()) + list(flat_d2.keys())))
+    if skipped_keys:
+        skipped_keys += [k for k in thin_keys if any(sk for sk in skipped_keys if sk in k)]
+
+    f1_not_in_f2 = [k for k in flat_d1.keys() if k not in skipped_keys and k not in flat_d2.keys()]
+    f2_not_in_f1 = [k for k in flat_d2.keys() if k not in skipped_keys and k not in flat_d1.keys()]
+    mismatched_keys = f1_not_in_f2 + f2_not_in_f1
+    mismatched_values = [{'key': k, 'd1': v, 'd2': flat_d2[k]} for k, v in flat_d1.items()
+                         if k not in mismatched_keys + skipped_keys and v != flat_d2[k]]
+    return mismatched_keys, mismatched_values
+
+
+def legacy_async_compare_dictionaries(d1, d2, skipped_keys=None):
+    values = []
+    for k in set(d1).intersection(set(d2)):
+        values += legacy_compare_dictionaries({k: d1[k]}, {k: d2[k]}, skipped_keys)[1]
+    return values
+
+
+def references(contexts, seed):
+    return {f'context_{c}': [{'id': f'context_{c}', 'class': f'item item-{c % 7}', 'tag': 'div',
+                              'text': f'Item {c} {seed if c % 50 == 0 else 0}', 'bounds': f'{c},{seed}'},
+                             {'tag': 'span', 'text': f'{c}'}]
+            for c in range(contexts)}
+
+
+def main(max_keys=100000):
+    keys = 1000
+    while keys <= max_keys:
+        contexts = keys // 7
+        d1, d2 = references(contexts, 1), references(contexts, 2)
+        flat_keys = len(flatten(d1))
+
+        start = perf_counter()
+        mismatches = async_compare_dictionaries(d1, d2, ['write_time', 'reference_name', 'bounds'])
+        set_based = perf_counter() - start
+        line = f'{flat_keys:>7} keys: set based {set_based * 1000:8.1f} ms ({len(mismatches["values"])} values)'
+        if keys <= 10000:
+            start = perf_counter()
+            legacy_async_compare_dictionaries(d1, d2, ['write_time', 'reference_name', 'bounds'])
+            legacy = perf_counter() - start
+            line += f', list scans {legacy * 1000:9.1f} ms ({legacy / set_based:.0f}x)'
+        print(line)
+        keys *= 10
+
+
+if __name__ == '__main__':
+    main(*[int(a) for a in sys.argv[1:2]])
@@ -0,0 +1,91 @@
+"""
+Decodes a synthetic drawio diagram with the streaming decoder and the former
+copy + ElementTree + BeautifulSoup implementation.
+
+    python -m benchmarks.drawio_decoder_benchmark [cells] [pages]
+"""
+import os
+import re
+import sys
+import zlib
+import base64
+import tempfile
+from time import perf_counter
+from shutil import copyfile
+from urllib.parse import quote, unquote
+from xml.sax.saxutils import quoteattr
+import xml.etree.ElementTree as ET
+
+from uiautomationtools.models.drawio_decoder import decode_drawio
+
+
+def legacy_find_drawio_xml_nodes(model_name):
+    from bs4 import BeautifulSoup
+
+    def clean_values(n):
+        value = n.get('value')
+        if not value:
+            return n
+        step_name = re.findall(r'[evi]+(?:_[a-z0-9]+)+', value) or [value]
+        step_name = step_name[0]
+        actions = value.replace(step_name, '')
+        if '=' in actions:
+            text = BeautifulSoup(actions, 'lxml').text.strip()
+            actions = f'|{text[1:].strip()}'
+        n['value'] = f'{step_name}{actions}'
+        return n
+
+    xml_file = f'{model_name}.xml'
+    copyfile(model_name, xml_file)
+    tree = ET.parse(xml_file)
+    data = list(tree.getroot())[0].text
+    os.remove(xml_file)
+    xml = zlib.decompress(base64.b64decode(data), -15)
+    xml = unquote(xml.decode('utf-8'))
+    bs = BeautifulSoup(xml, 'lxml')
+    return {n.attrs['id']: clean_values(n.attrs) for n in bs.find_all('mxcell')}
+
+
+def synthetic_page(cells, page=0):
+    rows = ['<mxGraphModel><root><mxCell id="0"/><mxCell id="1" parent="0"/>']
+    vertices = cells // 3
+    rows.append(f'<mxCell id="p{page}-s" value="Start" parent="1" vertex="1"/>')
+    for i in range(vertices):
+        rows.append(f'<mxCell id="p{page}-v{i}" value={quoteattr(f"<b>v_step_{i}</b>")} parent="1" vertex="1">'
+                    f'<mxGeometry x="{i}" y="0" width="80" height="40" as="geometry"/></mxCell>')
+    for i in range((cells - vertices - 1) // 2):
+        source = f'p{page}-s' if i == 0 else f'p{page}-v{(i - 1) % vertices}'
+        target = f'p{page}-v{i % vertices}'
+        rows.append(f'<mxCell id="p{page}-e{i}" parent="1" source="{source}" target="{target}" edge="1"/>')
+        label = f'e_step_{i}<div>|user=&quot;name {i}&quot;;</div>'
+        rows.append(f'<mxCell id="p{page}-l{i}" value={quoteattr(label)} parent="p{page}-e{i}" vertex="1"/>')
+    rows.append('</root></mxGraphModel>')
+    xml = quote(''.join(rows), safe='')
+    compressor = zlib.compressobj(9, zlib.DEFLATED, -15)
+    return base64.b64encode(compressor.compress(xml.encode()) + compressor.flush()).decode()
+
+
+def main(cells=10000, pages=1):
+    directory = tempfile.mkdtemp()
+    path = os.path.join(directory, 'test_synthetic.drawio')
+    diagrams = ''.join(f'<diagram id="d{p}" name="Page-{p}">{synthetic_page(cells // pages, p)}</diagram>'
+                       for p in range(pages))
+    with open(path, 'w') as f:
+        f.write(f'<mxfile host="benchmark">{diagrams}</mxfile>')
+
+    start = perf_counter()
+    nodes = decode_drawio(path)
+    print(f'streaming: {(perf_counter() - start) * 1000:10.2f} ms ({len(nodes)} cells, {pages} pages)')
+
+    try:
+        start = perf_counter()
+        legacy = legacy_find_drawio_xml_nodes(path)
+        print(f'legacy:    {(perf_counter() - start) * 1000:10.2f} ms (first page only, {len(legacy)} cells)')
+        if pages == 1:
+            print(f'identical: {legacy == nodes}')
+    except ImportError:
+        print('legacy:    bs4/lxml not installed - skipped')
+
+
+if __name__ == '__main__':
+    main(*[int(a) for a in sys.argv[1:3]])
@@ -0,0 +1,71 @@
+"""
+Compares prune_steps(step_expander(...)) against the fused expand_pruned_steps on a heavily modular model whose
+repeated imports are pruned by the decision_map.
+
+    python -m benchmarks.expand_pruned_steps_benchmark [imports]
+"""
+import os
+import sys
+import shutil
+import tempfile
+import tracemalloc
+from time import perf_counter
+
+import uiautomationtools.models.model_conversion as mc
+
+
+def synthetic_project(root, imports):
+    models_dir = f'{root}/tests/app/models'
+    os.makedirs(models_dir)
+    open(f'{root}/Pipfile', 'w').close()
+    for m in range(10):
+        lines = ['Start:']
+        if m:
+            lines += [f'i_module_{m - 1} / depth="{m}";', f'iv_module_{m - 1}']
+        for i in range(10):
+            lines += [f'e_step_{m}_{i} / host="example{m}.com"; retries="{i}";', f'v_step_{m}_{i}']
+        with open(f'{models_dir}/test_module_{m}.txt', 'w') as f:
+            f.write('\n'.join(lines))
+    lines = ['Start:']
+    for i in range(imports):
+        lines += [f'i_module_{i % 10} / user="user_{i}";', f'iv_module_{i % 10}', f'e_check_{i % 3}', 'v_checked']
+    with open(f'{models_dir}/test_suite.txt', 'w') as f:
+        f.write('\n'.join(lines))
+
+
+def measure(function, steps, decision_map):
+    mc.clear_import_cache()
+    for m in range(10):
+        mc.get_import_steps(f'i_module_{m}', 'app')
+    tracemalloc.start()
+    start = perf_counter()
+    pruned = function(steps, decision_map)
+    elapsed = perf_counter() - start
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return pruned, peak, elapsed
+
+
+def main(imports=2000):
+    root = tempfile.mkdtemp()
+    cwd = os.getcwd()
+    try:
+        synthetic_project(root, imports)
+        os.chdir(root)
+        steps = mc.generate_steps('test_suite', True, app_dir='app')
+        decision_map = {f'i_module_{m}': 0 for m in range(10)}
+
+        expected, peak, elapsed = measure(
+            lambda s, d: mc.prune_steps(mc.step_expander(s, app_dir='app'), d), steps, decision_map)
+        print(f'expand then prune: {peak / 2 ** 20:7.1f} MiB peak {elapsed * 1000:8.1f} ms ({len(expected)} steps)')
+        pruned, peak, elapsed = measure(
+            lambda s, d: mc.expand_pruned_steps(s, d, app_dir='app'), steps, decision_map)
+        print(f'fused:             {peak / 2 ** 20:7.1f} MiB peak {elapsed * 1000:8.1f} ms')
+        assert expected == pruned
+    finally:
+        os.chdir(cwd)
+        shutil.rmtree(root)
+
+
+if __name__ == '__main__':
+    main(*[int(a) for a in sys.argv[1:2]])
@@ -0,0 +1,155 @@
+"""
+Measures building the references of large pages from the page source (the inner html of the divs get_page_source
+picks, parsed in python) against building them from the elements returned by html_helpers.ELEMENTS_SCRIPT: the size
+of the payloads returned by the browser and the python time. Without a browser the payloads of the generated pages
+are emulated, with --browser they are returned by a headless selenium browser (selenium and the driver required)
+and the round trips are measured too. The references must be identical.
+
+    python -m benchmarks.in_browser_references_benchmark [--browser chrome|firefox] [page.html ...]
+"""
+import os
+import re
+import sys
+import json
+import tempfile
+from html import escape
+from html.parser import HTMLParser
+from time import perf_counter
+
+from uiautomationtools.helpers.html_helpers import ELEMENTS_SCRIPT, EMPTY_ELEMENT_TAGS, build_references, \
+    build_element_references, script_elements
+from uiautomationtools.helpers.list_helpers import encompassing_indexes
+from benchmarks.reference_builder_benchmark import generated_page
+
+SOURCE_SCRIPT = ("return Array.from(document.querySelectorAll('div')).filter(e => e.getAttribute('class') && "
+                 "e.innerText).map(e => [e.innerText, e.innerHTML]);")
+BLOCK_TAGS = ('div', 'p', 'li')
+
+
+class TreeParser(HTMLParser):
+    """
+    This emulates the dom of a well formed generated page.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self.root = {'tag': '', 'attrs': [], 'children': []}
+        self.stack = [self.root]
+
+    def handle_starttag(self, tag, attrs):
+        element = {'tag': tag, 'attrs': [[k, v or ''] for k, v in attrs], 'children': []}
+        self.stack[-1]['children'].append(element)
+        if tag not in EMPTY_ELEMENT_TAGS:
+            self.stack.append(element)
+
+    def handle_endtag(self, tag):
+        if self.stack[-1]['tag'] == tag:
+            self.stack.pop()
+
+    def handle_data(self, data):
+        self.stack[-1]['children'].append(data)
+
+
+def emulated_payloads(html):
+    parser = TreeParser()
+    parser.feed(html)
+    sources, records, divs = [], [], []
+
+    def walk(node):
+        inner_html, inner_text, text = [], [], []
+        for child in node['children']:
+            if isinstance(child, str):
+                inner_html.append(escape(child, quote=False))
+                inner_text.append(child)
+                text.append(child)
+                continue
+            index = len(records)
+            records.append([child['tag'], [v for attr in child['attrs'] for v in attr], ''])
+            child_html, child_inner_text, child_text = walk(child)
+            records[index][2] = child_text
+            if child['tag'] == 'div' and dict(child['attrs']).get('class') and child_inner_text:
+                divs.append((index, [child_inner_text, child_html], [index + 1, len(records)]))
+            attrs = ''.join(f' {k}="{escape(v)}"' for k, v in child['attrs'])
+            end = '' if child['tag'] in EMPTY_ELEMENT_TAGS else f"{child_html}</{child['tag']}>"
+            inner_html.append(f"<{child['tag']}{attrs}>{end}")
+            inner_text.append(child_inner_text + ('\n' if child['tag'] in BLOCK_TAGS else ''))
+            text.append(child_text)
+        return ''.join(inner_html), ''.join(inner_text), ''.join(text)
+
+    walk(parser.root)
+    divs.sort()
+    lines = {}
+    texts = [[lines.setdefault(t, len(lines)) for t in (t.strip() for t in re.split(r'\n+', source[0])) if t]
+             for _, source, _ in divs]
+    page = {'lines': list(lines), 'texts': texts, 'ranges': [r for _, _, r in divs], 'elements': records}
+    return json.dumps([source for _, source, _ in divs]), json.dumps(page)
+
+
+def browser_payloads(driver, html):
+    with tempfile.NamedTemporaryFile('w', suffix='.html', delete=False, encoding='utf-8') as f:
+        f.write(f'<html><body>{html}</body></html>')
+    try:
+        driver.get(f'file://{f.name}')
+        start = perf_counter()
+        sources = json.dumps(driver.execute_script(SOURCE_SCRIPT))
+        source_trip = perf_counter() - start
+        start = perf_counter()
+        page = json.dumps(driver.execute_script(ELEMENTS_SCRIPT, 'div', 'class'))
+        script_trip = perf_counter() - start
+    finally:
+        os.remove(f.name)
+    return sources, page, source_trip, script_trip
+
+
+def source_references(payload):
+    elements = [[[t.strip() for t in re.split(r'\n+', e[0]) if t.strip()], e[1]] for e in json.loads(payload)]
+    elements = [e for e in elements if e[0]]
+    indexes = encompassing_indexes([e[0] for e in elements])
+    return build_references(''.join(elements[i][1] for i in indexes), skipped_tags=['script', 'style'])
+
+
+def script_references(payload):
+    return build_element_references(script_elements(json.loads(payload)), skipped_tags=['script', 'style'])
+
+
+def browser(name):
+    from selenium import webdriver
+    if name == 'firefox':
+        options = webdriver.FirefoxOptions()
+        options.add_argument('-headless')
+        return webdriver.Firefox(options=options)
+    options = webdriver.ChromeOptions()
+    options.add_argument('--headless')
+    return webdriver.Chrome(options=options)
+
+
+def main(args):
+    driver = None
+    if args[:1] == ['--browser']:
+        driver, args = browser(args[1]), args[2:]
+    pages = [(path, open(path, encoding='utf-8').read()) for path in args]
+    pages = pages or [(f'{nodes} nodes, depth {depth}', generated_page(nodes, depth))
+                      for nodes, depth in ((15000, 8), (15000, 30))]
+    try:
+        for name, html in pages:
+            trips = ''
+            if driver:
+                sources, page, source_trip, script_trip = browser_payloads(driver, html)
+                trips = f', round trip {source_trip * 1000:7.1f} ms vs {script_trip * 1000:7.1f} ms'
+            else:
+                sources, page = emulated_payloads(html)
+
+            start = perf_counter()
+            expected = source_references(sources)
+            source = perf_counter() - start
+            start = perf_counter()
+            references = script_references(page)
+            script = perf_counter() - start
+            print(f'{name}: payload {len(sources) / 1024:8.0f} kB vs {len(page) / 1024:6.0f} kB, python '
+                  f'{source * 1000:7.1f} ms vs {script * 1000:6.1f} ms{trips}, identical: {expected == references}')
+    finally:
+        driver and driver.quit()
+
+
+if __name__ == '__main__':
+    main(sys.argv[1:])
@@ -0,0 +1,64 @@
+"""
+Measures validating references against an almost identical baseline of up to 100k flattened keys: the full
+async_compare_dictionaries against merkle_compare_dictionaries with the tree of the baseline stored (unchanged, 1 and
+10 changed contexts): checking the stored tree (sha1 of the baseline json), hashing the current references and
+comparing the trees.
+
+    python -m benchmarks.merkle_compare_benchmark [max_keys]
+"""
+import sys
+import json
+import hashlib
+from time import perf_counter
+
+from uiautomationtools.helpers.dictionary_helpers import flatten, async_compare_dictionaries, \
+    merkle_compare_dictionaries, merkle_tree
+
+SKIPPED_KEYS = ['write_time', 'reference_name', 'bounds']
+
+
+def references(contexts, changed=0):
+    refs = {f'context_{c}': [{'id': f'context_{c}', 'class': f'item item-{c % 7}', 'tag': 'div',
+                              'text': f'Item {c} {"changed" if c < changed else ""}'},
+                             {'tag': 'span', 'text': f'{c}'}]
+            for c in range(contexts)}
+    refs['write_time'] = f'2021-01-01_00:00:{changed:02}'
+    return refs
+
+
+def values(mismatches):
+    return sorted(mismatches.get('values', []), key=lambda v: v['key'])
+
+
+def timed(function, *args):
+    start = perf_counter()
+    result = function(*args)
+    return result, (perf_counter() - start) * 1000
+
+
+def main(max_keys=100000):
+    keys = 1000
+    while keys <= max_keys:
+        contexts = keys // 6
+        baseline = references(contexts)
+        raw = json.dumps(baseline, indent=4, ensure_ascii=False).encode('utf-8')
+        tree, hashing = timed(merkle_tree, baseline, ['write_time'])
+        _, digest = timed(lambda: hashlib.sha1(raw).hexdigest())
+        print(f'{len(flatten(baseline)):>7} keys: hashing the references {hashing:7.1f} ms, '
+              f'checking a stored tree {digest:5.2f} ms')
+        for changed in (0, 1, 10):
+            current = references(contexts, changed)
+            full, full_ms = timed(async_compare_dictionaries, baseline, references(contexts, changed), SKIPPED_KEYS)
+            merkle, merkle_ms = timed(lambda: merkle_compare_dictionaries(
+                baseline, current, SKIPPED_KEYS, False, ['write_time'], hashlib.sha1(raw).hexdigest() and tree))
+            current_tree = merkle_tree(current, ['write_time'])
+            _, trees_ms = timed(merkle_compare_dictionaries, baseline, current, SKIPPED_KEYS, False, ['write_time'],
+                                tree, current_tree)
+            assert values(full) == values(merkle)
+            print(f'    {changed:>2} changed: full {full_ms:8.1f} ms, merkle {merkle_ms:6.2f} ms '
+                  f'({full_ms / merkle_ms:.0f}x, {len(merkle.get("values", []))} values), '
+                  f'trees compared {trees_ms:6.2f} ms')
+        keys *= 10
+
+if __name__ == '__main__':
+    main(*[int(a) for a in sys.argv[1:2]])
@@ -0,0 +1,56 @@
+"""
+Measures analyzing a tests tree of branching drawio models: the first run (every diagram decoded) against the
+runs of the following collections (only the unchanged files are checked).
+
+    python -m benchmarks.model_analyzer_benchmark [models] [vertices]
+"""
+import os
+import sys
+import shutil
+import tempfile
+from time import perf_counter
+
+import uiautomationtools.models.model_analyzer as ma
+
+
+def branching_drawio(size, imported=None):
+    cells = ['<mxCell id="0"/><mxCell id="1" parent="0"/><mxCell id="s" value="Start" parent="1" vertex="1"/>']
+    first = f'i_{imported[5:]}' if imported else 'e_start'
+    cells.append(f'<mxCell id="v0" value="v_step_0" parent="1" vertex="1"/>'
+                 f'<mxCell id="e0" parent="1" source="s" target="v0" edge="1"/>'
+                 f'<mxCell id="l0" value="{first}" parent="e0" vertex="1"/>')
+    for i in range(1, size):
+        cells.append(f'<mxCell id="v{i}" value="v_step_{i}" parent="1" vertex="1"/>')
+        for j, source in enumerate((i - 1, i // 2)):
+            cells.append(f'<mxCell id="e{i}_{j}" parent="1" source="v{source}" target="v{i}" edge="1"/>'
+                         f'<mxCell id="l{i}_{j}" value="e_step_{i}_{j}" parent="e{i}_{j}" vertex="1"/>')
+    cells.append(f'<mxCell id="back" parent="1" source="v{size - 1}" target="v0" edge="1"/>'
+                 f'<mxCell id="lb" value="e_back" parent="back" vertex="1"/>')
+    return f'<mxfile><diagram id="d"><mxGraphModel><root>{"".join(cells)}</root></mxGraphModel></diagram></mxfile>'
+
+
+def main(models=200, vertices=100):
+    root = tempfile.mkdtemp()
+    cwd = os.getcwd()
+    try:
+        models_dir = f'{root}/tests/app/models'
+        os.makedirs(models_dir)
+        open(f'{root}/Pipfile', 'w').close()
+        for m in range(models):
+            with open(f'{models_dir}/test_model_{m}.drawio', 'w') as f:
+                f.write(branching_drawio(vertices, f'test_model_{m - 1}' if m else None))
+        os.chdir(root)
+
+        for run in ('first run', 'collection'):
+            start = perf_counter()
+            diagnostics = ma.analyze_project(root)
+            elapsed = perf_counter() - start
+            print(f'{run:>10}: {models} models of {vertices} vertices in {elapsed * 1000:8.1f} ms '
+                  f'({elapsed / models * 1000:.3f} ms per model, {len(diagnostics)} diagnostics)')
+    finally:
+        os.chdir(cwd)
+        shutil.rmtree(root)
+
+
+if __name__ == '__main__':
+    main(*[int(a) for a in sys.argv[1:3]])
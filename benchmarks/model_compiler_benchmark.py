@@ -0,0 +1,67 @@
+"""
+Compiles a synthetic tree of models, then edits one leaf model and recompiles only it and its dependents.
+
+    python -m benchmarks.model_compiler_benchmark [models] [workers]
+"""
+import os
+import sys
+import random
+import shutil
+import tempfile
+from time import perf_counter
+from contextlib import redirect_stdout
+
+from uiautomationtools.models.model_compiler import precompile, recompile
+from uiautomationtools.models.project_index import get_index
+
+
+def synthetic_tree(root, size, seed=0):
+    """Models import up to 2 models of higher numbers so the last ones are the shared leaves."""
+    rng = random.Random(seed)
+    models_dir = f'{root}/tests/app/models'
+    os.makedirs(models_dir)
+    open(f'{root}/Pipfile', 'w').close()
+    for i in range(size):
+        lines = ['Start:', f'e_open_{i}', f'v_open_{i}']
+        candidates = range(i + 1, min(size, i + 40))
+        for j in rng.sample(candidates, min(2, len(candidates))) if rng.random() < 0.3 else []:
+            lines += [f'i_model_{j}', f'iv_model_{j}']
+        with open(f'{models_dir}/test_model_{i}.txt', 'w') as f:
+            f.write('\n'.join(lines + [f'e_close_{i}', f'v_close_{i}', '']))
+    return models_dir
+
+
+def main(size=300, workers=1):
+    root = tempfile.mkdtemp()
+    cwd = os.getcwd()
+    try:
+        models_dir = synthetic_tree(root, size)
+        os.chdir(root)
+        with open(os.devnull, 'w') as devnull, redirect_stdout(devnull):
+            start = perf_counter()
+            compiled = precompile(workers=workers)
+            cold = perf_counter() - start
+
+            start = perf_counter()
+            warm_compiled = precompile(workers=workers)
+            warm = perf_counter() - start
+
+            with open(f'{models_dir}/test_model_{size - 1}.txt', 'a') as f:
+                f.write('e_extra\nv_extra\n')
+            start = perf_counter()
+            index = get_index(root)
+            index.refresh()
+            recompiled = recompile(index.changed_models, workers)
+            incremental = perf_counter() - start
+
+        print(f'cold:        {cold * 1000:10.1f} ms ({len(compiled)} models compiled)')
+        print(f'warm:        {warm * 1000:10.1f} ms ({len(warm_compiled)} models compiled)')
+        print(f'incremental: {incremental * 1000:10.1f} ms ({len(recompiled)} models compiled: '
+              f'{", ".join(sorted(m.split("/")[-1] for m in recompiled))})')
+    finally:
+        os.chdir(cwd)
+        shutil.rmtree(root)
+
+
+if __name__ == '__main__':
+    main(*[int(a) for a in sys.argv[1:3]])
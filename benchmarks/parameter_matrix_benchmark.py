@@ -0,0 +1,64 @@
+"""
+Measures running a model for a matrix of parameter sets: a variant model generated, expanded and pruned per
+parameter set against one compiled step plan the parameter sets are substituted into.
+
+    python -m benchmarks.parameter_matrix_benchmark [parameter_sets] [steps]
+"""
+import os
+import sys
+import shutil
+import tempfile
+from time import perf_counter
+
+import uiautomationtools.models.model_conversion as mc
+
+
+def model_text(steps, user, query):
+    lines = ['Start:', f'i_login / user="{user}";', 'iv_login']
+    for i in range(steps):
+        lines += [f'e_search_{i} / query="{query}"; page={i};', f'v_search_{i}']
+    return '\n'.join(lines) + '\n'
+
+
+def main(parameter_sets=50, steps=1000):
+    root = tempfile.mkdtemp()
+    cwd = os.getcwd()
+    try:
+        models_dir = f'{root}/tests/app/models'
+        os.makedirs(models_dir)
+        open(f'{root}/Pipfile', 'w').close()
+        with open(f'{models_dir}/test_login.txt', 'w') as f:
+            f.write('Start:\ne_open / user="foo";\nv_open\ne_login\nv_login\n')
+        os.chdir(root)
+        matrix = [{'user': f'user{i}', 'query': f'query{i}'} for i in range(parameter_sets)]
+
+        mc.clear_import_cache()
+        start = perf_counter()
+        for i, params in enumerate(matrix):
+            with open(f'{models_dir}/test_search_{i}.txt', 'w') as f:
+                f.write(model_text(steps, params['user'], params['query']))
+            mc.expand_pruned_steps(mc.generate_steps(f'test_search_{i}', True, app_dir='app'), app_dir='app')
+        variants = perf_counter() - start
+
+        mc.clear_import_cache()
+        start = perf_counter()
+        with open(f'{models_dir}/test_search.txt', 'w') as f:
+            f.write(model_text(steps, 'foo', 'shoes'))
+        compiled_steps = mc.expand_pruned_steps(mc.generate_steps('test_search', True, app_dir='app'), app_dir='app')
+        compiled = perf_counter() - start
+        start = perf_counter()
+        for params in matrix:
+            mc.apply_params(compiled_steps, params)
+        substituted = perf_counter() - start
+
+        print(f'{parameter_sets} parameter sets of {len(compiled_steps)} steps')
+        print(f'variant models: {variants * 1000:8.1f} ms, {variants / parameter_sets * 1000:6.2f} ms per set')
+        print(f'one step plan : {(compiled + substituted) * 1000:8.1f} ms, compile {compiled * 1000:.2f} ms + '
+              f'{substituted / parameter_sets * 1000:6.2f} ms per set')
+    finally:
+        os.chdir(cwd)
+        shutil.rmtree(root)
+
+
+if __name__ == '__main__':
+    main(*[int(a) for a in sys.argv[1:3]])
@@ -0,0 +1,60 @@
+"""
+Compares the in process python path generator against the 'altwalker offline' backend.
+
+    python -m benchmarks.path_generator_benchmark [vertices] [repeats]
+"""
+import os
+import sys
+import json
+import random
+import shutil
+import tempfile
+from time import perf_counter
+from subprocess import run
+
+from uiautomationtools.models.path_generator import generate_path
+
+
+def synthetic_model(size, seed=0):
+    rng = random.Random(seed)
+    vertices = [{'id': f'n/{i}', 'name': f'v_{i}'} for i in range(size)]
+    edges = [{'id': 'e/start', 'name': 'e_start', 'targetVertexId': 'n/0'}]
+    for i in range(size):
+        for j in {(i + 1) % size, rng.randrange(size)}:
+            edges.append({'id': f'e/{i}-{j}', 'name': f'e_{i}_{j}',
+                          'sourceVertexId': f'n/{i}', 'targetVertexId': f'n/{j}'})
+    return {'models': [{'name': 'test_synthetic', 'id': '', 'startElementId': 'e/start',
+                        'generator': 'random(edge_coverage(100))', 'vertices': vertices, 'edges': edges}]}
+
+
+def main(size=200, repeats=5):
+    generator = 'random(edge_coverage(100))'
+    models = synthetic_model(size)
+
+    start = perf_counter()
+    for seed in range(repeats):
+        steps = generate_path(models, generator, seed)
+    python_time = (perf_counter() - start) / repeats
+    print(f'python:    {python_time * 1000:10.2f} ms per model ({len(steps)} steps, {size} vertices)')
+
+    if not shutil.which('altwalker'):
+        print('altwalker: not installed - skipped')
+        return
+
+    directory = tempfile.mkdtemp()
+    model_file = os.path.join(directory, 'model.json')
+    steps_file = os.path.join(directory, 'steps.json')
+    with open(model_file, 'w') as f:
+        json.dump(models, f)
+
+    start = perf_counter()
+    for _ in range(repeats):
+        run(f'altwalker offline -m {model_file} "{generator}" -f {steps_file}', shell=True)
+    altwalker_time = (perf_counter() - start) / repeats
+    shutil.rmtree(directory)
+    print(f'altwalker: {altwalker_time * 1000:10.2f} ms per model')
+    print(f'speedup:   {altwalker_time / python_time:10.1f}x')
+
+
+if __name__ == '__main__':
+    main(*[int(a) for a in sys.argv[1:3]])
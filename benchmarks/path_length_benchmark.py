@@ -0,0 +1,33 @@
+"""
+Compares the number of steps of the chinese_postman generator against the random and quick_random generators
+covering every edge of synthetic models.
+
+    python -m benchmarks.path_length_benchmark [max_vertices] [seeds]
+"""
+import sys
+from time import perf_counter
+from statistics import mean
+
+from uiautomationtools.models.path_generator import generate_path
+from benchmarks.path_generator_benchmark import synthetic_model
+
+
+def main(max_vertices=160, seeds=5):
+    size = 10
+    while size <= max_vertices:
+        models = synthetic_model(size)
+        line = f'{size:>5} vertices'
+        random_length = None
+        for name in ('random', 'quick_random', 'chinese_postman'):
+            generator = f'{name}(edge_coverage(100))'
+            start = perf_counter()
+            length = mean(len(generate_path(models, generator, seed)) for seed in range(seeds))
+            elapsed = (perf_counter() - start) / seeds
+            random_length = random_length or length
+            line += f'  {name}: {length:8.0f} steps {length / random_length:5.0%} {elapsed * 1000:7.1f} ms'
+        print(line)
+        size *= 2
+
+
+if __name__ == '__main__':
+    main(*[int(a) for a in sys.argv[1:3]])
@@ -0,0 +1,75 @@
+"""
+Compares the single pass prune_steps against the former numpy implementation as the steps grow.
+
+    python -m benchmarks.prune_steps_benchmark [max_steps] [repeats]
+"""
+import sys
+import random
+from time import perf_counter
+
+from uiautomationtools.models.model_conversion import prune_steps
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+
+def legacy_prune_steps(model_steps, decision_map=None):
+    def flatten(value):
+        return [i for v in value for i in flatten(v)] if isinstance(value, list) else [value]
+
+    default_map = (decision_map or {}).copy()
+    e_v_model_steps = [m for m in model_steps if m['name'][:2] in ['e_', 'v_']]
+    ancestors = [m.get('ancestors', [m['name']])[0] for m in e_v_model_steps]
+    hist = {a: np.where(a == np.array(ancestors))[0] for a in ancestors}
+    indices = {k: np.where(abs(v - np.roll(v, 1)) > 1)[0].tolist() + [len(v)] for k, v in hist.items()}
+    indices = {k: [v[indices[k][i - 1]: indices[k][i]].tolist() for i in range(1, len(indices[k]))] or
+                  [v[:indices[k][0]].tolist()] for k, v in hist.items()}
+    filtered_indices = [v[default_map[k]] if k in default_map else v for k, v in indices.items()]
+    filtered_indices = sorted(flatten(filtered_indices))
+    pruned_steps = [e_v_model_steps[i] for i in filtered_indices]
+    for p in pruned_steps.copy():
+        if 'delete' in p['name'].lower():
+            index = pruned_steps.index(p)
+            pruned_steps.append(pruned_steps.pop(index))
+    return pruned_steps
+
+
+def expanded_steps(size, seed=0):
+    rng = random.Random(seed)
+    imports = [f'i_model_{i}' for i in range(50)]
+    steps = []
+    while len(steps) < size:
+        name = rng.choice(imports)
+        steps.append({'name': name, 'modelName': 'test_root'})
+        for i in range(rng.randint(1, 10)):
+            step = 'e_delete_item' if rng.random() < 0.05 else f'{"ev"[i % 2]}_step_{i}'
+            steps.append({'name': step, 'modelName': f'test_{name[2:]}', 'ancestors': [name]})
+        steps.append({'name': f'e_root_{len(steps)}', 'modelName': 'test_root'})
+    return steps
+
+
+def timed(function, steps, decision_map, repeats):
+    start = perf_counter()
+    for _ in range(repeats):
+        function(steps, decision_map)
+    return (perf_counter() - start) / repeats * 1000
+
+
+def main(max_steps=20000, repeats=3):
+    decision_map = {'i_model_0': 0, 'i_model_1': slice(1, None)}
+    size = 1250
+    while size <= max_steps:
+        steps = expanded_steps(size)
+        line = f'{size:>7} steps  single pass: {timed(prune_steps, steps, decision_map, repeats):9.2f} ms'
+        if np is not None:
+            line += f'  numpy: {timed(legacy_prune_steps, steps, decision_map, repeats):9.2f} ms'
+        print(line)
+        size *= 2
+    if np is None:
+        print('numpy: not installed - legacy implementation skipped')
+
+
+if __name__ == '__main__':
+    main(*[int(a) for a in sys.argv[1:3]])
@@ -0,0 +1,101 @@
+"""
+Measures building the references of large pages: the single pass html_helpers.build_references against the
+BeautifulSoup descendants walk it replaces (when bs4 is installed) - the references must be identical.
+Pass captured html files to use them instead of the generated pages.
+
+    python -m benchmarks.reference_builder_benchmark [page.html ...]
+"""
+import re
+import sys
+import json
+import random
+from time import perf_counter
+
+from uiautomationtools.helpers.html_helpers import build_references
+
+
+def soup_references(html, skipped_tags=None):
+    from bs4 import BeautifulSoup
+    skipped_tags = skipped_tags or []
+    references = {}
+    for d in BeautifulSoup(html, 'html.parser').descendants:
+        if 'Tag' not in str(type(d)):
+            continue
+        attrs = {k: v for k, v in d.attrs.items() if v}
+        attr_class = attrs.get('class')
+        if attr_class:
+            attrs['class'] = ' '.join(attr_class)
+        text = getattr(d, 'text', '')
+        text = re.sub(r'\n+', '', text)
+        if text:
+            attrs['text'] = text
+        if d.name:
+            attrs['tag'] = d.name
+        context = attrs.get('id') or attrs.get('name') or attrs.get('placeholder') or attrs.get('text') or 'no_key'
+        context = re.sub(r'(\W|_)+', '_', context.lower())
+        global_tags = f"{attrs.get('tag')},{attrs.get('class')},{context}"
+        if skipped_tags and any(t in global_tags for t in skipped_tags):
+            continue
+        if not references.get(context):
+            references[context] = [attrs]
+        elif attrs not in references[context]:
+            references[context].append(attrs)
+    return references
+
+
+def generated_page(nodes, depth, seed=1):
+    rng = random.Random(seed)
+    parts = []
+    count = 0
+
+    def section(level):
+        nonlocal count
+        while count < nodes:
+            count += 1
+            if level < depth and rng.random() < 0.3:
+                parts.append(f'<div class="level{level} box" id="section-{count}">')
+                section(level + 1)
+                parts.append('</div>')
+                if rng.random() < 0.5:
+                    return
+            else:
+                tag = rng.choice(['span', 'a', 'li', 'button', 'p'])
+                parts.append(f'<{tag} class="item item-{count % 7}">Item {count % 50} &amp; more\n</{tag}>')
+                if rng.random() < 0.1:
+                    parts.append(f'<input name="field{count % 30}" placeholder="Type here">')
+                if rng.random() < 0.2:
+                    return
+
+    parts.append('<div id="page">')
+    while count < nodes:
+        section(1)
+    parts.append('</div>')
+    return ''.join(parts)
+
+
+def main(paths=None):
+    pages = [(path, open(path, encoding='utf-8').read()) for path in paths or []]
+    pages = pages or [(f'{nodes} nodes, depth {depth}', generated_page(nodes, depth))
+                      for nodes, depth in ((15000, 8), (15000, 30))]
+    try:
+        import bs4
+    except ImportError:
+        bs4 = None
+        print('bs4 is not installed - only the single pass builder is measured.')
+
+    for name, html in pages:
+        start = perf_counter()
+        references = build_references(html, skipped_tags=['script', 'style'])
+        single_pass = perf_counter() - start
+        line = f'{name}: single pass {single_pass * 1000:8.1f} ms'
+        if bs4:
+            start = perf_counter()
+            expected = soup_references(html, skipped_tags=['script', 'style'])
+            soup = perf_counter() - start
+            identical = json.dumps(expected) == json.dumps(references)
+            line += f', BeautifulSoup {soup * 1000:8.1f} ms ({soup / single_pass:.1f}x), identical: {identical}'
+        print(line)
+
+
+if __name__ == '__main__':
+    main(sys.argv[1:])
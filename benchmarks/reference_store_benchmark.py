@@ -0,0 +1,72 @@
+"""
+Measures looking up and loading baselines among thousands of pages: the json layout (a recursive glob of
+validations/<app>/<platform>, find_reference_in_list then load_json of the pretty printed file, as every build and
+validation did before the project index) against the sqlite reference store read cold (decompressing the page) and
+hot (from its cache). The size of the json files and of the store is reported too.
+
+    python -m benchmarks.reference_store_benchmark [pages]
+"""
+import os
+import sys
+import random
+import shutil
+import tempfile
+from glob import iglob
+from time import perf_counter
+
+import uiautomationtools.helpers.directory_helpers as dir_helpers
+from uiautomationtools.validations.reference_store import ReferenceStore
+
+
+def page(number, contexts=150):
+    return {f'context_{c}': [{'id': f'context_{c}', 'class': f'item item-{c % 7}', 'tag': 'div',
+                              'text': f'Page {number} item {c}'}] for c in range(contexts)}
+
+
+def main(pages=2000, lookups=200):
+    directory = tempfile.mkdtemp()
+    json_directory = os.path.join(directory, 'chrome')
+    for number in range(pages):
+        path = os.path.join(json_directory, f'feature_{number % 20}', f'page_{number}.json')
+        dir_helpers.make_json(page(number), path)
+    store = ReferenceStore(os.path.join(directory, 'references.db'), cache_size=lookups)
+    start = perf_counter()
+    store.import_json(json_directory)
+    imported = perf_counter() - start
+    store.connection.execute('PRAGMA wal_checkpoint(TRUNCATE)')
+    store_size = os.path.getsize(store.path)
+    json_size = sum(os.path.getsize(p) for p in iglob(f'{json_directory}/**/*.json', recursive=True))
+    print(f'{pages} pages: json {json_size / 2 ** 20:.1f} MB, store {store_size / 2 ** 20:.1f} MB, '
+          f'imported in {imported:.2f} s')
+
+    names = [f'page_{n}' for n in random.Random(1).sample(range(pages), lookups)]
+    start = perf_counter()
+    for name in names:
+        paths = list(iglob(f'{json_directory}/**/*.json', recursive=True))
+        dir_helpers.load_json(dir_helpers.find_reference_in_list(f'{name}.json', paths))
+    rescans = perf_counter() - start
+
+    start = perf_counter()
+    for name in names:
+        dir_helpers.load_json(os.path.join(json_directory, f'feature_{int(name[5:]) % 20}', f'{name}.json'))
+    json_files = perf_counter() - start
+
+    store = ReferenceStore(store.path, cache_size=lookups)
+    start = perf_counter()
+    for name in names:
+        store.get(name)
+    cold = perf_counter() - start
+    start = perf_counter()
+    for name in names:
+        store.get(name)
+    hot = perf_counter() - start
+
+    store.close()
+    shutil.rmtree(directory)
+    per_lookup = 1000 / lookups
+    print(f'per lookup: rescan + list + json {rescans * per_lookup:7.2f} ms, json file only '
+          f'{json_files * per_lookup:5.2f} ms, store cold {cold * per_lookup:5.2f} ms, hot {hot * per_lookup:5.3f} ms')
+
+
+if __name__ == '__main__':
+    main(*[int(a) for a in sys.argv[1:2]])
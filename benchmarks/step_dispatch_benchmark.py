@@ -0,0 +1,112 @@
+"""
+Measures the per step dispatch overhead of PytestHelper.test_run_steps on a 10k steps model: the former
+eval/import/__dict__ lookups per step against the methods resolved once before the run.
+
+    python -m benchmarks.step_dispatch_benchmark [steps] [repeats]
+"""
+import os
+import sys
+import shutil
+import importlib
+import tempfile
+from time import perf_counter
+from types import SimpleNamespace
+
+from uiautomationtools.pytest.selenium_pytest import PytestHelper
+from uiautomationtools.models.project_index import get_index
+import uiautomationtools.helpers.string_helpers as sh
+
+
+def legacy_run_steps(self, target):
+    self.store[target] = {'app': self.app, 'steps_completed': [], 'step_pass': [False], 'traceback': None,
+                          'logs_path': self.app.driver.logging.log_file_path}
+    current_test_module = ''
+    my_class = None
+    index = get_index(self.root_dir)
+    for step in self.model_steps:
+        self.store[target]['step_pass'][-1] = False
+        actions = step.get('actions')
+        if actions:
+            self.PARAMS.update(actions)
+        test_module = step['modelName']
+        if not step.get('ancestors'):
+            test_module = 'self'
+        step_name = step['name']
+        if test_module == 'self' or test_module == self.test_path.split('/')[-1]:
+            eval(f"self.{step_name}()")
+        else:
+            if test_module != current_test_module:
+                test_path = index.test_module(test_module, self.app_dir)
+                test_module_path = '.'.join(test_path.replace(self.root_dir, '').split('/')[1:-1])
+                module = importlib.import_module(f"{test_module_path}.{test_module}")
+                my_class = getattr(module, sh.delimiter_to_camelcase(test_module))
+                current_test_module = test_module
+            method_name = my_class.__dict__.get(step_name)
+            if not method_name:
+                my_class.PARAMS.update(self.PARAMS)
+                method_name = my_class.__dict__.get(step_name)
+            method_name(self)
+        self.store[target]['steps_completed'].append(step)
+        self.store[target]['step_pass'][-1] = True
+
+
+def synthetic_project(root, modules=5, methods=20):
+    classes_dir = f'{root}/tests/app/ui_automation'
+    os.makedirs(classes_dir)
+    open(f'{root}/Pipfile', 'w').close()
+    for m in range(modules):
+        with open(f'{classes_dir}/test_dispatch_{m}.py', 'w') as f:
+            f.write(f'class TestDispatch{m}:\n' + ''.join(f'    def e_step_{i}(self):\n        pass\n\n'
+                                                         for i in range(methods)))
+
+
+class DispatchModel(PytestHelper):
+    locals().update({f'e_own_{i}': lambda self: None for i in range(20)})
+
+
+def synthetic_steps(size, modules=5, methods=20):
+    steps = []
+    for i in range(size):
+        if i % 3 == 0:
+            steps.append({'name': f'e_own_{i % methods}', 'modelName': 'test_dispatch'})
+        else:
+            m = (i // 30) % modules
+            steps.append({'name': f'e_step_{i % methods}', 'modelName': f'test_dispatch_{m}',
+                          'ancestors': [f'i_dispatch_{m}'], 'actions': {'user': f'user_{i % 7}'}})
+    return steps
+
+
+def timed(run, helper, repeats):
+    best = None
+    for _ in range(repeats):
+        start = perf_counter()
+        run(helper)
+        elapsed = perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def main(size=10000, repeats=5):
+    root = tempfile.mkdtemp()
+    sys.path.insert(0, root)
+    try:
+        synthetic_project(root)
+        helper = DispatchModel()
+        helper.root_dir, helper.app_dir, helper.test_path = root, 'app', f'{root}/tests/app/test_dispatch.py'
+        helper.app = SimpleNamespace(driver=SimpleNamespace(logging=SimpleNamespace(log_file_path='')))
+        helper.model_steps = synthetic_steps(size)
+        helper.store = {}
+        get_index(root)
+
+        legacy = timed(lambda h: legacy_run_steps(h, 'bench'), helper, repeats)
+        compiled = timed(lambda h: h.test_run_steps(None, 'bench'), helper, repeats)
+        print(f'eval per step: {legacy * 1000:8.1f} ms  {legacy / size * 1e6:6.2f} us per step ({size} steps)')
+        print(f'compiled:      {compiled * 1000:8.1f} ms  {compiled / size * 1e6:6.2f} us per step '
+              f'(resolving the methods included)')
+    finally:
+        sys.path.remove(root)
+        shutil.rmtree(root)
+
+
+if __name__ == '__main__':
+    main(*[int(a) for a in sys.argv[1:3]])
@@ -0,0 +1,100 @@
+"""
+Measures the memory of an expanded suite of ~50k steps: the former step dictionaries copied for every import
+occurrence against the shared Step objects.
+
+    python -m benchmarks.step_memory_benchmark [imports]
+"""
+import os
+import sys
+import shutil
+import tempfile
+import tracemalloc
+from copy import deepcopy
+from time import perf_counter
+
+import uiautomationtools.models.model_conversion as mc
+
+
+def legacy_step_expander(steps, app_dir):
+    """The former step_expander - dictionaries deep copied for every import occurrence."""
+    steps = steps.copy()
+    i_store = {}
+    i = 0
+    while i < len(steps):
+        step = steps[i]
+        name = step['name']
+        actions = step.get('actions')
+        if actions and type(actions) is not dict:
+            step['actions'] = mc.actions_to_dict(actions)
+        if 'i_' == name[:2]:
+            i_steps = i_store.get(name)
+            if i_steps:
+                i_steps = deepcopy(i_steps)
+            else:
+                i_steps = i_store[name] = [dict(s) for s in mc.generate_steps(f"test_{name[2:]}", True,
+                                                                             app_dir=app_dir)]
+            for s in i_steps:
+                ancestors = s.get('ancestors', [])
+                if name not in ancestors:
+                    s['ancestors'] = ancestors + [name]
+                if actions:
+                    s_action = s.get('actions', {})
+                    if type(s_action) is not dict:
+                        s_action = mc.actions_to_dict(s_action)
+                    s['actions'] = {**s_action, **step['actions']}
+            steps[i + 1:i + 1] = i_steps
+        i += 1
+    return steps
+
+
+def synthetic_project(root, imports):
+    models_dir = f'{root}/tests/app/models'
+    os.makedirs(models_dir)
+    open(f'{root}/Pipfile', 'w').close()
+    for m in range(10):
+        lines = ['Start:']
+        for i in range(10):
+            lines += [f'e_step_{m}_{i} / host="example{m}.com"; retries="{i}";', f'v_step_{m}_{i}']
+        with open(f'{models_dir}/test_module_{m}.txt', 'w') as f:
+            f.write('\n'.join(lines))
+    lines = ['Start:']
+    for i in range(imports):
+        lines += [f'i_module_{i % 10} / user="user_{i % 5}";', f'iv_module_{i % 10}']
+    with open(f'{models_dir}/test_suite.txt', 'w') as f:
+        f.write('\n'.join(lines))
+
+
+def measure(function):
+    mc.clear_import_cache()
+    tracemalloc.start()
+    start = perf_counter()
+    steps = function()
+    elapsed = perf_counter() - start
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return steps, size, elapsed
+
+
+def main(imports=2500):
+    root = tempfile.mkdtemp()
+    cwd = os.getcwd()
+    try:
+        synthetic_project(root, imports)
+        os.chdir(root)
+        suite = mc.generate_steps('test_suite', True, app_dir='app')
+        for name in range(10):
+            mc.generate_steps(f'test_module_{name}', True, app_dir='app')
+
+        legacy, legacy_size, legacy_time = measure(lambda: legacy_step_expander([dict(s) for s in suite], 'app'))
+        del legacy
+        steps, size, elapsed = measure(lambda: list(mc._iter_expanded_steps(suite, app_dir='app')))
+
+        print(f'dicts: {legacy_size / 2 ** 20:8.1f} MiB {legacy_time * 1000:8.1f} ms ({len(steps)} steps)')
+        print(f'Steps: {size / 2 ** 20:8.1f} MiB {elapsed * 1000:8.1f} ms')
+    finally:
+        os.chdir(cwd)
+        shutil.rmtree(root)
+
+
+if __name__ == '__main__':
+    main(*[int(a) for a in sys.argv[1:2]])
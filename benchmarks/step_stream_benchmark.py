@@ -0,0 +1,82 @@
+"""
+Measures the time to the first step and the peak memory of running random(length(N)) walks: the whole path
+generated, written, expanded and pruned first against the streamed iter_prepared_steps.
+
+    python -m benchmarks.step_stream_benchmark [max_length]
+"""
+import os
+import sys
+import shutil
+import tempfile
+import tracemalloc
+from time import perf_counter
+
+import uiautomationtools.models.model_conversion as mc
+
+
+def ring_drawio(size):
+    cells = ['<mxCell id="0"/><mxCell id="1" parent="0"/><mxCell id="s" value="Start" parent="1" vertex="1"/>']
+    for i in range(size):
+        source = 's' if i == 0 else f'v{i - 1}'
+        cells.append(f'<mxCell id="v{i}" value="v_step_{i}" parent="1" vertex="1"/>'
+                     f'<mxCell id="e{i}" parent="1" source="{source}" target="v{i}" edge="1"/>'
+                     f'<mxCell id="l{i}" value="e_step_{i}" parent="e{i}" vertex="1"/>')
+    cells.append(f'<mxCell id="back" parent="1" source="v{size - 1}" target="v0" edge="1"/>'
+                 f'<mxCell id="lb" value="e_back" parent="back" vertex="1"/>')
+    return f'<mxfile><diagram id="d"><mxGraphModel><root>{"".join(cells)}</root></mxGraphModel></diagram></mxfile>'
+
+
+def run(steps):
+    start = perf_counter()
+    first = None
+    count = 0
+    for _ in steps():
+        if first is None:
+            first = perf_counter() - start
+        count += 1
+    return first, perf_counter() - start, count
+
+
+def measure(steps):
+    mc.clear_import_cache()
+    tracemalloc.start()
+    first, total, count = run(steps)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return first, total, peak, count
+
+
+def main(max_length=100000):
+    root = tempfile.mkdtemp()
+    cwd = os.getcwd()
+    try:
+        models_dir = f'{root}/tests/app/models'
+        os.makedirs(models_dir)
+        open(f'{root}/Pipfile', 'w').close()
+        with open(f'{models_dir}/test_ring.drawio', 'w') as f:
+            f.write(ring_drawio(20))
+        os.chdir(root)
+
+        length = 1000
+        while length <= max_length:
+            generator = f'random(length({length}))'
+
+            def whole_path():
+                steps = mc.generate_steps('test_ring', True, generator, 'app', seed=1, use_cache=False)
+                return mc.expand_pruned_steps(steps, app_dir='app')
+
+            def streamed():
+                return mc.iter_prepared_steps('test_ring', generator=generator, app_dir='app')
+
+            for name, steps in (('whole path', whole_path), ('streamed', streamed)):
+                first, total, peak, count = measure(steps)
+                print(f'{length:>7} {name:>10}: first step {first * 1000:8.2f} ms, all {total * 1000:8.1f} ms, '
+                      f'peak {peak / 2 ** 20:6.2f} MiB ({count} steps)')
+            length *= 10
+    finally:
+        os.chdir(cwd)
+        shutil.rmtree(root)
+
+
+if __name__ == '__main__':
+    main(*[int(a) for a in sys.argv[1:2]])
@@ -0,0 +1,141 @@
+"""
+Compares the streaming text model parser against the former readlines/re-scan parser on a synthetic model.
+
+    python -m benchmarks.text_converter_benchmark [lines] [repeats]
+"""
+import os
+import sys
+import tempfile
+from time import perf_counter
+
+from uiautomationtools.models.text_converter import TextConverter, TextConverterException
+
+
+class LegacyTextConverter(TextConverter):
+    """The former read_content/process_content."""
+
+    def read_content(self, path_file):
+        def clean_line(line):
+            line = line.lstrip(' ')
+            i = 0
+            while i < len(line):
+                if line[i] not in [' ', '\t']:
+                    break
+                i += 1
+            return line[i:len(line)]
+
+        self.reset()
+        self.path_file = path_file
+        with open(path_file, 'r') as file:
+            self.content = file.readlines()
+        self.content = [clean_line(x) for x in self.content]
+
+    def process_content(self):
+        def has_params(line_position):
+            return '/' in self.content[line_position]
+
+        def is_an_action(line_position):
+            actions = ['e_', 'v_', 'i_', 'iv_']
+            if has_params(line_position):
+                return True
+            if any((self.content[line_position].startswith(x)) for x in actions):
+                if '=' not in self.content[line_position]:
+                    return True
+            return False
+
+        def is_empty(line):
+            return len(line) < 2
+
+        i = 0
+        while i < len(self.content):
+            if not is_empty(self.content[i]) and self.content[i].title().startswith("Start"):
+                i += 1
+                break
+            i += 1
+
+        state = {"e_": "v_", "i_": "iv_"}
+        status = ""
+        while i < len(self.content):
+            if is_empty(self.content[i]):
+                i += 1
+                continue
+            if status != "":
+                if not self.content[i].startswith(state[status]):
+                    raise TextConverterException(f"Error parsing at line: {str(i + 1)}")
+                status = ""
+            else:
+                status = self.content[i][0:2]
+            if has_params(i):
+                action = self.content[i].split('/')[0].replace(' ', '')
+                params_raw = self.content[i].rstrip('\n').split('/')[1]
+                params = []
+                if ";" in params_raw:
+                    params = [f"{x.lstrip(' ').rstrip(' ')};" for x in params_raw.split(';') if x != '']
+                    i += 1
+                else:
+                    i += 1
+                    while i < len(self.content):
+                        if is_an_action(i):
+                            break
+                        params.append(self.content[i].lstrip(' ').rstrip('\n'))
+                        i += 1
+                self.parsed_content.append((action, params))
+            else:
+                self.parsed_content.append((self.content[i].replace('\n', '').replace(' ', ''), []))
+                i += 1
+
+
+def synthetic_model(path, size):
+    lines = ['Start:']
+    i = 0
+    while len(lines) < size:
+        if i % 3 == 0:
+            lines += [f'    e_action_{i} / user="foo"; password="bar";', f'    v_action_{i}']
+        elif i % 3 == 1:
+            lines += [f'    i_action_{i} /', '        host="example.com";', '        retries="3";',
+                      f'    iv_action_{i}', '']
+        else:
+            lines += [f'    e_action_{i}', f'    v_action_{i}']
+        i += 1
+    with open(path, 'w') as f:
+        f.write('\n'.join(lines))
+
+
+def best_of(function, repeats):
+    best = None
+    for _ in range(repeats):
+        start = perf_counter()
+        result = function()
+        elapsed = perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best, result
+
+
+def main(size=100000, repeats=3):
+    fd, path = tempfile.mkstemp(suffix='.txt')
+    os.close(fd)
+    try:
+        synthetic_model(path, size)
+
+        def parse_legacy():
+            legacy = LegacyTextConverter()
+            legacy.read_content(path)
+            legacy.process_content()
+            return legacy.parsed_content
+
+        def parse_streaming():
+            return list(TextConverter().parse(path))
+
+        legacy_time, parsed_content = best_of(parse_legacy, repeats)
+        streaming_time, tokens = best_of(parse_streaming, repeats)
+        assert parsed_content == [(action, params) for action, params, _ in tokens]
+
+        print(f'legacy:    {legacy_time * 1000:10.1f} ms ({size} lines)')
+        print(f'streaming: {streaming_time * 1000:10.1f} ms ({len(tokens)} actions)')
+        print(f'speedup:   {legacy_time / streaming_time:10.1f}x')
+    finally:
+        os.remove(path)
+
+
+if __name__ == '__main__':
+    main(*[int(a) for a in sys.argv[1:3]])
@@ -13,13 +13,10 @@ requires = [
     'altwalker',
     'selenium<4.0.0',
     'Appium-Python-Client<=2.0.0',
-    'numpy',
     'langdetect',
-    'lxml',
     'bs4',
     'pyautogui',
     'pyperclip',
-    'pypeln',
     'mitmproxy',
     'webdriver-manager'
 ]
@@ -41,5 +38,11 @@ setup(
     ],
     packages=find_packages(),
     python_requires=">=3.8",
-    install_requires=requires
+    install_requires=requires,
+    entry_points={
+        'console_scripts': [
+            'precompile-models=uiautomationtools.models.model_compiler:main',
+            'analyze-models=uiautomationtools.models.model_analyzer:main'
+        ]
+    }
 )
@@ -1,5 +1,8 @@
-import asyncio
-import pypeln as pl
+import re
+import json
+import hashlib
+
+MERKLE_KEY = '#merkle'
 
 
 def flatten(d):
@@ -51,6 +54,51 @@ def unflatten(d):
     return items
 
 
+def skip_matcher(skipped_keys):
+    """
+    This precompiles the skipped keys into one matcher - a key is skipped when one of them is part of it.
+
+    Args:
+        skipped_keys (None|list): The keys to skip.
+
+    Returns:
+        matcher (None|function): The search function of the keys or None when nothing is skipped.
+    """
+    patterns = [re.escape(sk) for sk in dict.fromkeys(skipped_keys or []) if sk]
+    return re.compile('|'.join(patterns)).search if patterns else None
+
+
+def _diff_flat(flat_d1, flat_d2, matcher, normalize):
+    """
+    This compares two flattened dictionaries with sets and dicts only.
+
+    Args:
+        flat_d1 (dict): The first flattened dictionary.
+        flat_d2 (dict): The second flattened dictionary.
+        matcher (None|function): The skipped keys matcher.
+        normalize (bool): Whether to convert each of the comparable values in the same casing.
+
+    Returns:
+        f1_not_in_f2 (list): The keys of the first dictionary only.
+        f2_not_in_f1 (list): The keys of the second dictionary only.
+        mismatched_values (list<dict>): The keys with different values.
+        skipped (list): The keys skipped.
+    """
+    skipped = [k for k in dict.fromkeys([*flat_d1, *flat_d2]) if matcher(k)] if matcher else []
+    skipped_set = set(skipped)
+    f1_not_in_f2 = [k for k in flat_d1 if k not in flat_d2 and k not in skipped_set]
+    f2_not_in_f1 = [k for k in flat_d2 if k not in flat_d1 and k not in skipped_set]
+
+    mismatched_values = []
+    for k, v in flat_d1.items():
+        if k in skipped_set or k not in flat_d2:
+            continue
+        v2 = flat_d2[k]
+        if (v.lower() != v2.lower()) if normalize else (v != v2):
+            mismatched_values.append({'key': k, 'd1': v, 'd2': v2})
+    return f1_not_in_f2, f2_not_in_f1, mismatched_values, skipped
+
+
 def compare_dictionaries(d1, d2, skipped_keys=None, normalize=False):
     """
     This does a general key then value mismatch comparison of two dictionaries.
@@ -58,113 +106,158 @@ def compare_dictionaries(d1, d2, skipped_keys=None, normalize=False):
     Args:
         d1 (dict): The first dictionary to compare.
         d2 (dict): The second dictionary to compare.
-        skipped_keys (None|list): The keys to skip in the comparison.
+        skipped_keys (None|list): The keys to skip in the comparison - every key containing one of them is skipped.
         normalize (bool): Whether to convert each of the comparable values in the same casing.
 
     Returns:
         mismatches (dict): The record of any key and value mismatches.
     """
-    flat_d1 = flatten(d1)
-    flat_d2 = flatten(d2)
     skipped_keys = skipped_keys or []
-    thin_keys = list(dict.fromkeys(list(flat_d1.keys()) + list(flat_d2.keys())))
-    if skipped_keys:
-        skipped_keys += [k for k in thin_keys if any(sk for sk in skipped_keys if sk in k)]
-
+    f1_not_in_f2, f2_not_in_f1, mismatched_values, skipped = _diff_flat(flatten(d1), flatten(d2),
+                                                                        skip_matcher(skipped_keys), normalize)
     mismatches = {}
-    f1_not_in_f2 = [k for k in flat_d1.keys() if k not in skipped_keys and k not in flat_d2.keys()]
-    f2_not_in_f1 = [k for k in flat_d2.keys() if k not in skipped_keys and k not in flat_d1.keys()]
-    mismatched_keys = f1_not_in_f2 + f2_not_in_f1
-
-    if normalize:
-        mismatched_values = [{'key': k, 'd1': v, 'd2': flat_d2[k]} for k, v in flat_d1.items()
-                             if k not in mismatched_keys + skipped_keys and v.lower() != flat_d2[k].lower()]
-    else:
-        mismatched_values = [{'key': k, 'd1': v, 'd2': flat_d2[k]} for k, v in flat_d1.items()
-                             if k not in mismatched_keys + skipped_keys and v != flat_d2[k]]
-
-    if mismatched_keys:
+    if f1_not_in_f2 or f2_not_in_f1:
         keys = {'f1_not_in_f2': f1_not_in_f2, 'f2_not_in_f1': f2_not_in_f1}
         mismatches['keys'] = {k: v for k, v in keys.items() if v}
     if mismatched_values:
         mismatches['values'] = mismatched_values
     if skipped_keys:
-        mismatches['skipped_keys'] = skipped_keys
+        mismatches['skipped_keys'] = skipped_keys + skipped
     return mismatches
 
 
-async def _async_compare_dictionaries(data, _return):
+def async_compare_dictionaries(d1, d2, skipped_keys=None, normalize=False):
     """
-    This async wrapper that validates downloaded image files by trying to open them.
+    This compares two dictionaries key by key (e.g. the references of a page) in a single pass: the keys missing from
+    either side then the values of the flattened common keys. It is kept under its former name - the comparison is
+    CPU bound so it no longer runs in an event loop.
 
     Args:
-        data (list<dict>): The list containing each iteration-comparision to be made.
-            d1 (dict): The first dictionary to compare.
-            d2 (dict): The second dictionary to compare.
-            skipped_keys (None|list): The keys to skip in the comparison.
-            normalize (bool): Whether to convert each of the comparable values in the same casing.
+        d1 (dict): The first dictionary to compare.
+        d2 (dict): The second dictionary to compare.
+        skipped_keys (None|list): The keys to skip. The top level keys are skipped when equal to one of them, the
+                                  flattened keys when containing one of them.
+        normalize (bool): Whether to convert each of the comparable values in the same casing.
 
     Returns:
-        each : List of coroutines to execute.
+        mismatches (dict): The record of any key and value mismatches.
     """
+    skipped_keys = skipped_keys or []
+    exact = set(skipped_keys)
+    matcher = skip_matcher(skipped_keys)
+    keys = [k for k in d1 if k not in d2 and k not in exact] + [k for k in d2 if k not in d1 and k not in exact]
+    values = []
+    skipped = dict.fromkeys(skipped_keys)
+    for k, v in d1.items():
+        if k not in d2:
+            continue
+        f1_not_in_f2, f2_not_in_f1, mismatched_values, skipped_flat = _diff_flat(flatten({k: v}), flatten({k: d2[k]}),
+                                                                                 matcher, normalize)
+        keys += f1_not_in_f2 + f2_not_in_f1
+        values += mismatched_values
+        skipped.update(dict.fromkeys(skipped_flat))
 
-    def _worker(_data):
-        """
-        The worker/wrapper function for compare_dictionaries.
+    mismatches = {}
+    if skipped:
+        mismatches['skipped_keys'] = list(skipped)
+    if keys:
+        mismatches['keys'] = keys
+    if values:
+        mismatches['values'] = values
+    return mismatches
 
-        Args:
-            _data (list<dict>): The list containing each iteration-comparision to be made.
-                d1 (dict): The first dictionary to compare.
-                d2 (dict): The second dictionary to compare.
-                skipped_keys (None|list): The keys to skip in the comparison.
-                normalize (bool): Whether to convert each of the comparable values in the same casing.
-        """
-        mismatches = compare_dictionaries(_data['d1'], _data['d2'], skipped_keys=_data['skipped_keys'],
-                                          normalize=_data['normalize'])
 
-        if mismatches.get('keys'):
-            _return['keys'] += mismatches['keys']
-        if mismatches.get('values'):
-            _return['values'] += mismatches['values']
+def _digest(text):
+    """
+    This hashes a text for the merkle trees.
 
-    return await pl.task.each(lambda d: _worker(d), data, workers=1000)
+    Args:
+        text (str): The text to hash.
 
+    Returns:
+        digest (str): The sha1 hex digest of the text.
+    """
+    return hashlib.sha1(text.encode('utf-8')).hexdigest()
 
-def async_compare_dictionaries(d1, d2, skipped_keys=None, normalize=False):
+
+def merkle_tree(d, untracked=None):
     """
-    This synchronous hook that asynchronous validates downloaded image files by trying to open them.
+    This hashes a dictionary (e.g. the references of a page) into a merkle tree: a content hash per top level key,
+    grouped in up to 256 buckets by the hash of the key, a hash per bucket and a root hash of the buckets. Two
+    dictionaries with the same root hash have the same content.
 
     Args:
-        d1 (dict): The first dictionary to compare.
-        d2 (dict): The second dictionary to compare.
-        skipped_keys (None|list): The keys to skip in the comparison.
-        normalize (bool): Whether to convert each of the comparable values in the same casing.
+        d (dict): The dictionary to hash. Its MERKLE_KEY (a tree stored by earlier versions) is ignored.
+        untracked (None|list): The top level keys not hashed (e.g. write_time) - they are always compared.
 
     Returns:
-        _return (dict): The record of any key and value mismatches.
+        tree (dict): The root hash, the untracked keys and the buckets of the key hashes.
     """
-    _return = {'skipped_keys': skipped_keys, 'keys': [], 'values': []}
+    untracked = list(untracked or [])
+    ignored = set(untracked + [MERKLE_KEY])
+    buckets = {}
+    for k, v in d.items():
+        if k in ignored:
+            continue
+        content = json.dumps(v, sort_keys=True, ensure_ascii=False, separators=(',', ':'), default=str)
+        buckets.setdefault(_digest(k)[:2], {})[k] = _digest(content)
 
-    common_keys = set(d1).intersection(set(d2))
-    missing_keys = set(d1).symmetric_difference(set(d2))
-    missing_keys = [m for m in list(missing_keys) if m not in (skipped_keys or [])]
+    tree_buckets = {}
+    for bucket in sorted(buckets):
+        hashes = buckets[bucket]
+        bucket_hash = _digest('\n'.join(f'{k}\t{hashes[k]}' for k in sorted(hashes)))
+        tree_buckets[bucket] = {'hash': bucket_hash, 'keys': hashes}
+    root = _digest('\n'.join(f'{b}\t{tree_buckets[b]["hash"]}' for b in tree_buckets))
+    return {'root': root, 'untracked': untracked, 'buckets': tree_buckets}
 
-    data = [{'d1': {k: d1.get(k)},
-             'd2': {k: d2.get(k)},
-             'skipped_keys': skipped_keys,
-             'normalize': normalize} for k in dict.fromkeys(common_keys)]
 
-    each = _async_compare_dictionaries(data, _return)
-    asyncio.run(each)
+def changed_keys(tree1, tree2):
+    """
+    This walks two merkle trees down the buckets whose hashes differ only.
 
-    if missing_keys:
-        _return['keys'] = missing_keys
+    Args:
+        tree1 (dict): The merkle tree of the first dictionary.
+        tree2 (dict): The merkle tree of the second dictionary.
 
-    if not _return.get('skipped_keys'):
-        _return.pop('skipped_keys')
-    if not _return.get('keys'):
-        _return.pop('keys')
-    if not _return.get('values'):
-        _return.pop('values')
+    Returns:
+        keys (list): The top level keys with a different content, found on one side only or untracked.
+    """
+    keys = dict.fromkeys(tree1['untracked'] + tree2['untracked'])
+    if tree1['root'] == tree2['root']:
+        return list(keys)
+
+    buckets1, buckets2 = tree1['buckets'], tree2['buckets']
+    for bucket in sorted(buckets1.keys() | buckets2.keys()):
+        bucket1, bucket2 = buckets1.get(bucket), buckets2.get(bucket)
+        if bucket1 and bucket2 and bucket1['hash'] == bucket2['hash']:
+            continue
+        hashes1 = bucket1['keys'] if bucket1 else {}
+        hashes2 = bucket2['keys'] if bucket2 else {}
+        keys.update(dict.fromkeys(k for k, h in hashes1.items() if hashes2.get(k) != h))
+        keys.update(dict.fromkeys(k for k in hashes2 if k not in hashes1))
+    return list(keys)
+
+
+def merkle_compare_dictionaries(d1, d2, skipped_keys=None, normalize=False, untracked=None, tree1=None, tree2=None):
+    """
+    This compares two dictionaries like async_compare_dictionaries but only the top level keys whose hashes differ
+    in their merkle trees - identical dictionaries cost a root hash comparison. The dictionaries without a given tree
+    are hashed here, a tree stored in them (MERKLE_KEY, written by earlier versions) is ignored.
+    The skipped flattened keys are only reported for the compared keys.
 
-    return _return
+    Args:
+        d1 (dict): The first dictionary to compare.
+        d2 (dict): The second dictionary to compare.
+        skipped_keys (None|list): The keys to skip. The top level keys are skipped when equal to one of them, the
+                                  flattened keys when containing one of them.
+        normalize (bool): Whether to convert each of the comparable values in the same casing.
+        untracked (None|list): The top level keys not hashed (e.g. write_time) - they are always compared.
+        tree1 (None|dict): The merkle tree of d1 when known to match its content (e.g. stored with a baseline).
+        tree2 (None|dict): The merkle tree of d2 when known to match its content.
+
+    Returns:
+        mismatches (dict): The record of any key and value mismatches.
+    """
+    keys = changed_keys(tree1 or merkle_tree(d1, untracked), tree2 or merkle_tree(d2, untracked))
+    return async_compare_dictionaries({k: d1[k] for k in keys if k in d1}, {k: d2[k] for k in keys if k in d2},
+                                      skipped_keys, normalize)
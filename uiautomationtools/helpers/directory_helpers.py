@@ -1,6 +1,13 @@
 import os
 import json
+import tempfile
 from glob import iglob
+from contextlib import contextmanager
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
 
 
 def safe_mkdirs(path):
@@ -14,7 +21,7 @@ def safe_mkdirs(path):
         os.makedirs(path, exist_ok=True)
 
 
-def make_json(content, path, append=False, ensure_ascii=False):
+def make_json(content, path, append=False, ensure_ascii=False, atomic=False):
     """
     This writes a dictionary to a json file.
 
@@ -23,14 +30,46 @@ def make_json(content, path, append=False, ensure_ascii=False):
         path (str): The path to write to.
         append (bool): Whether to append data to an existing json.
         ensure_ascii (bool): Whether to contain ASCII characters.
+        atomic (bool): Whether to write to a temporary file first so readers never see a partial file.
     """
     if append and os.path.exists(path):
         stored_json = load_json(path)
         content = {**stored_json, **content}
 
-    safe_mkdirs('/'.join(path.split('/')[:-1]))
-    with open(path, 'w') as fp:
-        json.dump(content, fp, indent=4, ensure_ascii=ensure_ascii)
+    directory = '/'.join(path.split('/')[:-1])
+    safe_mkdirs(directory)
+    if not atomic:
+        with open(path, 'w') as fp:
+            json.dump(content, fp, indent=4, ensure_ascii=ensure_ascii)
+        return
+
+    fd, temp_path = tempfile.mkstemp(dir=directory or None, suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'w') as fp:
+            json.dump(content, fp, indent=4, ensure_ascii=ensure_ascii)
+        os.replace(temp_path, path)
+    except BaseException:
+        os.remove(temp_path)
+        raise
+
+
+@contextmanager
+def file_lock(path):
+    """
+    This holds an exclusive lock on a lock file - shared between processes e.g. pytest-xdist workers.
+
+    Args:
+        path (str): The path of the lock file.
+    """
+    safe_mkdirs(os.path.dirname(path))
+    with open(path, 'a') as fp:
+        if fcntl:
+            fcntl.flock(fp.fileno(), fcntl.LOCK_EX)
+        try:
+            yield fp
+        finally:
+            if fcntl:
+                fcntl.flock(fp.fileno(), fcntl.LOCK_UN)
 
 
 def load_json(path):
@@ -43,7 +82,7 @@ def load_json(path):
     Returns:
         data (dict): The json data.
     """
-    if not os.path.exists(path):
+    if not path or not os.path.exists(path):
         return {}
     with open(path) as fp:
         return json.load(fp)
@@ -0,0 +1,380 @@
+import re
+from html.parser import HTMLParser
+from html.entities import html5
+
+from uiautomationtools.helpers.list_helpers import encompassing_indexes
+
+# The tree building rules of BeautifulSoup(html, 'html.parser') the references were built with.
+EMPTY_ELEMENT_TAGS = frozenset(['area', 'base', 'br', 'col', 'embed', 'hr', 'img', 'input', 'keygen', 'link',
+                                'menuitem', 'meta', 'param', 'source', 'track', 'wbr', 'basefont', 'bgsound',
+                                'command', 'frame', 'image', 'isindex', 'nextid', 'spacer'])
+STRING_CONTAINERS = frozenset(['rt', 'rp', 'style', 'script', 'template'])
+PRESERVE_WHITESPACE_TAGS = frozenset(['pre', 'textarea'])
+CDATA_LIST_ATTRIBUTES = {'*': ('class', 'accesskey', 'dropzone'), 'a': ('rel', 'rev'), 'link': ('rel', 'rev'),
+                         'td': ('headers',), 'th': ('headers',), 'form': ('accept-charset',),
+                         'object': ('archive',), 'area': ('rel',), 'icon': ('sizes',), 'iframe': ('sandbox',),
+                         'output': ('for',)}
+ENTITIES = {}
+for _name, _character in sorted(html5.items()):
+    ENTITIES.setdefault(_name[:-1] if _name.endswith(';') else _name, _character)
+
+_ASCII_SPACES = {ord(c): None for c in '\x20\x0a\x09\x0c\x0d'}
+_NON_WHITESPACE = re.compile(r'\S+')
+_CONTEXT = re.compile(r'(\W|_)+')
+_DECIMAL_REFERENCE = re.compile('([0-9]+)(.*)')
+_HEX_REFERENCE = re.compile('([0-9a-f]+)(.*)')
+_TEXT = None
+_OTHER = '#other'
+
+
+# Walks the live dom of the elements matching a css selector (arguments[0]) with an attribute (arguments[1], unless
+# null) and returns the text lines of every
+# element matched (interned), the range of its descendants and the [tag name, [name, value, ...], text] of the
+# descendants in document order - their text is made of the strings of the same kind like in ElementParser.
+ELEMENTS_SCRIPT = """
+const containers = new Set(['rt', 'rp', 'style', 'script', 'template']);
+const preservers = new Set(['pre', 'textarea']);
+const attribute = arguments[1];
+const matched = Array.from(document.querySelectorAll(arguments[0]))
+    .filter(e => (!attribute || e.getAttribute(attribute)) && e.innerText);
+const positions = new Map(matched.map((e, i) => [e, i]));
+const lines = [], lineIndexes = new Map(), elements = [], strings = {'': []}, kinds = [];
+const ranges = matched.map(() => null);
+const texts = matched.map(e => e.innerText.split(/\\n+/).map(t => t.trim()).filter(t => t).map(t => {
+    if (!lineIndexes.has(t)) {
+        lineIndexes.set(t, lines.length);
+        lines.push(t);
+    }
+    return lineIndexes.get(t);
+}));
+let preserved = 0;
+
+const walk = (node) => {
+    for (const child of (node.localName === 'template' ? node.content : node).childNodes) {
+        if (child.nodeType === Node.TEXT_NODE) {
+            let data = child.data;
+            if (!preserved && !/[^ \\n\\t\\f\\r]/.test(data)) {
+                data = data.includes('\\n') ? '\\n' : ' ';
+            }
+            strings[kinds.length ? kinds[kinds.length - 1] : ''].push(data);
+        } else if (child.nodeType === Node.ELEMENT_NODE) {
+            const tag = child.localName.toLowerCase();
+            const kind = containers.has(tag) ? tag : '';
+            const attrs = [];
+            for (const attr of child.attributes) {
+                attrs.push(attr.name.toLowerCase(), attr.value);
+            }
+            strings[kind] = strings[kind] || [];
+            const start = strings[kind].length, index = elements.length;
+            elements.push([tag, attrs, '']);
+            kind && kinds.push(kind);
+            preservers.has(tag) && preserved++;
+            walk(child);
+            elements[index][2] = strings[kind].slice(start).join('');
+            kind && kinds.pop();
+            preservers.has(tag) && preserved--;
+            positions.has(child) && (ranges[positions.get(child)] = [index + 1, elements.length]);
+        }
+    }
+};
+
+matched.forEach((e, i) => {
+    if (!ranges[i]) {
+        const start = elements.length;
+        walk(e);
+        ranges[i] = [start, elements.length];
+    }
+});
+return {'lines': lines, 'texts': texts, 'ranges': ranges, 'elements': elements};
+"""
+
+
+def element_attrs(name, attrs):
+    """
+    This converts the attributes of an element like BeautifulSoup: the whitespace separated values of the multi
+    valued attributes (e.g. class) as lists.
+
+    Args:
+        name (str): The tag name.
+        attrs (list<tuple>): The (name, value) attributes.
+
+    Returns:
+        attrs (dict): The attributes.
+    """
+    attr_dict = {}
+    for key, value in attrs:
+        attr_dict[key] = '' if value is None else value
+    for key in CDATA_LIST_ATTRIBUTES['*'] + CDATA_LIST_ATTRIBUTES.get(name, ()):
+        if key in attr_dict:
+            attr_dict[key] = _NON_WHITESPACE.findall(attr_dict[key])
+    return attr_dict
+
+
+class ElementParser(HTMLParser):
+    """
+    This parses html into the elements of BeautifulSoup(html, 'html.parser').descendants in a single pass: the same
+    tokenizer, the same tree building rules and the same .text of every element, computed once per element from the
+    strings of the document instead of walking its subtree.
+    """
+
+    def __init__(self):
+        """
+        The constructor for ElementParser.
+        """
+        super().__init__(convert_charrefs=False)
+        self.elements = []
+        self.stack = []
+        self.open_tags = {}
+        self.containers = []
+        self.preserved = 0
+        self.current_data = []
+        self.strings = {'': [], **{name: [] for name in STRING_CONTAINERS}}
+        self.already_closed = {}
+
+    def end_data(self, kind=_TEXT):
+        """
+        This adds the pending text to the strings of the document.
+
+        Args:
+            kind (None|str): None for a text (the innermost string container decides), '' for a CDATA section and
+                             '#other' for the comments, declarations etc. no text is made of.
+        """
+        if not self.current_data:
+            return
+        data = ''.join(self.current_data)
+        self.current_data = []
+        if not data.translate(_ASCII_SPACES) and not self.preserved:
+            data = '\n' if '\n' in data else ' '
+        if kind is _TEXT:
+            kind = self.containers[-1] if self.containers else ''
+        strings = self.strings.get(kind)
+        if strings is not None:
+            strings.append(data)
+
+    def push_tag(self, name, attrs):
+        """
+        This opens an element.
+
+        Args:
+            name (str): The tag name.
+            attrs (dict): The attributes.
+        """
+        self.end_data()
+        kind = name if name in STRING_CONTAINERS else ''
+        self.stack.append((name, kind, len(self.strings[kind]), len(self.elements)))
+        self.elements.append([name, attrs, ''])
+        self.open_tags[name] = self.open_tags.get(name, 0) + 1
+        if kind:
+            self.containers.append(name)
+        if name in PRESERVE_WHITESPACE_TAGS:
+            self.preserved += 1
+
+    def pop_tag(self):
+        """
+        This closes the innermost element and sets its text.
+        """
+        name, kind, start, index = self.stack.pop()
+        self.elements[index][2] = ''.join(self.strings[kind][start:])
+        self.open_tags[name] -= 1
+        if kind:
+            self.containers.pop()
+        if name in PRESERVE_WHITESPACE_TAGS:
+            self.preserved -= 1
+
+    def handle_starttag(self, name, attrs, handle_empty_element=True):
+        self.push_tag(name, element_attrs(name, attrs))
+        if name in EMPTY_ELEMENT_TAGS and handle_empty_element:
+            self.handle_endtag(name, check_already_closed=False)
+            self.already_closed[name] = self.already_closed.get(name, 0) + 1
+
+    def handle_endtag(self, name, check_already_closed=True):
+        if check_already_closed and self.already_closed.get(name):
+            self.already_closed[name] -= 1
+            return
+        self.end_data()
+        if not self.open_tags.get(name):
+            return
+        while self.stack[-1][0] != name:
+            self.pop_tag()
+        self.pop_tag()
+
+    def handle_startendtag(self, name, attrs):
+        self.handle_starttag(name, attrs, handle_empty_element=False)
+        self.handle_endtag(name, check_already_closed=False)
+
+    def handle_data(self, data):
+        self.current_data.append(data)
+
+    def handle_charref(self, name):
+        base, reference = (16, _HEX_REFERENCE) if name[:1] in 'xX' else (10, _DECIMAL_REFERENCE)
+        name = name[1:] if base == 16 else name
+        data, extra_data = '', ''
+        try:
+            code = int(name, base)
+        except ValueError:
+            match = reference.match(name)
+            code, extra_data = (int(match.group(1), base), match.group(2)) if match else (None, name)
+
+        if code is None:
+            pass
+        elif code == 0 or code > 0x10ffff or 0xd800 <= code <= 0xdfff:
+            data = '\N{REPLACEMENT CHARACTER}'
+        elif 0x80 <= code <= 0x9f:
+            try:
+                data = bytes([code]).decode('windows-1252')
+            except UnicodeDecodeError:
+                data = chr(code)
+        else:
+            data = chr(code)
+        self.handle_data(data)
+        self.handle_data(extra_data)
+
+    def handle_entityref(self, name):
+        character = ENTITIES.get(name)
+        self.handle_data(character if character is not None else f'&{name}')
+
+    def handle_comment(self, data):
+        self.end_data()
+        self.handle_data(data)
+        self.end_data(_OTHER)
+
+    def handle_decl(self, data):
+        self.handle_comment(data)
+
+    def handle_pi(self, data):
+        self.handle_comment(data)
+
+    def unknown_decl(self, data):
+        self.end_data()
+        self.handle_data(data[len('CDATA['):] if data.upper().startswith('CDATA[') else data)
+        self.end_data('' if data.upper().startswith('CDATA[') else _OTHER)
+
+    def close(self):
+        super().close()
+        self.end_data()
+        while self.stack:
+            self.pop_tag()
+
+
+def parse_elements(html):
+    """
+    This parses the elements of a html page.
+
+    Args:
+        html (str): HTML of a page.
+
+    Returns:
+        elements (list<list>): The [tag name, attributes, text] of every element in document order.
+    """
+    parser = ElementParser()
+    parser.feed(html)
+    parser.close()
+    return parser.elements
+
+
+class ReferenceBuilder(object):
+    """
+    This assembles the references of a page from its elements: the context of every element, the skipped tags and
+    the duplicates (found from a hash of the attributes).
+    """
+
+    def __init__(self, skipped_tags=None):
+        """
+        The constructor for ReferenceBuilder.
+
+        Args:
+            skipped_tags (None|list): The element tags to skip.
+        """
+        self.references = {}
+        self.seen = set()
+        self.skip = re.compile('|'.join(re.escape(t) for t in skipped_tags)).search if skipped_tags else None
+
+    def add(self, tag, attrs, text):
+        """
+        This adds an element to the references.
+
+        Args:
+            tag (str): The tag name.
+            attrs (dict): The attributes - the class as a list.
+            text (str): The text of the element and its descendants.
+        """
+        attrs = {k: v for k, v in attrs.items() if v}
+        attr_class = attrs.get('class')
+        if attr_class:
+            attrs['class'] = ' '.join(attr_class)
+
+        text = text.replace('\n', '')
+        if text:
+            attrs['text'] = text
+
+        if tag:
+            attrs['tag'] = tag
+
+        context = attrs.get('id') or attrs.get('name') or attrs.get('placeholder') or attrs.get('text') or 'no_key'
+        context = _CONTEXT.sub('_', context.lower())
+
+        if self.skip and self.skip(f"{attrs.get('tag')},{attrs.get('class')},{context}"):
+            return
+
+        key = (context, frozenset((k, tuple(v) if isinstance(v, list) else v) for k, v in attrs.items()))
+        if key in self.seen:
+            return
+        self.seen.add(key)
+        self.references.setdefault(context, []).append(attrs)
+
+
+def build_element_references(elements, skipped_tags=None):
+    """
+    This builds the references of the elements of a page.
+
+    Args:
+        elements (iterable<list>): The [tag name, attributes, text] of every element in document order.
+        skipped_tags (None|list): The element tags to skip.
+
+    Returns:
+        references (dict): The references of the page.
+    """
+    builder = ReferenceBuilder(skipped_tags)
+    for tag, attrs, text in elements:
+        builder.add(tag, attrs, text)
+    return builder.references
+
+
+def build_references(html, skipped_tags=None):
+    """
+    This builds the references of a html page.
+
+    Args:
+        html (str): HTML of a page.
+        skipped_tags (None|list): The element tags to skip.
+
+    Returns:
+        references (dict): The references of the page.
+    """
+    return build_element_references(parse_elements(html), skipped_tags)
+
+
+def script_elements(page):
+    """
+    This picks the elements returned by ELEMENTS_SCRIPT like get_page_source picks the html: the descendants of the
+    elements matched whose text encompasses the text of the others.
+
+    Args:
+        page (dict): The lines, texts, ranges and elements returned by ELEMENTS_SCRIPT.
+
+    Returns:
+        elements (None|list<list>): The [tag name, attributes, text] of the elements picked or None when the elements
+                                    matched have no text.
+    """
+    lines = page['lines']
+    matched = [(i, [lines[line] for line in text]) for i, text in enumerate(page['texts']) if text]
+    indexes = encompassing_indexes([text for _, text in matched])
+    if indexes is None:
+        return None
+
+    elements = []
+    for index in indexes:
+        start, end = page['ranges'][matched[index][0]]
+        elements += [[tag, element_attrs(tag, zip(attrs[::2], attrs[1::2])), text]
+                     for tag, attrs, text in page['elements'][start:end]]
+    return elements
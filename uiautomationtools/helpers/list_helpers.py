@@ -18,3 +18,26 @@ def unique_subsets(super_set, constraint):
             all_encompassing.append(sub_set)
             constraint -= set(sub_set)
     return all_encompassing, list(constraint)
+
+
+def encompassing_indexes(super_set):
+    """
+    This finds the lists whose items encompass the items of all the others (e.g. the text lines of the fattest divs
+    of a page).
+
+    Args:
+        super_set (list<list>): The list of lists to pick from.
+
+    Returns:
+        indexes (None|list): The indexes of the encompassing lists or None when they have no items.
+    """
+    unique_items = list(dict.fromkeys([t2 for t1 in super_set for t2 in t1 if t2]))
+    if not ''.join(unique_items):
+        return None
+    all_encompassing, unique_items = unique_subsets(super_set, unique_items)
+
+    # TODO - need a better way to decide on data and grab leftovers
+    if unique_items:
+        leftovers = [subset for subset in super_set if set(unique_items) <= set(subset)]
+        not leftovers or all_encompassing.append(leftovers[0])
+    return [super_set.index(a) for a in all_encompassing]
@@ -0,0 +1 @@
+from uiautomationtools.models.model_compiler import precompile
@@ -1,14 +1,140 @@
 from glob import iglob
-from typing import List
+from typing import Dict, List
 import os
-from uiautomationtools.models.model_conversion import generate_steps, step_expander
+import ast
+from concurrent.futures import ProcessPoolExecutor
+from uiautomationtools.models.model_conversion import drawio_to_model
+from uiautomationtools.models.project_index import get_index, file_hash
 import uiautomationtools.helpers.directory_helpers as dh
 
+IDENT = "    "
+CACHE_VERSION = 2
+METHOD_TEMPLATE = ('{1}def {0}(self):\n'
+                   '{1}{2}raise NotImplementedError("The {0} method has not been implemented yet.")\n\n')
+
 
 class CodeGeneratorException(Exception):
     """Exception when error occurs while generating the class code."""
 
 
+def model_methods(model_file: str) -> List[str]:
+    """
+    Reads the test methods (e_/v_) of a drawio model from its vertices and edges.
+
+    Args:
+        model_file: The path to the model draw.io file.
+
+    Returns:
+        methods: The sorted method names.
+    """
+    model = drawio_to_model(model_file)['models'][0]
+    return sorted({e['name'] for e in model['vertices'] + model['edges'] if e['name'][:2] in ('e_', 'v_')})
+
+
+def parse_test_module(path: str) -> Dict[str, Dict]:
+    """
+    Reads the classes of a test module with ast.
+
+    Args:
+        path: The path of the test module.
+
+    Returns:
+        classes: The methods, last line, lone 'pass' line and column, whether the 'pass' shares the line of the class
+                 header (class TestX(Base): pass) and body indentation by class name.
+    """
+    with open(path) as file:
+        source = file.read()
+    try:
+        tree = ast.parse(source, path)
+    except SyntaxError as e:
+        raise CodeGeneratorException(f'Unable to parse the test module: {path} - {e}')
+
+    lines = source.splitlines()
+    classes = {}
+    for node in tree.body:
+        if isinstance(node, ast.ClassDef):
+            methods = [n.name for n in node.body if isinstance(n, (ast.FunctionDef, ast.AsyncFunctionDef))]
+            methods += [t.id for n in node.body if isinstance(n, ast.Assign) for t in n.targets
+                        if isinstance(t, ast.Name)]
+            first = node.body[0]
+            lone_pass = len(node.body) == 1 and isinstance(first, ast.Pass)
+            inline = bool(lines[first.lineno - 1][:first.col_offset].strip())
+            classes[node.name] = {'methods': methods, 'end': node.end_lineno,
+                                  'pass': first.lineno if lone_pass else None,
+                                  'pass_col': first.col_offset if lone_pass else None,
+                                  'inline': inline,
+                                  'indent': node.col_offset + len(IDENT) if inline else first.col_offset}
+    return classes
+
+
+class TestClassCache(object):
+    """
+    The classes of the test modules and the methods of the models, persisted in
+    <root>/.uiautomationtools/code_generator.json and reused while the files are unchanged.
+    """
+
+    def __init__(self, root: str = None):
+        """
+        Init method.
+
+        Args:
+            root: The root dir of the project - defaults to dh.get_root_dir().
+        """
+        root = root or dh.get_root_dir()
+        self.path = f'{root}/.uiautomationtools/code_generator.json'
+        self.index = get_index(root)
+        stored = dh.load_json(self.path)
+        if stored.get('version') != CACHE_VERSION:
+            stored = {}
+        self.modules = stored.get('modules', {})
+        self.models = stored.get('models', {})
+        self.changed = False
+
+    def classes(self, path: str) -> Dict[str, Dict]:
+        """
+        Returns the classes of a test module - parsed again when its mtime or size changed.
+
+        Args:
+            path: The path of the test module.
+
+        Returns:
+            classes: See parse_test_module.
+        """
+        stat = os.stat(path)
+        entry = self.modules.get(path)
+        if not entry or entry['mtime'] != stat.st_mtime or entry['size'] != stat.st_size:
+            entry = self.modules[path] = {'mtime': stat.st_mtime, 'size': stat.st_size,
+                                          'classes': parse_test_module(path)}
+            self.changed = True
+        return entry['classes']
+
+    def methods(self, model_file: str) -> List[str]:
+        """
+        Returns the test methods of a model - read again when its content changed.
+
+        Args:
+            model_file: The path to the model draw.io file.
+
+        Returns:
+            methods: See model_methods.
+        """
+        digest = (self.index.models.get(model_file) or {}).get('hash') or file_hash(model_file)
+        entry = self.models.get(model_file)
+        if not entry or entry['hash'] != digest:
+            entry = self.models[model_file] = {'hash': digest, 'methods': model_methods(model_file)}
+            self.changed = True
+        return entry['methods']
+
+    def save(self):
+        """
+        This persists the cache when it changed.
+        """
+        if self.changed:
+            dh.make_json({'version': CACHE_VERSION, 'modules': self.modules, 'models': self.models}, self.path,
+                         atomic=True)
+            self.changed = False
+
+
 class CodeGenerator():
 
     def __init__(self, app: str = None):
@@ -22,6 +148,7 @@ class CodeGenerator():
         self.root = f'{dh.get_root_dir()}/tests'
         self.models_dir = f'{self.root}/{{0}}/models'
         self.ui_automation_dir = f'{self.root}/{{0}}/ui_automation'
+        self.cache = None
 
     def get_model_path_from_model_name(self, model_name: str) -> str:
         """
@@ -46,43 +173,57 @@ class CodeGenerator():
 
         return path[0]
 
-    def build(self) -> List[str]:
+    def build(self, workers: int = 1) -> List[str]:
         """
-        Generates the empty test classes for models without test class.
+        Generates the empty test classes for models without test class in a single sweep. The methods are read
+        from the vertices and edges of the models, no steps are generated.
+
+        Args:
+            workers: The number of processes reading the models - 1 reads them in the current process.
 
         Returns:
             created_files: The list of created files.
         """
-        def compare(e):
-            return (len(e.split(os.sep)))
-
-        models = sorted(self.get_orphan_test_cases(), key=compare, reverse=True)
+        get_index().refresh()
+        models = self.get_orphan_test_cases()
 
-        steps = []
-        created_files = []
-        while len(models) > 0:
-            test_classes = {}
-            model = models[0]
+        missing = self.get_missing_imports(models)
+        if missing:
+            raise CodeGeneratorException('Imported models not found: ' + ', '.join(
+                f'{model} imports {", ".join(names)}' for model, names in missing.items()))
 
-            steps = generate_steps(model_name=model.split(os.sep)[-1], new_steps=True, app_dir=self.app)
-            steps = step_expander(steps, app_dir=self.app)
+        if workers == 1 or len(models) < 2:
+            methods = [model_methods(model) for model in models]
+        else:
+            with ProcessPoolExecutor(max_workers=workers) as executor:
+                methods = list(executor.map(model_methods, models))
 
-            for step in steps:
-                if step['modelName'] in test_classes.keys():
-                    if step['name'].startswith('e_') or step['name'].startswith('v_'):
-                        test_classes[step['modelName']].add(step['name'])
-                else:
-                    test_classes[step['modelName']] = set()
-                    if step['name'].startswith('e_') or step['name'].startswith('v_'):
-                        test_classes[step['modelName']].add(step['name'])
+        created_files = []
+        for model, test_methods in zip(models, methods):
+            model_name = os.path.splitext(os.path.basename(model))[0]
+            new_files = self.create_test_class_file(model_name, test_methods)
+            created_files += [file for file in new_files if file is not None]
+        return created_files
 
-            for model, methods in test_classes.items():
-                new_files = self.create_test_class_file(model, methods)
-                created_files += [file for file in new_files if file is not None]
+    def get_missing_imports(self, models: List[str]) -> Dict[str, List[str]]:
+        """
+        Finds the imported (i_) models which do not exist, from the imports stored in the project index.
 
-            models = sorted(self.get_orphan_test_cases(), key=compare, reverse=True)
+        Args:
+            models: The paths of the models.
 
-        return created_files
+        Returns:
+            missing: The names of the missing models by model name.
+        """
+        index = get_index()
+        names = {name.split('.')[0] for name in index.files('models', self.app)}
+        missing = {}
+        for model in models:
+            imports = index.imports(model)
+            not_found = [name for name in imports if name not in names]
+            if not_found:
+                missing[os.path.splitext(os.path.basename(model))[0]] = not_found
+        return missing
 
     def create_test_class_file(self, test_model: str, test_methods: List[str]) -> List[str]:
         """
@@ -97,9 +238,7 @@ class CodeGenerator():
         """
         import_ = "from src.infrastructure.appium.appium_base_pytest import AppiumBasePytest"
         class_name = "class {0}(AppiumBasePytest):"
-        ident = "    "
-        method_template = f'{ident}def {{0}}(self):\n{ident}{ident}raise NotImplementedError("The {{0}} method has not been implemented yet.")\n\n'
-        empty_class_body = f"{ident}pass"
+        empty_class_body = f"{IDENT}pass"
 
         filename_no_ext = os.path.splitext(os.path.basename(test_model))[0]
         testclass_filename = self.get_model_path_from_model_name(test_model).replace("/models/", "/ui_automation/").replace(".drawio", ".py")
@@ -115,8 +254,8 @@ class CodeGenerator():
             open(filename, "w").close()
             created_files.append(filename)
 
-        # TODO If class already exists, just add the new methods
         if os.path.exists(testclass_filename):
+            self.add_test_methods(testclass_filename, self.get_test_class_name(filename_no_ext), test_methods)
             return created_files
 
         with open(testclass_filename, "w") as file:
@@ -129,12 +268,108 @@ class CodeGenerator():
                 file.write(empty_class_body)
             else:
                 for method in test_methods:
-                    file.write(method_template.format(method))
+                    file.write(METHOD_TEMPLATE.format(method, IDENT, IDENT))
 
             created_files.append(testclass_filename)
+        get_index().add_file(testclass_filename)
 
         return created_files
 
+    def get_cache(self) -> TestClassCache:
+        """
+        Returns the cache of the parsed test modules and models.
+
+        Returns:
+            cache: The test class cache.
+        """
+        if self.cache is None:
+            self.cache = TestClassCache(os.path.dirname(self.root))
+        return self.cache
+
+    def get_missing_methods(self) -> Dict[str, Dict[str, List[str]]]:
+        """
+        Compares the methods of the models against their existing test classes. Models without test class are
+        left to build.
+
+        Returns:
+            missing: The missing methods by class name by test module.
+        """
+        get_index().refresh()
+        cache = self.get_cache()
+        test_modules = set(self.get_test_classes())
+        missing = {}
+        for model in self.get_models():
+            test_module = model.replace("/models/", "/ui_automation/").replace(".drawio", ".py")
+            if test_module not in test_modules:
+                continue
+            class_name = self.get_test_class_name(os.path.splitext(os.path.basename(model))[0])
+            test_class = cache.classes(test_module).get(class_name)
+            if test_class is None:
+                continue
+            methods = [method for method in cache.methods(model) if method not in test_class['methods']]
+            if methods:
+                missing.setdefault(test_module, {})[class_name] = methods
+        cache.save()
+        return missing
+
+    def add_missing_methods(self, dry_run: bool = False) -> Dict[str, Dict[str, List[str]]]:
+        """
+        Appends the methods missing from the existing test classes, the rest of the modules is left untouched.
+
+        Args:
+            dry_run: True to only report the missing methods.
+
+        Returns:
+            missing: The added (or missing when dry_run) methods by class name by test module.
+        """
+        missing = self.get_missing_methods()
+        if not dry_run:
+            for test_module, classes in missing.items():
+                for class_name, methods in classes.items():
+                    self.add_test_methods(test_module, class_name, methods)
+        return missing
+
+    def add_test_methods(self, test_module: str, class_name: str, test_methods: List[str]) -> List[str]:
+        """
+        Appends empty methods at the end of an existing test class. A lone 'pass' body is replaced - one on the
+        line of the class header (class TestX(Base): pass) is removed from it.
+
+        Args:
+            test_module: The path of the test module.
+            class_name: The name of the test class.
+            test_methods: The methods which should be in the class.
+
+        Returns:
+            added_methods: The methods which were missing.
+        """
+        test_class = self.get_cache().classes(test_module).get(class_name)
+        if test_class is None:
+            raise CodeGeneratorException(f'Class: {class_name} not found in {test_module}')
+        methods = [method for method in test_methods if method not in test_class['methods']]
+        if not methods:
+            return []
+
+        indent = " " * test_class['indent']
+        stubs = "".join(METHOD_TEMPLATE.format(method, indent, IDENT) for method in methods).rstrip("\n") + "\n"
+        with open(test_module) as file:
+            lines = file.readlines()
+        end = test_class['end']
+        if test_class['pass'] and test_class['inline']:
+            line = lines[test_class['pass'] - 1]
+            header = line[:test_class['pass_col']].rstrip()
+            rest = line[test_class['pass_col'] + len('pass'):].strip().lstrip(';').strip()
+            header = f"{header}  {rest}" if rest.startswith('#') else header
+            lines[test_class['pass'] - 1:end] = [f"{header}\n", stubs]
+        elif test_class['pass']:
+            lines[test_class['pass'] - 1:end] = [stubs]
+        else:
+            if not lines[end - 1].endswith("\n"):
+                lines[end - 1] += "\n"
+            lines[end:end] = ["\n", stubs]
+        with open(test_module, "w") as file:
+            file.writelines(lines)
+        return methods
+
     def get_test_class_name(self, filename_no_ext: str) -> str:
         """
         Returns the test class name in the expected format.
@@ -169,9 +404,8 @@ class CodeGenerator():
         Returns:
             models_path: A list of all files which contains the model_name
         """
-
-        matching = [model for model in self.get_models() if model.endswith(model_name)]
-        return matching
+        matching = get_index().model_paths(os.path.basename(model_name), self.app)
+        return [model for model in matching if model.endswith(model_name)]
 
     def get_models(self) -> List[str]:
         """
@@ -180,7 +414,8 @@ class CodeGenerator():
         Returns:
             models: The models of the repo. Can be empty.
         """
-        return [file for file in self.get_all_files_from_directory(self.models_dir.format(self.app)) if file.endswith('.drawio')]
+        models = get_index().files('models', self.app)
+        return [path for name, paths in models.items() if name.endswith('.drawio') for path in paths]
 
     def get_test_classes(self) -> List[str]:
         """
@@ -189,7 +424,8 @@ class CodeGenerator():
         Returns:
             test_classes_files: The test_classes_files of the repo. Can be empty.
         """
-        return [file for file in self.get_all_files_from_directory(self.ui_automation_dir.format(self.app)) if file.endswith('.py')]
+        test_modules = get_index().files('tests', self.app)
+        return [path for paths in test_modules.values() for path in paths if '/ui_automation/' in path]
 
     def get_all_files_from_directory(self, directory: str) -> List[str]:
         """
@@ -204,12 +440,13 @@ class CodeGenerator():
         return [model for model in iglob(f'{directory}/**', recursive=True)]
 
 
-def create_empty_test_class_models(app_dir: str = None):
+def create_empty_test_class_models(app_dir: str = None, workers: int = 1):
     """
     Creates all the missing test classes the test model requires.
 
     Args:
         app_dir: App under test folder's name.
+        workers: The number of processes reading the models.
     """
     created_files = []
     code = CodeGenerator()
@@ -217,12 +454,12 @@ def create_empty_test_class_models(app_dir: str = None):
     if app_dir is None or app_dir == "":
         for app in apps:
             code.app = app
-            new_files = code.build()
+            new_files = code.build(workers)
             created_files += [file for file in new_files if file is not None]
     else:
         if app_dir in apps:
             code.app = app_dir
-            new_files = code.build()
+            new_files = code.build(workers)
             created_files += [file for file in new_files if file is not None]
         else:
             raise CodeGeneratorException(f'The app_dir: {app_dir} folder does not exist in the test folder.')
@@ -233,3 +470,35 @@ def create_empty_test_class_models(app_dir: str = None):
     else:
         print(f"{num_files} test classes have been generated:")
         print('\n'.join(created_files))
+
+
+def add_missing_test_methods(app_dir: str = None, dry_run: bool = False) -> Dict[str, Dict[str, List[str]]]:
+    """
+    Adds the methods the models require to the existing test classes.
+
+    Args:
+        app_dir: App under test folder's name - every app when None.
+        dry_run: True to only report the missing methods.
+
+    Returns:
+        missing: The added (or missing when dry_run) methods by class name by test module.
+    """
+    code = CodeGenerator()
+    apps = [app for app in os.listdir(code.root) if os.path.isdir(os.path.join(code.root, app))]
+    if app_dir and app_dir not in apps:
+        raise CodeGeneratorException(f'The app_dir: {app_dir} folder does not exist in the test folder.')
+
+    missing = {}
+    for app in ([app_dir] if app_dir else apps):
+        code.app = app
+        missing.update(code.add_missing_methods(dry_run))
+
+    num_methods = sum(len(methods) for classes in missing.values() for methods in classes.values())
+    if num_methods == 0:
+        print("The test classes are up to date. 0 methods are missing.")
+    else:
+        print(f"{num_methods} methods {'are missing' if dry_run else 'have been added'}:")
+        for test_module, classes in missing.items():
+            for class_name, methods in classes.items():
+                print(f"{test_module}::{class_name}: {', '.join(methods)}")
+    return missing
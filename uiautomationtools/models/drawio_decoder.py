@@ -0,0 +1,142 @@
+import io
+import re
+import zlib
+import base64
+from html import unescape
+from typing import Dict, List
+from urllib.parse import unquote
+import xml.etree.ElementTree as ET
+from concurrent.futures import ThreadPoolExecutor
+
+_HTML_TAGS = re.compile(r'<[^>]*>')
+_STEP_NAME = re.compile(r'[evi]+(?:_[a-z0-9]+)+')
+
+
+def strip_html(text: str) -> str:
+    """
+    This removes the html markup drawio adds to the labels.
+
+    Args:
+        text: The html label.
+
+    Returns:
+        text: The text of the label.
+    """
+    return unescape(_HTML_TAGS.sub('', text))
+
+
+def clean_value(cell: Dict) -> Dict:
+    """
+    This turns the label of a cell into 'step_name' or 'step_name|actions'.
+
+    Args:
+        cell: The attributes of the mxCell.
+
+    Returns:
+        cell: The attributes with the cleaned value.
+    """
+    value = cell.get('value')
+    if not value:
+        return cell
+
+    step_name = _STEP_NAME.search(value)
+    step_name = step_name.group(0) if step_name else value
+
+    actions = value.replace(step_name, '')
+    if '=' in actions:
+        text = strip_html(actions).strip()
+        actions = f'|{text[1:].strip()}'
+
+    cell['value'] = f'{step_name}{actions}'
+    return cell
+
+
+def _iter_cells(xml: bytes) -> List[Dict]:
+    """
+    This stream parses the mxCell attributes of a decoded page.
+
+    Args:
+        xml: The mxGraphModel xml.
+
+    Returns:
+        cells: The attributes of the cells in document order.
+    """
+    cells = []
+    for _, element in ET.iterparse(io.BytesIO(xml), events=('end',)):
+        if element.tag == 'mxCell':
+            cells.append(dict(element.attrib))
+            element.clear()
+    return cells
+
+
+def _unquote(data: bytes) -> bytes:
+    """
+    This url decodes bytes. The %XX escapes are rewritten to \\xXX so the C unicode_escape codec does the work.
+
+    Args:
+        data: The url encoded bytes.
+
+    Returns:
+        data: The decoded bytes.
+    """
+    try:
+        return data.replace(b'\\', b'\\\\').replace(b'%', b'\\x').decode('unicode_escape').encode('latin-1')
+    except UnicodeDecodeError:
+        return unquote(data.decode('utf-8')).encode('utf-8')
+
+
+def _inflate_page(data: str) -> List[Dict]:
+    """
+    This decodes a compressed page (base64 > raw deflate > url encoding).
+
+    Args:
+        data: The text of the <diagram> element.
+
+    Returns:
+        cells: The attributes of the cells of the page.
+    """
+    return _iter_cells(_unquote(zlib.decompress(base64.b64decode(data), -15)))
+
+
+def decode_drawio(path: str, workers: int = None) -> Dict[str, Dict]:
+    """
+    This decodes every page of a drawio file in memory - compressed and uncompressed pages are both supported.
+
+    Args:
+        path: The path of the drawio file.
+        workers: The number of threads decoding compressed pages.
+
+    Returns:
+        nodes: The cleaned mxCell attributes by cell id.
+    """
+    with open(path, 'rb') as fp:
+        data = fp.read()
+
+    pages = []
+    compressed = {}
+    current = None
+    for event, element in ET.iterparse(io.BytesIO(data), events=('start', 'end')):
+        if event == 'start':
+            if element.tag == 'diagram' or (element.tag == 'mxGraphModel' and current is None):
+                current = []
+                pages.append(current)
+            continue
+
+        if element.tag == 'mxCell':
+            current.append(dict(element.attrib))
+            element.clear()
+        elif element.tag == 'diagram':
+            if not current and (element.text or '').strip():
+                compressed[len(pages) - 1] = element.text.strip()
+            current = None
+            element.clear()
+
+    if len(compressed) > 1:
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            for index, cells in zip(compressed, executor.map(_inflate_page, compressed.values())):
+                pages[index] = cells
+    else:
+        for index, page in compressed.items():
+            pages[index] = _inflate_page(page)
+
+    return {cell['id']: clean_value(cell) for cells in pages for cell in cells if 'id' in cell}
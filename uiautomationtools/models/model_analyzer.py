@@ -0,0 +1,360 @@
+from typing import Callable, Dict, Iterable, List, NamedTuple
+import os
+import sys
+import zlib
+import binascii
+import argparse
+import xml.etree.ElementTree as ET
+from time import perf_counter
+
+from uiautomationtools.models.drawio_decoder import decode_drawio
+from uiautomationtools.models.text_converter import TextConverter, TextConverterException
+from uiautomationtools.models.project_index import get_index
+import uiautomationtools.helpers.directory_helpers as dh
+
+START = ''
+
+
+class ModelAnalyzerException(Exception):
+    """Exception when the models are not valid."""
+
+
+class Diagnostic(NamedTuple):
+    """
+    A problem found in a model.
+    """
+    level: str
+    model: str
+    message: str
+
+    def __str__(self) -> str:
+        return f'{self.level}: {self.model}: {self.message}'
+
+
+def read_graph(model_file: str) -> Dict:
+    """
+    This reads the vertices and edges of a drawio/txt model as drawn - the edges drawio_to_model drops are kept.
+
+    Args:
+        model_file: The path of the drawio/txt model.
+
+    Returns:
+        graph: The 'starts' count, the 'vertices' names by id, the 'edges' (name, source, target) by id (the source
+               of the edges leaving the Start element is START) and the 'labels' not attached to an edge.
+    """
+    graph = {'starts': 0, 'vertices': {}, 'edges': {}, 'labels': []}
+    if model_file.endswith('.txt'):
+        model = TextConverter().to_model(model_file)['models'][0]
+        graph['starts'] = 1
+        graph['vertices'] = {v['id']: v['name'] for v in model['vertices']}
+        graph['edges'] = {e['id']: (e['name'], e.get('sourceVertexId', START), e['targetVertexId'])
+                          for e in model['edges']}
+        return graph
+
+    attrs = decode_drawio(model_file)
+    starts = set()
+    for a in attrs.values():
+        value = (a.get('value') or '').split('|')[0]
+        if value == 'Start':
+            starts.add(a['id'])
+        elif a.get('parent') == a.get('vertex') and value:
+            graph['vertices'][a['id']] = value
+        elif a.get('parent') != a.get('vertex') and value:
+            parent = attrs.get(a['parent'], {})
+            if not parent.get('edge'):
+                graph['labels'].append(value)
+                continue
+            graph['edges'][a['id']] = (value, parent.get('source'), parent.get('target'))
+
+    graph['starts'] = len(starts)
+    for edge_id, (name, source, target) in graph['edges'].items():
+        if source in starts:
+            graph['edges'][edge_id] = (name, START, target)
+    return graph
+
+
+def strongly_connected_components(nodes: Iterable[str], successors: Callable) -> List[List[str]]:
+    """
+    This finds the strongly connected components of a graph (iterative Tarjan, linear time).
+
+    Args:
+        nodes: The nodes of the graph.
+        successors: The function returning the successors of a node.
+
+    Returns:
+        components: The components in reverse topological order (a component only reaches the previous ones).
+    """
+    index = {}
+    low = {}
+    stack = []
+    on_stack = set()
+    components = []
+    for root in nodes:
+        if root in index:
+            continue
+        index[root] = low[root] = len(index)
+        stack.append(root)
+        on_stack.add(root)
+        work = [(root, iter(successors(root)))]
+        while work:
+            node, children = work[-1]
+            for child in children:
+                if child not in index:
+                    index[child] = low[child] = len(index)
+                    stack.append(child)
+                    on_stack.add(child)
+                    work.append((child, iter(successors(child))))
+                    break
+                if child in on_stack:
+                    low[node] = min(low[node], index[child])
+            else:
+                work.pop()
+                if work:
+                    low[work[-1][0]] = min(low[work[-1][0]], low[node])
+                if low[node] == index[node]:
+                    component = []
+                    while True:
+                        member = stack.pop()
+                        on_stack.discard(member)
+                        component.append(member)
+                        if member == node:
+                            break
+                    components.append(component)
+    return components
+
+
+def analyze_graph(graph: Dict, model: str) -> List[Diagnostic]:
+    """
+    This checks the Start element, the dangling edges, the reachability and the dead ends of a model.
+
+    Args:
+        graph: The graph of read_graph.
+        model: The name (or path) of the model in the diagnostics.
+
+    Returns:
+        diagnostics: The problems found.
+    """
+    diagnostics = []
+
+    def error(message):
+        diagnostics.append(Diagnostic('error', model, message))
+
+    vertices, edges = graph['vertices'], graph['edges']
+    if not graph['starts']:
+        error("The model does not have a 'Start' element.")
+    elif graph['starts'] > 1:
+        error(f"The model has {graph['starts']} 'Start' elements.")
+    for label in graph['labels']:
+        error(f'The label {label} is not attached to an edge - drag it on an edge.')
+
+    out_edges = {START: [], **{v: [] for v in vertices}}
+    for edge_id, (name, source, target) in edges.items():
+        if source is None or target is None:
+            error(f"The edge {name} ({edge_id}) has no {'source' if source is None else 'target'} vertex.")
+        elif source not in out_edges or target not in vertices:
+            missing = source if source not in out_edges else target
+            error(f'The edge {name} ({edge_id}) is connected to {missing} which is not a named vertex.')
+        else:
+            out_edges[source].append(edge_id)
+
+    if graph['starts'] == 1:
+        start_edges = out_edges[START]
+        if not start_edges:
+            error("The 'Start' element is not connected to an edge.")
+        elif len(start_edges) > 1:
+            error(f"The 'Start' element has {len(start_edges)} edges "
+                  f"({', '.join(sorted(edges[e][0] for e in start_edges))}) - only one can be the start edge.")
+
+    reached = {START}
+    queue = [START]
+    for vertex in queue:
+        for edge_id in out_edges[vertex]:
+            target = edges[edge_id][2]
+            if target not in reached:
+                reached.add(target)
+                queue.append(target)
+    unreachable = sorted(vertices[v] for v in vertices if v not in reached)
+    if unreachable and out_edges[START]:
+        error(f"The vertices are not reachable from 'Start': {', '.join(unreachable)}.")
+
+    successors = {v: [edges[e][2] for e in out_edges[v]] for v in queue}
+    components = strongly_connected_components(queue, successors.__getitem__)
+    member_of = {v: i for i, component in enumerate(components) for v in component}
+    terminal = [c for i, c in enumerate(components)
+                if not any(member_of[t] != i for v in c for t in successors[v])]
+    if len(terminal) > 1:
+        for component in terminal:
+            names = ', '.join(sorted(vertices[v] for v in component))
+            kind = 'dead end' if len(component) == 1 and not successors[component[0]] else 'cycle without exit'
+            diagnostics.append(Diagnostic('warning', model, f'The walk can not leave the {kind}: {names} - '
+                                                            f'the edges outside of it may never be covered.'))
+    return diagnostics
+
+
+_model_store = {}
+
+
+def analyze_model(model_file: str) -> tuple:
+    """
+    This analyzes one model - the results are kept while the file is unchanged.
+
+    Args:
+        model_file: The path of the drawio/txt model.
+
+    Returns:
+        diagnostics: The problems found.
+        imports: The names of the imported models (i_name -> test_name).
+    """
+    try:
+        stat = os.stat(model_file)
+    except OSError:
+        return [Diagnostic('error', model_file, 'The model file is not found.')], set()
+
+    key = (stat.st_mtime, stat.st_size)
+    stored = _model_store.get(model_file)
+    if stored and stored[0] == key:
+        return stored[1], stored[2]
+
+    try:
+        graph = read_graph(model_file)
+    except (zlib.error, binascii.Error, ET.ParseError) as e:
+        diagnostics, imports = [Diagnostic('error', model_file, f'The drawio file can not be decoded: {e}')], set()
+    except (TextConverterException, SyntaxError) as e:
+        diagnostics, imports = [Diagnostic('error', model_file, str(e))], set()
+    else:
+        diagnostics = analyze_graph(graph, model_file)
+        imports = {f'test_{name[2:]}' for name, _, _ in graph['edges'].values() if name[:2] == 'i_'}
+    _model_store[model_file] = (key, diagnostics, imports)
+    return diagnostics, imports
+
+
+def analyze_models(models: Dict[str, List[str]]) -> List[Diagnostic]:
+    """
+    This analyzes the models of an app and their imports: the imported models not found and the import cycles.
+
+    Args:
+        models: The paths of the models by model name (more than one path is a duplicate).
+
+    Returns:
+        diagnostics: The problems found.
+    """
+    diagnostics = []
+    imports = {}
+    for name in sorted(models):
+        paths = models[name]
+        if len(paths) > 1:
+            diagnostics.append(Diagnostic('error', name, f'The model is found {len(paths)} times: {paths}. '
+                                                         f'Please ensure each filename is unique.'))
+        model_diagnostics, imports[name] = analyze_model(paths[0])
+        diagnostics.extend(model_diagnostics)
+        for imported in sorted(imports[name] - models.keys()):
+            diagnostics.append(Diagnostic('error', paths[0], f'The imported model {imported} is not found.'))
+
+    successors = {name: sorted(imported & models.keys()) for name, imported in imports.items()}
+    for component in strongly_connected_components(sorted(successors), successors.__getitem__):
+        if len(component) > 1 or component[0] in successors[component[0]]:
+            diagnostics.append(Diagnostic('error', models[component[0]][0], f"Import cycle detected between the "
+                                                                            f"models: {', '.join(sorted(component))}"))
+    return diagnostics
+
+
+def app_models(root: str, app_dir: str) -> Dict[str, List[str]]:
+    """
+    This lists the models of an app from the project index - the drawio first when both exist, like
+    generate_steps.
+
+    Args:
+        root: The root dir of the project.
+        app_dir: App under test folder's name.
+
+    Returns:
+        models: The paths of the models by model name.
+    """
+    table = get_index(root).tables.get('models', {}).get(app_dir, {})
+    models = {}
+    for file_name in sorted(table, key=lambda n: n.endswith('.txt')):
+        name = file_name.split('.')[0]
+        if name in models and os.path.splitext(models[name][0])[1] != os.path.splitext(file_name)[1]:
+            continue
+        models.setdefault(name, []).extend(table[file_name])
+    return models
+
+
+def analyze_project(root: str = None, app_dir: str = None) -> List[Diagnostic]:
+    """
+    This analyzes every model of the tests tree.
+
+    Args:
+        root: The root dir of the project - defaults to dh.get_root_dir().
+        app_dir: Only this app under test folder - all the apps when None.
+
+    Returns:
+        diagnostics: The problems found.
+    """
+    root = root or dh.get_root_dir()
+    index = get_index(root)
+    index.refresh()
+    diagnostics = []
+    for app in sorted(index.tables.get('models', {})):
+        if not app_dir or app == app_dir:
+            diagnostics.extend(analyze_models(app_models(root, app)))
+    return diagnostics
+
+
+def check_model(model_name: str, app_dir: str, root: str = None) -> List[Diagnostic]:
+    """
+    This analyzes a model and the models it imports (transitively) and fails on the first errors.
+
+    Args:
+        model_name: The name of the model - no extension needed.
+        app_dir: App under test folder's name.
+        root: The root dir of the project - defaults to dh.get_root_dir().
+
+    Returns:
+        warnings: The warnings found.
+
+    Raises:
+        ModelAnalyzerException: Raised when the model or one of its imports is not valid.
+    """
+    models = app_models(root or dh.get_root_dir(), app_dir)
+    selection = {}
+    stack = [model_name.split('.')[0]]
+    while stack:
+        name = stack.pop()
+        if name in selection or name not in models:
+            continue
+        selection[name] = models[name]
+        stack.extend(analyze_model(models[name][0])[1])
+    if not selection:
+        raise ModelAnalyzerException(f'The model: {model_name} is not found in the app: {app_dir}')
+
+    diagnostics = analyze_models(selection)
+    errors = [str(d) for d in diagnostics if d.level == 'error']
+    if errors:
+        raise ModelAnalyzerException('The models are not valid:\n' + '\n'.join(errors))
+    return diagnostics
+
+
+def main(args: List[str] = None):
+    """
+    The analyze-models console entry point.
+
+    Args:
+        args: The command line arguments.
+    """
+    parser = argparse.ArgumentParser(description='Checks every model of the tests tree before generating steps.')
+    parser.add_argument('--app', dest='app_dir', default=None, help='Only this app under test folder.')
+    parser.add_argument('--root', default=None, help='The root dir of the project.')
+    parser.add_argument('--strict', action='store_true', help='Fail on warnings too.')
+    options = parser.parse_args(args)
+
+    start = perf_counter()
+    diagnostics = analyze_project(options.root, options.app_dir)
+    for diagnostic in diagnostics:
+        print(diagnostic)
+    errors = sum(d.level == 'error' for d in diagnostics)
+    warnings = len(diagnostics) - errors
+    print(f'{len(_model_store)} models analyzed in {(perf_counter() - start) * 1000:.1f} ms: '
+          f'{errors} errors, {warnings} warnings.')
+    if errors or (options.strict and warnings):
+        sys.exit(1)
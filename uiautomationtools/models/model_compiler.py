@@ -0,0 +1,293 @@
+from typing import Dict, Iterable, List
+import os
+import argparse
+import threading
+from time import perf_counter, monotonic
+from concurrent.futures import ProcessPoolExecutor
+
+from uiautomationtools.models.model_conversion import generate_steps, clear_import_cache, BACKENDS
+from uiautomationtools.models.project_index import get_index, model_imports
+import uiautomationtools.helpers.directory_helpers as dh
+
+
+class ModelCompilerException(Exception):
+    """Exception when error occurs while precompiling the models."""
+
+
+def discover_models(root: str, app_dir: str = None) -> Dict[str, Dict[str, str]]:
+    """
+    This finds every drawio/txt model under tests/*/models from the project index (the drawio wins when both
+    exist, like generate_steps).
+
+    Args:
+        root: The root dir of the project.
+        app_dir: Only this app under test folder - all the apps when None.
+
+    Returns:
+        models: The model paths by model name by app.
+    """
+    index = get_index(root)
+    index.refresh()
+    models = {}
+    for app, table in sorted(index.tables.get('models', {}).items()):
+        if app_dir and app != app_dir:
+            continue
+        for name in sorted(table, key=lambda n: n.endswith('.txt')):
+            models.setdefault(app, {}).setdefault(name.split('.')[0], table[name][0])
+    return models
+
+
+def import_levels(models: Dict[str, str]) -> List[List[str]]:
+    """
+    This orders models so the imported ones come first. Imports outside of the given models are ignored.
+
+    Args:
+        models: The model paths by model name.
+
+    Returns:
+        levels: The model names by level - a level only imports models of the previous levels.
+    """
+    imports = {name: model_imports(path) & models.keys() for name, path in models.items()}
+    levels = []
+    done = set()
+    while len(done) < len(imports):
+        level = sorted(n for n, i in imports.items() if n not in done and i <= done)
+        if not level:
+            cycle = sorted(n for n in imports if n not in done)
+            raise ModelCompilerException(f"Import cycle detected between the models: {', '.join(cycle)}")
+        levels.append(level)
+        done.update(level)
+    return levels
+
+
+def is_stale(model_file: str, steps_file: str) -> bool:
+    """
+    This checks whether the steps of a model have to be generated.
+
+    Args:
+        model_file: The path of the drawio/txt model.
+        steps_file: The path of the steps json.
+
+    Returns:
+        stale: True when the steps are missing or older than the model.
+    """
+    try:
+        return os.stat(steps_file).st_mtime < os.stat(model_file).st_mtime
+    except OSError:
+        return True
+
+
+def _compile(model_name: str, app_dir: str, generator: str, backend: str) -> float:
+    """
+    This generates the steps of one model (in a worker process).
+
+    Args:
+        model_name: The name of the model.
+        app_dir: App under test folder's name.
+        generator: The method used for building the steps.
+        backend: The path generator backend.
+
+    Returns:
+        seconds: The time spent.
+    """
+    start = perf_counter()
+    generate_steps(model_name, True, generator, app_dir, backend)
+    return perf_counter() - start
+
+
+def _compile_models(selection: Dict[str, Dict[str, str]], workers: int, generator: str,
+                    backend: str) -> Dict[str, float]:
+    """
+    This generates the steps of the selected models level by level (imported models first) and forgets the
+    compiled imports of the process.
+
+    Args:
+        selection: The model paths by model name by app.
+        workers: The number of processes - 1 compiles in the current process.
+        generator: The method used for building the steps.
+        backend: The path generator backend.
+
+    Returns:
+        timings: The seconds spent by 'app/model_name'.
+    """
+    if backend not in BACKENDS:
+        raise ModelCompilerException(f"Unknown backend: {backend}. Use one of {BACKENDS}.")
+
+    timings = {}
+    failures = []
+    selection = {app: models for app, models in selection.items() if models}
+    executor = ProcessPoolExecutor(max_workers=workers) if workers != 1 and selection else None
+    try:
+        for app, models in selection.items():
+            for level in import_levels(models):
+                if executor:
+                    futures = [executor.submit(_compile, name, app, generator, backend) for name in level]
+                    results = [(name, f.exception() or f.result()) for name, f in zip(level, futures)]
+                else:
+                    results = []
+                    for name in level:
+                        try:
+                            results.append((name, _compile(name, app, generator, backend)))
+                        except Exception as e:
+                            results.append((name, e))
+
+                for name, result in results:
+                    if isinstance(result, Exception):
+                        failures.append(f'{app}/{name}: {result}')
+                        print(f'{app}/{name}: failed - {result}')
+                    else:
+                        timings[f'{app}/{name}'] = result
+                        print(f'{app}/{name}: {result * 1000:.1f} ms')
+            clear_import_cache([f'i_{name[5:]}' for name in models if name[:5] == 'test_'])
+    finally:
+        if executor:
+            executor.shutdown()
+
+    if failures:
+        raise ModelCompilerException('Unable to compile the models:\n' + '\n'.join(failures))
+    print(f'{len(timings)} models compiled.')
+    return timings
+
+
+def precompile(app_dir: str = None, workers: int = None, generator: str = 'random(edge_coverage(100))',
+               backend: str = 'python', force: bool = False) -> Dict[str, float]:
+    """
+    This generates the steps of every stale model of the tests tree and of the models importing them, imported
+    models first, in a process pool. Run it before the test session so the pytest(-xdist) workers find fresh steps.
+
+    Args:
+        app_dir: Only this app under test folder - all the apps when None.
+        workers: The number of processes - 1 compiles in the current process.
+        generator: The method used for building the steps.
+        backend: The path generator - 'python' or 'altwalker'.
+        force: Whether to regenerate fresh steps too.
+
+    Returns:
+        timings: The seconds spent by 'app/model_name'.
+    """
+    root = dh.get_root_dir()
+    index = get_index(root)
+    selection = {}
+    for app, models in discover_models(root, app_dir).items():
+        steps_files = index.files('steps', app)
+        stale = {name for name, path in models.items()
+                 if force or is_stale(path, steps_files.get(f'{name}.json', [''])[0])}
+        stale |= index.dependents(stale, app)
+        selection[app] = {name: path for name, path in models.items() if name in stale}
+    return _compile_models(selection, workers, generator, backend)
+
+
+def recompile(model_files: Iterable[str], workers: int = 1, generator: str = 'random(edge_coverage(100))',
+              backend: str = 'python') -> Dict[str, float]:
+    """
+    This generates the steps of changed models and of the models importing them (transitively).
+
+    Args:
+        model_files: The paths of the changed (or removed) drawio/txt models.
+        workers: The number of processes - 1 compiles in the current process.
+        generator: The method used for building the steps.
+        backend: The path generator - 'python' or 'altwalker'.
+
+    Returns:
+        timings: The seconds spent by 'app/model_name'.
+    """
+    root = dh.get_root_dir()
+    index = get_index(root)
+    changed = {}
+    for path in model_files:
+        app = os.path.relpath(path, f'{root}/tests').split(os.sep)[0]
+        changed.setdefault(app, set()).add(os.path.basename(path).split('.')[0])
+
+    models = discover_models(root)
+    selection = {}
+    for app, names in changed.items():
+        names = names | index.dependents(names, app)
+        selection[app] = {name: path for name, path in models.get(app, {}).items() if name in names}
+    return _compile_models(selection, workers, generator, backend)
+
+
+class ModelWatcher(threading.Thread):
+    """
+    A background thread polling the models of the project and recompiling the changed ones and their dependents
+    once the edits settled down.
+    """
+
+    def __init__(self, interval: float = 1.0, debounce: float = 0.5, workers: int = 1,
+                 generator: str = 'random(edge_coverage(100))', backend: str = 'python'):
+        """
+        Init method.
+
+        Args:
+            interval: The seconds between two polls.
+            debounce: The seconds without changes before recompiling.
+            workers: The number of processes - 1 compiles in the watcher thread.
+            generator: The method used for building the steps.
+            backend: The path generator - 'python' or 'altwalker'.
+        """
+        super().__init__(daemon=True)
+        self.root = dh.get_root_dir()
+        self.interval = interval
+        self.debounce = debounce
+        self.workers = workers
+        self.generator = generator
+        self.backend = backend
+        self.stopped = threading.Event()
+
+    def run(self):
+        """
+        Polls the project index until stopped.
+        """
+        index = get_index(self.root)
+        index.refresh()
+        index.pop_changed_models()
+        pending = set()
+        last_change = 0
+        while not self.stopped.wait(self.interval):
+            index.refresh()
+            changed_models = index.pop_changed_models()
+            if changed_models:
+                pending |= changed_models
+                last_change = monotonic()
+            if pending and monotonic() - last_change >= self.debounce:
+                try:
+                    recompile(sorted(pending), self.workers, self.generator, self.backend)
+                except ModelCompilerException as e:
+                    print(e)
+                pending = set()
+
+    def stop(self):
+        """
+        Stops the polling and waits for the running compilation.
+        """
+        self.stopped.set()
+        self.join()
+
+
+def main(args: List[str] = None):
+    """
+    The precompile-models console entry point.
+
+    Args:
+        args: The command line arguments.
+    """
+    parser = argparse.ArgumentParser(description='Generates the steps of every stale model of the tests tree.')
+    parser.add_argument('--app', dest='app_dir', default=None, help='Only this app under test folder.')
+    parser.add_argument('--workers', type=int, default=None, help='The number of processes.')
+    parser.add_argument('--generator', default='random(edge_coverage(100))', help='The path generator.')
+    parser.add_argument('--backend', default='python', choices=BACKENDS, help='The path generator backend.')
+    parser.add_argument('--force', action='store_true', help='Regenerate fresh steps too.')
+    parser.add_argument('--watch', action='store_true', help='Keep recompiling the models as they change.')
+    parser.add_argument('--interval', type=float, default=1.0, help='The seconds between two polls (--watch).')
+    options = parser.parse_args(args)
+    precompile(options.app_dir, options.workers, options.generator, options.backend, options.force)
+    if not options.watch:
+        return
+
+    watcher = ModelWatcher(options.interval, workers=1, generator=options.generator, backend=options.backend)
+    watcher.start()
+    print('Watching the models - Ctrl+C to stop.')
+    try:
+        while watcher.is_alive():
+            watcher.join(1)
+    except KeyboardInterrupt:
+        watcher.stop()
@@ -1,72 +1,165 @@
-from typing import Dict, List
-import re
+from typing import Dict, Iterable, Iterator, List, Mapping
 import os
-import zlib
-import base64
-import numpy as np
-from glob import iglob
-from copy import deepcopy
+import sys
+import json
 from subprocess import run
-from shutil import copyfile
-from bs4 import BeautifulSoup
-from urllib.parse import unquote
-import xml.etree.ElementTree as ET
+from contextlib import nullcontext
 from uiautomationtools.models.text_converter import TextConverter
+from uiautomationtools.models.path_generator import generate_path, iter_path, covers_whole_model, \
+    PathGeneratorException
+from uiautomationtools.models.steps_cache import StepsCache
+from uiautomationtools.models.drawio_decoder import decode_drawio
+from uiautomationtools.models.project_index import get_index, ProjectIndexException
+from uiautomationtools.models.step import Step
 
 import uiautomationtools.helpers.directory_helpers as dh
-from uiautomationtools.helpers.dictionary_helpers import flatten
 from uiautomationtools.helpers.json_helpers import deserialize
 
 
+BACKENDS = ('python', 'altwalker')
+
+
 class ModelConversionException(Exception):
     """Exception when error occurs while generating the steps."""
 
 
 def find_drawio_xml_nodes(model_name):
     """
-    This finds the nodes of a drawio turned xml file.
+    This finds the nodes of a drawio file (every page, compressed or not) without temporary copies.
 
     Args:
-        model_name (str): The drawio file to xml then parse.
+        model_name (str): The drawio file to parse.
 
     Returns:
-        nodes (list<dict>): The node-attributes of the xml file
+        nodes (dict<dict>): The node-attributes of the xml file by id.
     """
+    return decode_drawio(model_name)
 
-    def clean_values(n):
-        value = n.get('value')
-        if not value:
-            return n
 
-        step_name = re.findall(r'[evi]+(?:_[a-z0-9]+)+', value) or [value]
-        step_name = step_name[0]
+def drawio_to_model(model_file: str, model_name: str = None,
+                    generator: str = 'random(edge_coverage(100))') -> Dict:
+    """
+    This converts a drawio model into the graphwalker json model format.
 
-        actions = value.replace(step_name, '')
-        if '=' in actions:
-            text = BeautifulSoup(actions, 'lxml').text.strip()
-            actions = f'|{text[1:].strip()}'
+    Args:
+        model_file: The path of the drawio file.
+        model_name: The name of the model - defaults to the file name.
+        generator: The method used for building the steps.
 
-        n['value'] = f'{step_name}{actions}'
-        return n
+    Returns:
+        models: The {'models': [...]} json of the drawio model.
+    """
+    model_name = model_name or os.path.basename(model_file).split('.')[0]
+    attrs = find_drawio_xml_nodes(model_file)
+
+    vertex_defaults = {'properties': {'x': 0.0, 'y': 0.0, 'description': ''}}
+    edge_defaults = {'properties': {'description': ''}, 'weight': 0.0, 'dependency': 0}
+
+    start = None
+    vertices = []
+    edges = []
+    for a in attrs.values():
+        actions = None
+        value = a.get('value')
+        if value:
+            value_actions = value.split('|')
+            value = value_actions[0]
+            if value_actions[0] != value_actions[-1]:
+                actions = f'\n{value_actions[-1]}'
+
+        if value == 'Start':
+            start = a
+        elif a.get('parent') == a.get('vertex') and value and value != 'Start':
+            vertex = {'id': f'n/{a["id"]}', 'name': value}
+            vertices.append({**vertex, **vertex_defaults})
+        elif a.get('parent') != a.get('vertex') and value:
+            parent = attrs[a['parent']]
+            source = parent.get('source')
+            target = parent.get('target')
+            if not target:
+                continue
+            edge = {'id': f'e/{a["id"]}', 'name': value,
+                    'sourceVertexId': f"n/{source}", 'targetVertexId': f"n/{target}"}
+            if actions:
+                edge['actions'] = [actions]
+            edges.append({**edge, **edge_defaults})
+
+    if not start:
+        raise ModelConversionException(f"The model: {model_file} does not have a 'Start' element.")
+
+    for e in edges:
+        if start['id'] in e['sourceVertexId']:
+            e['id'] = f'e/{start["id"]}'
+            e.pop('sourceVertexId')
+
+    models = [{'name': model_name, 'id': '',
+               'startElementId': f'e/{start["id"]}', 'generator': generator,
+               'vertices': vertices, 'edges': edges}]
+    return {'models': models}
+
+
+def _walk_model(model_file: str, model_name: str, steps_file: str, generator: str, backend: str,
+                seed: int = None) -> List[Dict]:
+    """
+    This generates the steps of a model with the path generator backend. The text models are linear so their
+    steps are emitted directly unless the generator may stop before the end of the chain.
 
-    xml_file = f'{model_name}.xml'
-    copyfile(model_name, xml_file)
+    Args:
+        model_file: The path of the drawio/txt model.
+        model_name: The name of the model.
+        steps_file: Where altwalker writes the steps.
+        generator: The method used for building the steps.
+        backend: The path generator - 'python' or 'altwalker'.
+        seed: The seed for the path generator (python backend only).
 
-    tree = ET.parse(xml_file)
-    data = list(tree.getroot())[0].text
-    os.remove(xml_file)
+    Returns:
+        steps: The list of step objects.
+    """
+    try:
+        if backend == 'python' and model_file.endswith('.txt') and covers_whole_model(generator):
+            return TextConverter().to_steps(model_file)
 
-    decoded_data = base64.b64decode(data)
-    xml = zlib.decompress(decoded_data, -15)
-    xml = unquote(xml.decode('utf-8'))
+        if model_file.endswith('.drawio'):
+            models = drawio_to_model(model_file, model_name, generator)
+        else:
+            models = TextConverter().to_model(model_file, generator)
+        json_model_file = model_file.replace('.txt', '.json').replace('.drawio', '.json')
+        dh.make_json(models, json_model_file)
+
+        if backend == 'altwalker':
+            run(f'altwalker offline -m {json_model_file} "{generator}" -f {steps_file}', shell=True)
+            return dh.load_json(steps_file)
+        return generate_path(models, generator, seed)
+    except PathGeneratorException as e:
+        raise ModelConversionException(f'Unable to generate the steps of {model_file}: {e}')
+
+
+def find_model_file(model_name: str, app_dir: str) -> str:
+    """
+    This finds the drawio/txt file of a model.
+
+    Args:
+        model_name: The name of the model file - no extension needed.
+        app_dir: App under test folder's name.
+
+    Returns:
+        model_file: The path of the model.
+    """
+    base_path = dh.get_root_dir()
+    try:
+        model = get_index(base_path).model(model_name, app_dir)
+    except ProjectIndexException as e:
+        raise ModelConversionException(str(e))
 
-    bs = BeautifulSoup(xml, 'lxml')
-    nodes = bs.find_all('mxcell')
-    return {n.attrs['id']: clean_values(n.attrs) for n in nodes}
+    if not model:
+        raise ModelConversionException(
+            f"The file with the model_name: {model_name} is not found on the dir: {base_path}/tests/{app_dir}/models")
+    return model['path']
 
 
 def generate_steps(model_name: str, new_steps: str, generator: str = 'random(edge_coverage(100))',
-                   app_dir: str = None) -> List[Dict]:
+                   app_dir: str = None, backend: str = 'python', seed: int = None,
+                   use_cache: bool = True) -> List[Dict]:
     """
     This is the top level builder for making test steps.
 
@@ -75,87 +168,89 @@ def generate_steps(model_name: str, new_steps: str, generator: str = 'random(edg
         new_steps: Whether to recalculate the model steps.
         generator: The method used for building the steps.
         app_dir: App under test folder's name.
+        backend: The path generator - 'python' (in process) or 'altwalker' (graphwalker subprocess).
+        seed: The seed for the path generator (python backend only).
+        use_cache: Whether to reuse the steps of an unchanged model from tests/<app>/steps/.cache.
 
     Returns:
         steps: The list of step objects.
     """
+    if backend not in BACKENDS:
+        raise ModelConversionException(f"Unknown backend: {backend}. Use one of {BACKENDS}.")
+
     model_name = os.path.basename(model_name).split('.')[0]
     base_path = dh.get_root_dir()
     app_dir = app_dir or dh.get_src_app_dir()
 
-    models_dir = f'{base_path}/tests/{app_dir}/models'
-    model_files = [model for model in iglob(f'{models_dir}//**', recursive=True) if
-                   model.endswith('.drawio') or model.endswith('.txt')]
-    model_file = dh.find_reference_in_list(f'{model_name}.drawio', model_files) or dh.find_reference_in_list(
-        f'{model_name}.txt', model_files)
-
-    if model_file == 0:
-        raise ModelConversionException(
-            f"The file with the model_name: {model_name} is not found on the dir: {models_dir}")
-
-    json_model_file = model_file.replace('.txt', '.json').replace('.drawio', '.json')
+    index = get_index(base_path)
+    model_file = find_model_file(model_name, app_dir)
 
     steps_dir = f'{base_path}/tests/{app_dir}/steps'
-    steps_files = list(iglob(f'{steps_dir}//**', recursive=True))
-    steps_file = dh.find_reference_in_list(f'{model_name}.json', steps_files)
-    dh.safe_mkdirs(steps_dir)
-    steps_file = steps_file or f'{steps_dir}/{model_name}.json'
+    steps_file = index.steps_file(model_name, app_dir)
+    if not steps_file:
+        dh.safe_mkdirs(steps_dir)
+        steps_file = f'{steps_dir}/{model_name}.json'
+
+    if not new_steps:
+        return dh.load_json(steps_file)
+
+    cache = StepsCache(f'{steps_dir}/.cache') if use_cache else None
+    key = cache.key(model_file, generator, seed, backend, model_name) if cache else None
+    with cache.lock(key) if cache else nullcontext():
+        steps = cache.get(key) if cache else None
+        if steps is None:
+            steps = _walk_model(model_file, model_name, steps_file, generator, backend, seed)
+            if cache and steps:
+                cache.put(key, steps)
+
+        if backend != 'altwalker' or cache:
+            dh.make_json(steps, steps_file, atomic=True)
+    index.add_file(steps_file)
+    return steps
 
-    if new_steps:
-        if model_file.endswith('.drawio'):
-            attrs = find_drawio_xml_nodes(model_file)
-
-            vertex_defaults = {'properties': {'x': 0.0, 'y': 0.0, 'description': ''}}
-            edge_defaults = {'properties': {'description': ''}, 'weight': 0.0, 'dependency': 0}
-
-            start = None
-            vertices = []
-            edges = []
-            for a in attrs.values():
-                actions = None
-                value = a.get('value')
-                if value:
-                    value_actions = value.split('|')
-                    value = value_actions[0]
-                    if value_actions[0] != value_actions[-1]:
-                        actions = f'\n{value_actions[-1]}'
-
-                if value == 'Start':
-                    start = a
-                elif a.get('parent') == a.get('vertex') and value and value != 'Start':
-                    vertex = {'id': f'n/{a["id"]}', 'name': value}
-                    vertices.append({**vertex, **vertex_defaults})
-                elif a.get('parent') != a.get('vertex') and value:
-                    parent = attrs[a['parent']]
-                    source = parent.get('source')
-                    target = parent.get('target')
-                    if not target:
-                        continue
-                    edge = {'id': f'e/{a["id"]}', 'name': value,
-                            'sourceVertexId': f"n/{source}", 'targetVertexId': f"n/{target}"}
-                    if actions:
-                        edge['actions'] = [actions]
-                    edges.append({**edge, **edge_defaults})
-
-            for e in edges:
-                if start['id'] in e['sourceVertexId']:
-                    e['id'] = f'e/{start["id"]}'
-                    e.pop('sourceVertexId')
-
-            models = [{'name': model_name, 'id': '',
-                       'startElementId': f'e/{start["id"]}', 'generator': generator,
-                       'vertices': vertices, 'edges': edges}]
-
-            dh.make_json({'models': models}, json_model_file)
 
+def iter_steps(model_name: str, generator: str = 'random(edge_coverage(100))', app_dir: str = None,
+               backend: str = 'python', seed: int = None) -> Iterator[Dict]:
+    """
+    This streams the steps of a model as the path generator walks it, so the first step is available before the
+    path is complete. The steps are not written to the steps file. Cached steps are streamed from the cache and the
+    altwalker backend, which only writes a whole path, falls back to generate_steps.
 
-        else:
-            text_model = TextConverter()
-            text_model.convert_to_JSON(model_file)
+    Args:
+        model_name: The name of the model file - no extension needed.
+        generator: The method used for building the steps.
+        app_dir: App under test folder's name.
+        backend: The path generator - 'python' or 'altwalker'.
+        seed: The seed for the path generator.
 
-        run(f'altwalker offline -m {json_model_file} "{generator}" -f {steps_file}', shell=True)
+    Returns:
+        steps: The generator of step objects.
+    """
+    if backend != 'python':
+        yield from generate_steps(model_name, True, generator, app_dir, backend, seed)
+        return
 
-    return dh.load_json(steps_file)
+    model_name = os.path.basename(model_name).split('.')[0]
+    app_dir = app_dir or dh.get_src_app_dir()
+    model_file = find_model_file(model_name, app_dir)
+
+    cache = StepsCache(f'{dh.get_root_dir()}/tests/{app_dir}/steps/.cache')
+    steps = cache.get(cache.key(model_file, generator, seed, backend, model_name))
+    if steps is not None:
+        yield from steps
+        return
+
+    try:
+        if model_file.endswith('.txt') and covers_whole_model(generator):
+            yield from TextConverter().to_steps(model_file)
+            return
+        if model_file.endswith('.drawio'):
+            models = drawio_to_model(model_file, model_name, generator)
+        else:
+            models = TextConverter().to_model(model_file, generator)
+        yield from iter_path(models, generator, seed)
+    except PathGeneratorException as e:
+        raise ModelConversionException(f'Unable to generate the steps of {model_file}: {e}')
 
 
 def actions_to_dict(actions):
@@ -169,58 +264,231 @@ def actions_to_dict(actions):
         actions (dict): The actions as a dict.
     """
     d = {}
-    for t in actions[0].split(';'):
+    for t in ';'.join(actions).split(';'):
+        t = t.strip()
         if not t:
             continue
-        k, v = t.replace('\n', '').split('=')
-        d[k] = deserialize(v[1:-1].replace("\'", '"'))
+        k, v = t.split('=', 1)
+        d[k.strip()] = deserialize(v.strip()[1:-1].replace("\'", '"'))
     return d
 
 
-def step_expander(steps: Dict, app_dir: str = None) -> Dict:
+def _to_step(step: Dict) -> Step:
+    """
+    This returns the step as a Step with its actions parsed once.
+
+    Args:
+        step: The step dictionary (or Step).
+
+    Returns:
+        step: The step object.
+    """
+    return Step.from_dict(step, actions_to_dict)
+
+
+def _actions_key(actions: Mapping) -> str:
+    """
+    This returns a hashable form of parsed actions.
+
+    Args:
+        actions: The parsed actions.
+
+    Returns:
+        key: The actions as sorted json.
+    """
+    return json.dumps(dict(actions), sort_keys=True, default=str) if actions else ''
+
+
+_import_store = {}
+_expansion_store = {}
+_layout_store = {}
+
+
+def clear_import_cache(names: List[str] = None):
+    """
+    This forgets the compiled import (i_) sub-models of the process.
+
+    Args:
+        names: The i_ names to forget - all when None.
+    """
+    if names is None:
+        _import_store.clear()
+        _expansion_store.clear()
+        _layout_store.clear()
+        return
+    names = set(names)
+    for store in (_import_store, _expansion_store, _layout_store):
+        for key in [k for k in store if k[1] in names]:
+            store.pop(key)
+
+
+def get_import_steps(name: str, app_dir: str, backend: str = 'python') -> tuple:
+    """
+    This returns the compiled steps of an import (i_name -> test_name model). They are generated once per
+    process and shared by every expansion (step_expander, CodeGenerator and PytestHelper).
+
+    Args:
+        name: The i_ step name.
+        app_dir: App under test folder's name.
+        backend: The path generator backend.
+
+    Returns:
+        steps: The steps of the imported model.
+    """
+    key = (app_dir, name, backend)
+    steps = _import_store.get(key)
+    if steps is None:
+        steps = generate_steps(f"test_{name[2:]}", True, app_dir=app_dir, backend=backend)
+        steps = _import_store[key] = tuple(_to_step(s) for s in steps)
+    return steps
+
+
+def _expand_import(name: str, actions: Mapping, app_dir: str, backend: str, stack: List[str]) -> tuple:
+    """
+    This expands one occurrence of an import. Occurrences with the same name and actions share the same block.
+
+    Args:
+        name: The i_ step name.
+        actions: The (parsed) actions of the i_ step.
+        app_dir: App under test folder's name.
+        backend: The path generator backend.
+        stack: The imports being expanded - to detect cycles.
+
+    Returns:
+        block: The expanded steps of the import.
+    """
+    key = (app_dir, name, backend, _actions_key(actions))
+    block = _expansion_store.get(key)
+    if block is not None:
+        return block
+
+    if name in stack:
+        raise ModelConversionException(f"Import cycle detected: {' -> '.join(stack + [name])}")
+    stack.append(name)
+
+    block = []
+    for s in get_import_steps(name, app_dir, backend):
+        s = s.imported(name, actions)
+        block.append(s)
+        if 'i_' == s.name[:2]:
+            block.extend(_expand_import(s.name, s.actions, app_dir, backend, stack))
+
+    stack.pop()
+    block = _expansion_store[key] = tuple(block)
+    return block
+
+
+def _import_layout(name: str, app_dir: str, backend: str, stack: List[str]) -> tuple:
+    """
+    This returns the layout of the e_/v_ steps of an import expansion without expanding it: the consecutive
+    steps with the same first ancestor as (ancestor, count) segments. It does not depend on the actions of the
+    occurrence, so it is computed once per import.
+
+    Args:
+        name: The i_ step name.
+        app_dir: App under test folder's name.
+        backend: The path generator backend.
+        stack: The imports being laid out - to detect cycles.
+
+    Returns:
+        layout: The (ancestor, count) segments.
+    """
+    key = (app_dir, name, backend)
+    layout = _layout_store.get(key)
+    if layout is not None:
+        return layout
+
+    if name in stack:
+        raise ModelConversionException(f"Import cycle detected: {' -> '.join(stack + [name])}")
+    stack.append(name)
+
+    segments = []
+    for s in get_import_steps(name, app_dir, backend):
+        if s.name[:2] in ('e_', 'v_'):
+            nested = (((s.ancestors or (name,))[0], 1),)
+        elif 'i_' == s.name[:2]:
+            nested = _import_layout(s.name, app_dir, backend, stack)
+        else:
+            continue
+        for ancestor, count in nested:
+            if segments and segments[-1][0] == ancestor:
+                segments[-1] = (ancestor, segments[-1][1] + count)
+            else:
+                segments.append((ancestor, count))
+
+    stack.pop()
+    layout = _layout_store[key] = tuple(segments)
+    return layout
+
+
+def _iter_expanded_steps(steps: List[Dict], app_dir: str = None, backend: str = 'python') -> Iterator[Step]:
+    """
+    This lazily expands nested(imported) steps in a single pass. The steps are read only Step objects and repeated
+    imports share the same ones.
+
+    Args:
+        steps: The condensed steps.
+        app_dir: App under test folder's name.
+        backend: The path generator backend of the imports.
+
+    Returns:
+        steps: The generator of expanded steps.
+    """
+    app_dir = app_dir or dh.get_src_app_dir()
+    for step in steps:
+        step = _to_step(step)
+        yield step
+        if 'i_' == step.name[:2]:
+            yield from _expand_import(step.name, step.actions, app_dir, backend, [])
+
+
+def iter_expanded_steps(steps: List[Dict], app_dir: str = None, backend: str = 'python') -> Iterator[Dict]:
+    """
+    This lazily expands nested(imported) steps in a single pass.
+
+    Args:
+        steps: The condensed steps.
+        app_dir: App under test folder's name.
+        backend: The path generator backend of the imports.
+
+    Returns:
+        steps: The generator of expanded steps.
+    """
+    return (step.to_dict() for step in _iter_expanded_steps(steps, app_dir, backend))
+
+
+def step_expander(steps: Dict, app_dir: str = None, backend: str = 'python') -> List[Dict]:
     """
     This expands nested(imported) steps.
 
     Args:
         steps: The condensed steps.
         app_dir: App under test folder's name.
+        backend: The path generator backend of the imports.
 
     Returns:
         steps: The expanded (i - imports) steps.
     """
-    steps = steps.copy()
-    i_store = {}
+    return [step.to_dict() for step in _iter_expanded_steps(steps, app_dir, backend)]
 
-    for i in range(1000):
-        if i >= len(steps):
-            break
 
-        step = steps[i]
-        name = step['name']
-        actions = step.get('actions')
-        if actions:
-            if type(actions) is not dict:
-                step['actions'] = actions_to_dict(actions)
-
-        if 'i_' == name[:2]:
-            i_steps = i_store.get(name)
-            if i_steps:
-                i_steps = deepcopy(i_steps)
-            else:
-                i_steps = generate_steps(f"test_{name[2:]}", True, app_dir=app_dir)
-                i_store[name] = i_steps
-
-            for s in i_steps:
-                ancestors = s.get('ancestors', [])
-                if name not in ancestors:
-                    s['ancestors'] = ancestors + [name]
-                if actions:
-                    s_action = s.get('actions', {})
-                    if type(s_action) is not dict:
-                        s_action = actions_to_dict(s_action)
-                    s['actions'] = {**s_action, **step['actions']}
-            steps = steps[:i + 1] + i_steps + steps[i + 1:]
-    return steps
+def _select_runs(runs, decision):
+    """
+    This applies a decision_map value to the runs of one ancestor.
+
+    Args:
+        runs (list<list>): The runs (contiguous step positions) of the ancestor.
+        decision (int|slice|list): A run index (0, -1, ..), the number of leading runs to keep (> 0),
+                                   a slice or a list of run indices.
+
+    Returns:
+        runs (list<list>): The selected runs.
+    """
+    if type(decision) is int:
+        return runs[:decision] if decision > 0 else [runs[decision]]
+    if isinstance(decision, slice):
+        return runs[decision]
+    return [runs[i] for i in decision]
 
 
 def prune_steps(model_steps, decision_map=None):
@@ -234,36 +502,280 @@ def prune_steps(model_steps, decision_map=None):
     Returns:
         pruned_steps (list): The model steps with repeated 'i_' steps removed.
     """
-    default_map = (decision_map or {}).copy()
-    default_map = {k: range(v) if type(v) is int and v > 0 else v for k, v in default_map.items()}
+    decision_map = decision_map or {}
+
+    e_v_model_steps = []
+    runs = {}
+    previous = None
+    for m in model_steps:
+        if m['name'][:2] not in ('e_', 'v_'):
+            continue
+        ancestor = m.get('ancestors', [m['name']])[0]
+        if ancestor != previous:
+            runs.setdefault(ancestor, []).append([])
+            previous = ancestor
+        runs[ancestor][-1].append(len(e_v_model_steps))
+        e_v_model_steps.append(m)
+
+    keep = [not decision_map] * len(e_v_model_steps)
+    if decision_map:
+        for ancestor, ancestor_runs in runs.items():
+            if ancestor in decision_map:
+                ancestor_runs = _select_runs(ancestor_runs, decision_map[ancestor])
+            for run in ancestor_runs:
+                for i in run:
+                    keep[i] = True
+
+    pruned_steps = []
+    deleted_steps = []
+    for m, kept in zip(e_v_model_steps, keep):
+        if kept:
+            (deleted_steps if 'delete' in m['name'].lower() else pruned_steps).append(m)
+    return pruned_steps + deleted_steps
+
+
+def _leading_runs(decision) -> int:
+    """
+    This returns how many leading runs of an ancestor a decision_map value keeps.
+
+    Args:
+        decision (int|slice|list): See _select_runs.
+
+    Returns:
+        runs: The number of leading runs kept (sys.maxsize for all), None when it depends on the number of runs.
+    """
+    if type(decision) is int:
+        return max(decision, 1) if decision >= 0 else None
+    if isinstance(decision, slice) and decision.start in (None, 0) and decision.step in (None, 1):
+        if decision.stop is None:
+            return sys.maxsize
+        return decision.stop if decision.stop >= 0 else None
+    return None
+
+
+def iter_pruned_steps(model_steps: Iterable[Dict], decision_map: Dict = None) -> Iterator[Dict]:
+    """
+    This lazily prunes a stream of expanded steps - the same steps as prune_steps. The steps are yielded as they
+    come and the 'delete' steps at the end. A decision_map keeping anything else than leading runs (-1, lists, ..)
+    needs every run, the steps are then pruned once the stream is over.
+
+    Args:
+        model_steps: The expanded model steps.
+        decision_map: See prune_steps.
+
+    Returns:
+        pruned_steps: The generator of the model steps with repeated 'i_' steps removed.
+    """
+    decision_map = decision_map or {}
+    leading_runs = {ancestor: _leading_runs(decision) for ancestor, decision in decision_map.items()}
+    if None in leading_runs.values():
+        yield from prune_steps(list(model_steps), decision_map)
+        return
+
+    deleted_steps = []
+    runs = {}
+    previous = None
+    kept = True
+    for m in model_steps:
+        if m['name'][:2] not in ('e_', 'v_'):
+            continue
+        ancestor = m.get('ancestors', [m['name']])[0]
+        if ancestor != previous:
+            run = runs[ancestor] = runs.get(ancestor, -1) + 1
+            kept = run < leading_runs.get(ancestor, sys.maxsize)
+            previous = ancestor
+        if kept:
+            if 'delete' in m['name'].lower():
+                deleted_steps.append(m)
+            else:
+                yield m
+    yield from deleted_steps
+
+
+def iter_prepared_steps(model_name: str, decision_map: Dict = None, backend: str = 'python',
+                        generator: str = 'random(edge_coverage(100))', app_dir: str = None,
+                        new_steps: bool = True) -> Iterator[Dict]:
+    """
+    This streams the steps prepare_steps returns: the path is generated, expanded and pruned step by step so the
+    time to the first step does not depend on the length of the path.
+
+    Args:
+        model_name: The name of the model file - no extension needed.
+        decision_map: See prune_steps.
+        backend: The path generator - 'python' or 'altwalker'.
+        generator: The method used for building the steps.
+        app_dir: App under test folder's name.
+        new_steps: Whether to walk the model again - False streams the stored steps file.
+
+    Returns:
+        model_steps: The generator of the models steps.
+    """
+    app_dir = app_dir or dh.get_src_app_dir()
+    if new_steps:
+        model_steps = iter_steps(model_name, generator, app_dir, backend)
+    else:
+        model_steps = generate_steps(model_name, False, app_dir=app_dir, backend=backend)
+    pruned_steps = iter_pruned_steps(_iter_expanded_steps(model_steps, app_dir, backend), decision_map)
+    return (step.to_dict() for step in pruned_steps)
+
+
+def _expand_pruned_steps(steps: List[Dict], decision_map: Dict = None, app_dir: str = None,
+                         backend: str = 'python') -> List[Step]:
+    """
+    This expands and prunes the steps at once - the same steps as prune_steps(step_expander(steps), decision_map)
+    but the runs are found from the import layouts, so only the import occurrences surviving the decision_map are
+    expanded. The steps are read only Step objects shared with the import cache.
+
+    Args:
+        steps: The condensed steps.
+        decision_map: See prune_steps.
+        app_dir: App under test folder's name.
+        backend: The path generator backend of the imports.
+
+    Returns:
+        pruned_steps: The expanded model steps with repeated 'i_' steps removed.
+    """
+    app_dir = app_dir or dh.get_src_app_dir()
+    decision_map = decision_map or {}
+
+    # (step, start, end): a top level e_/v_ step or the e_/v_ steps [start:end] of an import occurrence
+    pieces = []
+    runs = {}
+    previous = None
+    for step in steps:
+        step = _to_step(step)
+        if step.name[:2] in ('e_', 'v_'):
+            layout = (((step.ancestors or (step.name,))[0], 1),)
+        elif 'i_' == step.name[:2]:
+            layout = _import_layout(step.name, app_dir, backend, [])
+        else:
+            continue
+        start = 0
+        for ancestor, count in layout:
+            if ancestor != previous:
+                runs.setdefault(ancestor, []).append([])
+                previous = ancestor
+            runs[ancestor][-1].append(len(pieces))
+            pieces.append((step, start, start + count))
+            start += count
+
+    keep = [not decision_map] * len(pieces)
+    if decision_map:
+        for ancestor, ancestor_runs in runs.items():
+            if ancestor in decision_map:
+                ancestor_runs = _select_runs(ancestor_runs, decision_map[ancestor])
+            for run in ancestor_runs:
+                for i in run:
+                    keep[i] = True
+
+    pruned_steps = []
+    deleted_steps = []
+    blocks = {}
+    for (step, start, end), kept in zip(pieces, keep):
+        if not kept:
+            continue
+        if 'i_' == step.name[:2]:
+            block = blocks.get(id(step))
+            if block is None:
+                block = blocks[id(step)] = [s for s in _expand_import(step.name, step.actions, app_dir, backend, [])
+                                            if s.name[:2] in ('e_', 'v_')]
+            selected = block[start:end]
+        else:
+            selected = (step,)
+        for m in selected:
+            (deleted_steps if 'delete' in m.name.lower() else pruned_steps).append(m)
+    return pruned_steps + deleted_steps
+
+
+def expand_pruned_steps(steps: List[Dict], decision_map: Dict = None, app_dir: str = None,
+                        backend: str = 'python') -> List[Dict]:
+    """
+    This expands and prunes the steps at once - the same steps as prune_steps(step_expander(steps), decision_map)
+    but only the import occurrences surviving the decision_map are expanded.
+
+    Args:
+        steps: The condensed steps.
+        decision_map: See prune_steps.
+        app_dir: App under test folder's name.
+        backend: The path generator backend of the imports.
+
+    Returns:
+        pruned_steps: The expanded model steps with repeated 'i_' steps removed.
+    """
+    return [step.to_dict() for step in _expand_pruned_steps(steps, decision_map, app_dir, backend)]
+
+
+def iter_params(model_steps: Iterable[Dict], params: Mapping) -> Iterator[Dict]:
+    """
+    This lazily substitutes a parameter set into compiled steps: the actions setting one of the parameters get its
+    value in a copy of the step. The other steps are yielded as they are.
 
-    e_v_model_steps = [m for m in model_steps if m['name'][:2] in ['e_', 'v_']]
-    ancestors = [m.get('ancestors', [m['name']])[0] for m in e_v_model_steps]
-    hist = {a: np.where(a == np.array(ancestors))[0].tolist() for a in ancestors}
-    indices = {k: [i for i in range(len(v)) if abs(v[i] - v[i - 1]) > 1] + [len(v)] for k, v in hist.items()}
-    indices = {k: [v[indices[k][i - 1]: indices[k][i]] for i in range(1, len(indices[k]))] or
-                  [v[:indices[k][0]]] for k, v in hist.items()}
-    filtered_indices = [v[default_map[k]] if k in default_map else v for k, v in indices.items()]
-    filtered_indices = sorted(flatten(filtered_indices).values())
-    pruned_steps = [e_v_model_steps[i] for i in filtered_indices]
-    for p in pruned_steps.copy():
-        if 'delete' in p['name'].lower():
-            index = pruned_steps.index(p)
-            pruned_steps.append(pruned_steps.pop(index))
-    return pruned_steps
+    Args:
+        model_steps: The compiled (expanded and pruned) steps.
+        params: The parameter values by name.
+
+    Returns:
+        model_steps: The generator of the steps of the parameter set.
+    """
+    for step in model_steps:
+        actions = step.get('actions')
+        if not params or not actions:
+            yield step
+            continue
+        if not isinstance(actions, Mapping):
+            actions = actions_to_dict(actions)
+        overridden = {k: params[k] for k in actions if k in params}
+        yield {**step, 'actions': {**actions, **overridden}} if overridden else step
 
 
-def prepare_steps(model_name, new_steps=False, decision_map=None):
+def apply_params(model_steps: Iterable[Dict], params: Mapping) -> List[Dict]:
+    """
+    This substitutes a parameter set into compiled steps without generating or expanding them again.
+
+    Args:
+        model_steps: The compiled (expanded and pruned) steps.
+        params: The parameter values by name.
+
+    Returns:
+        model_steps: The steps of the parameter set.
+    """
+    return list(iter_params(model_steps, params))
+
+
+def load_parameter_sets(parameter_sets) -> Dict[str, Dict]:
+    """
+    This reads the parameter sets of a parameter matrix.
+
+    Args:
+        parameter_sets (list|dict|str): The parameter sets, the sets by id or a json file of either.
+
+    Returns:
+        parameter_sets: The parameter sets by id.
+    """
+    if isinstance(parameter_sets, str):
+        path = parameter_sets if os.path.isabs(parameter_sets) else f'{dh.get_root_dir()}/{parameter_sets}'
+        if not os.path.exists(path):
+            raise ModelConversionException(f'The parameter sets file: {path} is not found.')
+        parameter_sets = dh.load_json(path)
+    if isinstance(parameter_sets, Mapping):
+        return {str(k): dict(v) for k, v in parameter_sets.items()}
+    return {f'set{i}': dict(v) for i, v in enumerate(parameter_sets or [])}
+
+
+def prepare_steps(model_name, new_steps=False, decision_map=None, backend='python', app_dir=None):
     """
     This uses the above functions to prepare the test steps.
 
     Args:
         model_name (str): The name of the model file - no extension needed.
         new_steps (bool): Whether to recalculate the model steps.
+        decision_map (None|dict): See prune_steps.
+        backend (str): The path generator - 'python' or 'altwalker'.
+        app_dir (None|str): App under test folder's name - found from the running test when None.
 
     Returns:
         model_steps (list): The list of the models steps.
     """
-    model_steps = generate_steps(model_name, new_steps=new_steps)
-    model_steps = step_expander(model_steps)
-    return prune_steps(model_steps, decision_map)
+    app_dir = app_dir or dh.get_src_app_dir()
+    model_steps = generate_steps(model_name, new_steps=new_steps, app_dir=app_dir, backend=backend)
+    return expand_pruned_steps(model_steps, decision_map, app_dir=app_dir, backend=backend)
@@ -0,0 +1,784 @@
+import re
+import random
+from time import time
+from collections import deque
+from typing import Dict, Iterator, List, Optional
+
+from uiautomationtools.models.model_analyzer import strongly_connected_components
+
+
+class PathGeneratorException(Exception):
+    """Exception when error occurs while generating a path through a model."""
+
+
+class StopCondition(object):
+    """
+    The base of the stop conditions (the inner part of 'random(edge_coverage(100))').
+    """
+
+    def fulfilled(self, walk) -> bool:
+        """
+        Whether the walk can stop at its current element.
+
+        Args:
+            walk: The running walk.
+
+        Returns:
+            fulfilled: True when the condition is met.
+        """
+        raise NotImplementedError
+
+    def attainable(self, walk) -> bool:
+        """
+        Whether the condition can still be met from the current element of the walk.
+
+        Args:
+            walk: The running walk.
+
+        Returns:
+            attainable: False when the walk would never end.
+        """
+        return True
+
+    def targets(self) -> List[str]:
+        """
+        The element names the condition is trying to reach.
+
+        Returns:
+            targets: The names of the elements - empty for coverage conditions.
+        """
+        return []
+
+
+class EdgeCoverage(StopCondition):
+    """edge_coverage(N) - N percent of the edges have been walked."""
+
+    def __init__(self, percent):
+        self.percent = float(percent)
+
+    def fulfilled(self, walk):
+        if not walk.graph.edges:
+            return True
+        covered = 100.0 * len(walk.visited_edges) / len(walk.graph.edges)
+        return walk.at_vertex and covered >= self.percent
+
+    def attainable(self, walk):
+        if not walk.graph.edges:
+            return True
+        return 100.0 * len(walk.visited_edges | walk.reachable_edges) / len(walk.graph.edges) >= self.percent
+
+
+class VertexCoverage(StopCondition):
+    """vertex_coverage(N) - N percent of the vertices have been walked."""
+
+    def __init__(self, percent):
+        self.percent = float(percent)
+
+    def fulfilled(self, walk):
+        if not walk.graph.vertices:
+            return True
+        covered = 100.0 * len(walk.visited_vertices) / len(walk.graph.vertices)
+        return walk.at_vertex and covered >= self.percent
+
+    def attainable(self, walk):
+        if not walk.graph.vertices:
+            return True
+        return 100.0 * len(walk.visited_vertices | walk.reachable_vertices) / len(walk.graph.vertices) >= self.percent
+
+
+class Length(StopCondition):
+    """length(N) - N elements have been walked."""
+
+    def __init__(self, length):
+        self.length = int(length)
+
+    def fulfilled(self, walk):
+        return walk.length >= self.length
+
+
+class TimeDuration(StopCondition):
+    """time_duration(N) - N seconds have passed since the walk started."""
+
+    def __init__(self, seconds):
+        self.seconds = float(seconds)
+
+    def fulfilled(self, walk):
+        return time() - walk.started >= self.seconds
+
+
+class ReachedVertex(StopCondition):
+    """reached_vertex(name) - the walk stands on the named vertex."""
+
+    def __init__(self, name):
+        self.name = name
+
+    def fulfilled(self, walk):
+        return walk.at_vertex and walk.current['name'] == self.name
+
+    def attainable(self, walk):
+        return any(walk.graph.vertices[v]['name'] == self.name for v in walk.reachable_vertices)
+
+    def targets(self):
+        return [self.name]
+
+
+class ReachedEdge(StopCondition):
+    """reached_edge(name) - the walk has just walked the named edge."""
+
+    def __init__(self, name):
+        self.name = name
+
+    def fulfilled(self, walk):
+        return walk.at_vertex and walk.previous is not None and walk.previous['name'] == self.name
+
+    def attainable(self, walk):
+        return any(walk.graph.edges[e]['name'] == self.name for e in walk.reachable_edges)
+
+    def targets(self):
+        return [self.name]
+
+
+class AllOf(StopCondition):
+    """cond and cond - every condition is fulfilled."""
+
+    def __init__(self, conditions):
+        self.conditions = conditions
+
+    def fulfilled(self, walk):
+        return all(c.fulfilled(walk) for c in self.conditions)
+
+    def attainable(self, walk):
+        return all(c.attainable(walk) for c in self.conditions)
+
+    def targets(self):
+        return [t for c in self.conditions for t in c.targets()]
+
+
+class AnyOf(AllOf):
+    """cond or cond - any of the conditions is fulfilled."""
+
+    def fulfilled(self, walk):
+        return any(c.fulfilled(walk) for c in self.conditions)
+
+    def attainable(self, walk):
+        return any(c.attainable(walk) for c in self.conditions)
+
+
+STOP_CONDITIONS = {
+    'edge_coverage': EdgeCoverage,
+    'vertex_coverage': VertexCoverage,
+    'length': Length,
+    'time_duration': TimeDuration,
+    'reached_vertex': ReachedVertex,
+    'reached_edge': ReachedEdge,
+}
+
+_TOKENS = re.compile(r'\s*(&&|\|\||[()]|[^\s()&|]+)')
+
+
+def _tokenize(expression: str) -> List[str]:
+    """
+    This splits a generator expression into its tokens.
+
+    Args:
+        expression: The generator expression e.g. 'random(edge_coverage(100) and length(50))'.
+
+    Returns:
+        tokens: The tokens of the expression.
+    """
+    tokens = []
+    position = 0
+    expression = expression.strip()
+    while position < len(expression):
+        match = _TOKENS.match(expression, position)
+        if not match:
+            raise PathGeneratorException(f'Unable to parse the generator: {expression}')
+        tokens.append(match.group(1))
+        position = match.end()
+    return tokens
+
+
+def parse_generator(expression: str) -> List[tuple]:
+    """
+    This parses a graphwalker style generator expression. Several generators can follow
+    each other separated by spaces e.g. 'random(length(10)) a_star(reached_vertex(v_end))'.
+
+    Args:
+        expression: The generator expression.
+
+    Returns:
+        generators: The (generator name, stop condition) pairs in execution order.
+    """
+    tokens = _tokenize(expression)
+    position = 0
+
+    def peek():
+        return tokens[position] if position < len(tokens) else None
+
+    def take(expected=None):
+        nonlocal position
+        token = peek()
+        if token is None or (expected and token != expected):
+            raise PathGeneratorException(f"Expected '{expected or 'a token'}' but got '{token}' in: {expression}")
+        position += 1
+        return token
+
+    def parse_or():
+        conditions = [parse_and()]
+        while peek() in ('or', '||', 'OR'):
+            take()
+            conditions.append(parse_and())
+        return conditions[0] if len(conditions) == 1 else AnyOf(conditions)
+
+    def parse_and():
+        conditions = [parse_condition()]
+        while peek() in ('and', '&&', 'AND'):
+            take()
+            conditions.append(parse_condition())
+        return conditions[0] if len(conditions) == 1 else AllOf(conditions)
+
+    def parse_condition():
+        if peek() == '(':
+            take('(')
+            condition = parse_or()
+            take(')')
+            return condition
+        name = take().lower()
+        if name not in STOP_CONDITIONS:
+            raise PathGeneratorException(f"Unsupported stop condition '{name}' in: {expression}")
+        take('(')
+        argument = take()
+        take(')')
+        return STOP_CONDITIONS[name](argument)
+
+    generators = []
+    while peek() is not None:
+        name = take().lower()
+        if name not in GENERATORS:
+            raise PathGeneratorException(f"Unsupported generator '{name}' in: {expression}")
+        take('(')
+        generators.append((name, parse_or()))
+        take(')')
+
+    if not generators:
+        raise PathGeneratorException(f'No generator found in: {expression}')
+    return generators
+
+
+CHAIN_GENERATORS = ('random', 'weighted_random', 'quick_random', 'chinese_postman')
+
+
+def covers_whole_model(expression: str) -> bool:
+    """
+    This checks whether the walk of the generators only stops once every edge (or vertex) is covered, by generators
+    walking a linear chain to its end (CHAIN_GENERATORS) - a_star picks its route from reached_* targets instead.
+
+    Args:
+        expression: The generator expression.
+
+    Returns:
+        covers: True when every generator walks a chain to its end and stops on full edge/vertex coverage.
+    """
+    def full_coverage(condition):
+        if isinstance(condition, AllOf):
+            return all(full_coverage(c) for c in condition.conditions)
+        return isinstance(condition, (EdgeCoverage, VertexCoverage)) and condition.percent >= 100
+
+    return all(name in CHAIN_GENERATORS and full_coverage(condition)
+               for name, condition in parse_generator(expression))
+
+
+class ModelGraph(object):
+    """
+    The vertices and edges of one model in the {'models': [...]} json format.
+    """
+
+    def __init__(self, model: Dict):
+        """
+        The constructor for ModelGraph.
+
+        Args:
+            model: One model of the models json.
+        """
+        self.name = model['name']
+        self.start_id = model.get('startElementId')
+        self.vertices = {v['id']: v for v in model.get('vertices', [])}
+        self.edges = {e['id']: e for e in model.get('edges', [])}
+        self.out_edges = {v: [] for v in self.vertices}
+        for e in self.edges.values():
+            source = e.get('sourceVertexId')
+            if source in self.out_edges:
+                self.out_edges[source].append(e['id'])
+
+        if self.start_id not in self.vertices and self.start_id not in self.edges:
+            raise PathGeneratorException(f"The start element '{self.start_id}' is not in the model: {self.name}")
+
+    def reachable(self, source: str = None):
+        """
+        This finds everything reachable from the start element.
+
+        Args:
+            source: The vertex id to start from - the start element when None.
+
+        Returns:
+            vertices (set): The reachable vertex ids.
+            edges (set): The reachable edge ids.
+        """
+        vertices, edges = set(), set()
+        queue = deque()
+        if source is not None:
+            vertices.add(source)
+            queue.append(source)
+        elif self.start_id in self.edges:
+            edges.add(self.start_id)
+            target = self.edges[self.start_id].get('targetVertexId')
+            if target in self.vertices:
+                vertices.add(target)
+                queue.append(target)
+        else:
+            vertices.add(self.start_id)
+            queue.append(self.start_id)
+
+        while queue:
+            for e in self.out_edges[queue.popleft()]:
+                edges.add(e)
+                target = self.edges[e].get('targetVertexId')
+                if target in self.vertices and target not in vertices:
+                    vertices.add(target)
+                    queue.append(target)
+        return vertices, edges
+
+    def components(self) -> Dict[str, int]:
+        """
+        This finds the strongly connected component of every vertex and the components the walk can loop in.
+
+        Returns:
+            components: The component index by vertex id.
+            cyclic: The indexes of the components with more than one vertex or a self loop.
+        """
+        def successors(vertex):
+            return [t for t in (self.edges[e].get('targetVertexId') for e in self.out_edges[vertex])
+                    if t in self.vertices]
+
+        components, cyclic = {}, set()
+        for i, component in enumerate(strongly_connected_components(self.vertices, successors)):
+            for vertex in component:
+                components[vertex] = i
+            if len(component) > 1 or component[0] in successors(component[0]):
+                cyclic.add(i)
+        return components, cyclic
+
+    def shortest_path(self, source: str, goal) -> List[str]:
+        """
+        This finds the shortest list of edges from a vertex to the first edge/vertex matching goal.
+
+        Args:
+            source: The vertex id to start from.
+            goal (callable): Called with (element id, is_edge) - True for the destination.
+
+        Returns:
+            path: The edge ids to walk, None when there is no path.
+        """
+        if goal(source, False):
+            return []
+        previous = {source: None}
+        queue = deque([source])
+        while queue:
+            vertex = queue.popleft()
+            for e in self.out_edges[vertex]:
+                target = self.edges[e].get('targetVertexId')
+                if goal(e, True) or (target in self.vertices and target not in previous and goal(target, False)):
+                    path = [e]
+                    while previous[vertex] is not None:
+                        vertex, edge = previous[vertex]
+                        path.append(edge)
+                    return path[::-1]
+                if target in self.vertices and target not in previous:
+                    previous[target] = (vertex, e)
+                    queue.append(target)
+        return None
+
+    def shortest_paths(self, source: str) -> Dict[str, tuple]:
+        """
+        This finds the shortest paths from a vertex to every vertex reachable from it.
+
+        Args:
+            source: The vertex id to start from.
+
+        Returns:
+            previous: The (previous vertex, edge) of every reachable vertex id - (None, None) for the source.
+        """
+        previous = {source: (None, None)}
+        queue = deque([source])
+        while queue:
+            vertex = queue.popleft()
+            for e in self.out_edges[vertex]:
+                target = self.edges[e].get('targetVertexId')
+                if target in self.vertices and target not in previous:
+                    previous[target] = (vertex, e)
+                    queue.append(target)
+        return previous
+
+
+def _min_cost_transport(supply: Dict[str, int], demand: Dict[str, int],
+                        costs: Dict[tuple, int]) -> Optional[List[tuple]]:
+    """
+    This moves the supply to the demand at the lowest cost (successive shortest paths with Bellman-Ford).
+
+    Args:
+        supply: The units available by source.
+        demand: The units needed by sink.
+        costs: The cost of one unit by (source, sink) - missing pairs are not connected.
+
+    Returns:
+        flows: The (source, sink, units) moved, None when the demand can not be met.
+    """
+    nodes = ['S', 'T'] + [('s', n) for n in supply] + [('t', n) for n in demand]
+    index = {n: i for i, n in enumerate(nodes)}
+    arcs = []  # [to, capacity, cost] - the reverse arc of arcs[i] is arcs[i ^ 1]
+    adjacency = [[] for _ in nodes]
+
+    def add(u, v, capacity, cost):
+        adjacency[u].append(len(arcs))
+        arcs.append([v, capacity, cost])
+        adjacency[v].append(len(arcs))
+        arcs.append([u, 0, -cost])
+
+    for n, units in supply.items():
+        add(0, index[('s', n)], units, 0)
+    for n, units in demand.items():
+        add(index[('t', n)], 1, units, 0)
+    pairs = {}
+    for (u, v), cost in costs.items():
+        pairs[(u, v)] = len(arcs)
+        add(index[('s', u)], index[('t', v)], sum(supply.values()), cost)
+
+    moved = 0
+    while moved < sum(supply.values()):
+        distance = [None] * len(nodes)
+        incoming = [None] * len(nodes)
+        distance[0] = 0
+        for _ in range(len(nodes)):
+            updated = False
+            for u in range(len(nodes)):
+                if distance[u] is None:
+                    continue
+                for a in adjacency[u]:
+                    v, capacity, cost = arcs[a]
+                    if capacity and (distance[v] is None or distance[u] + cost < distance[v]):
+                        distance[v], incoming[v] = distance[u] + cost, a
+                        updated = True
+            if not updated:
+                break
+        if distance[1] is None:
+            return None
+
+        units, v = sum(supply.values()), 1
+        while v:
+            units = min(units, arcs[incoming[v]][1])
+            v = arcs[incoming[v] ^ 1][0]
+        v = 1
+        while v:
+            arcs[incoming[v]][1] -= units
+            arcs[incoming[v] ^ 1][1] += units
+            v = arcs[incoming[v] ^ 1][0]
+        moved += units
+
+    return [(u, v, arcs[a ^ 1][1]) for (u, v), a in pairs.items() if arcs[a ^ 1][1]]
+
+
+def postman_route(graph: ModelGraph, start: str, required: List[str]) -> Optional[List[str]]:
+    """
+    This finds the shortest walk from a vertex through every required edge (the open route inspection or
+    chinese postman problem). The edges are doubled along shortest paths until an Euler path from the start
+    exists, the cheapest doubling being a min cost flow from the vertices missing outgoing edges to the vertices
+    missing incoming ones. The walk may end anywhere.
+
+    Args:
+        graph: The model.
+        start: The vertex id to start from.
+        required: The ids of the edges to walk.
+
+    Returns:
+        route: The edge ids to walk, None when no single walk covers the required edges (e.g. several dead ends).
+    """
+    balance = {start: 1}  # incoming - outgoing edges, the start gets the virtual edge from the end of the walk
+    for e in required:
+        edge = graph.edges[e]
+        balance[edge['targetVertexId']] = balance.get(edge['targetVertexId'], 0) + 1
+        balance[edge['sourceVertexId']] = balance.get(edge['sourceVertexId'], 0) - 1
+    supply = {v: b for v, b in balance.items() if b > 0}
+    demand = {v: -b for v, b in balance.items() if b < 0}
+    demand[None] = 1  # the end of the walk, any vertex can be it
+
+    paths = {v: graph.shortest_paths(v) for v in supply}
+    costs = {}
+    for u, previous in paths.items():
+        costs[(u, None)] = 0
+        for v in demand:
+            if v in previous:
+                length, w = 0, v
+                while previous[w][0] is not None:
+                    length, w = length + 1, previous[w][0]
+                costs[(u, v)] = length
+    flows = _min_cost_transport(supply, demand, costs)
+    if flows is None:
+        return None
+
+    out_edges = {}
+    for e in required:
+        out_edges.setdefault(graph.edges[e]['sourceVertexId'], []).append(e)
+    for u, v, units in flows:
+        w = v
+        while v is not None and paths[u][w][0] is not None:
+            w, e = paths[u][w]
+            out_edges.setdefault(w, []).extend([e] * units)
+    for edges in out_edges.values():
+        edges.reverse()
+
+    route = []
+    stack = [(start, None)]
+    while stack:
+        vertex, e = stack[-1]
+        if out_edges.get(vertex):
+            edge = out_edges[vertex].pop()
+            stack.append((graph.edges[edge]['targetVertexId'], edge))
+        else:
+            stack.pop()
+            if e is not None:
+                route.append(e)
+    if any(out_edges.values()):
+        return None
+    return route[::-1]
+
+
+class Walk(object):
+    """
+    A walk through a model driven by one or more generators.
+    """
+
+    def __init__(self, graph: ModelGraph, generators: List[tuple], seed=None):
+        """
+        The constructor for Walk.
+
+        Args:
+            graph: The model to walk.
+            generators: The parsed (generator name, stop condition) pairs.
+            seed (None|int): The seed for the random choices.
+        """
+        self.graph = graph
+        self.generators = generators
+        self.random = random.Random(seed)
+        self.reachable_vertices, self.reachable_edges = graph.reachable()
+        self.components, self.cyclic = graph.components()
+        self.component = None
+        self.visited_vertices = set()
+        self.visited_edges = set()
+        self.current = None
+        self.previous = None
+        self.at_vertex = False
+        self.length = 0
+        self.started = time()
+        self.plan = deque()
+
+    def _step(self, element_id: str, is_edge: bool) -> Dict:
+        """
+        This moves the walk onto an element.
+
+        Args:
+            element_id: The id of the element.
+            is_edge: Whether the element is an edge.
+
+        Returns:
+            step: The step in the altwalker steps format.
+        """
+        element = self.graph.edges[element_id] if is_edge else self.graph.vertices[element_id]
+        (self.visited_edges if is_edge else self.visited_vertices).add(element_id)
+        self.previous, self.current, self.at_vertex = self.current, element, not is_edge
+        self.length += 1
+
+        step = {'id': element['id'], 'name': element['name'], 'modelName': self.graph.name}
+        if element.get('actions'):
+            step['actions'] = element['actions']
+        return step
+
+    def _choose_random(self, edges: List[str]) -> str:
+        return self.random.choice(edges)
+
+    def _choose_weighted(self, edges: List[str]) -> str:
+        weights = [float(self.graph.edges[e].get('weight') or 0.0) for e in edges]
+        unweighted = [w for w in weights if w <= 0]
+        if len(unweighted) == len(weights):
+            return self._choose_random(edges)
+        rest = max(1.0 - sum(weights), 0.0) / len(unweighted) if unweighted else 0.0
+        return self.random.choices(edges, [w if w > 0 else rest for w in weights])[0]
+
+    def _choose_quick(self, vertex: str) -> str:
+        if not self.plan:
+            unvisited = [e for e in self.graph.edges if e not in self.visited_edges and e in self.reachable_edges]
+            self.random.shuffle(unvisited)
+            for edge in unvisited:
+                path = self.graph.shortest_path(vertex, lambda el, is_edge: is_edge and el == edge)
+                if path:
+                    self.plan.extend(path)
+                    break
+        if self.plan:
+            return self.plan.popleft()
+        return self._choose_random(self.graph.out_edges[vertex])
+
+    def _choose_postman(self, vertex: str) -> str:
+        if not self.plan:
+            required = [e for e, edge in self.graph.edges.items() if e in self.reachable_edges and
+                        e not in self.visited_edges and edge.get('sourceVertexId') in self.graph.vertices and
+                        edge.get('targetVertexId') in self.graph.vertices]
+            self.plan.extend(postman_route(self.graph, vertex, required) or [])
+        if not self.plan:
+            path = self.graph.shortest_path(vertex, lambda el, is_edge: is_edge and el in self.reachable_edges and
+                                            el not in self.visited_edges)
+            self.plan.extend(path or [])
+        if self.plan:
+            return self.plan.popleft()
+        return self._choose_random(self.graph.out_edges[vertex])
+
+    def _choose_a_star(self, vertex: str, condition: StopCondition) -> str:
+        if not self.plan:
+            targets = set(condition.targets())
+            if not targets:
+                raise PathGeneratorException('The a_star generator needs a reached_vertex or reached_edge condition.')
+            path = self.graph.shortest_path(vertex, lambda el, is_edge: (self.graph.edges if is_edge else
+                                                                         self.graph.vertices)[el]['name'] in targets)
+            if path is None:
+                raise PathGeneratorException(f'No path found from {vertex} to {sorted(targets)} in {self.graph.name}.')
+            self.plan.extend(path)
+        return self.plan.popleft()
+
+    def next_edge(self, name: str, condition: StopCondition) -> str:
+        """
+        This picks the next edge out of the current vertex.
+
+        Args:
+            name: The generator name.
+            condition: The stop condition of the generator.
+
+        Returns:
+            edge_id: The id of the edge to walk next.
+        """
+        vertex = self.current['id']
+        edges = self.graph.out_edges[vertex]
+        if name == 'weighted_random':
+            return self._choose_weighted(edges)
+        if name == 'quick_random':
+            return self._choose_quick(vertex)
+        if name == 'a_star':
+            return self._choose_a_star(vertex, condition)
+        if name == 'chinese_postman':
+            return self._choose_postman(vertex)
+        return self._choose_random(edges)
+
+    def _entered_loop(self) -> bool:
+        """
+        This finds what is still reachable when the walk enters a component it can loop in (the reachable elements
+        only change between components and the walk passes through the others in one step).
+
+        Returns:
+            entered: Whether the walk has just entered such a component.
+        """
+        component = self.components[self.current['id']]
+        if component == self.component or component not in self.cyclic:
+            return False
+        self.component = component
+        self.reachable_vertices, self.reachable_edges = self.graph.reachable(self.current['id'])
+        return True
+
+    def _dead_end(self, name: str) -> PathGeneratorException:
+        """
+        This builds the error of a walk stopped before its stop condition is fulfilled.
+
+        Args:
+            name: The generator name.
+
+        Returns:
+            exception: The exception to raise.
+        """
+        kind = 'vertex without out edges' if self.at_vertex else 'edge without target vertex'
+        return PathGeneratorException(f"The walk of '{name}' reached the {kind} {self.current['name']} in the model "
+                                      f"{self.graph.name} before its stop condition was fulfilled.")
+
+    def __iter__(self) -> Iterator[Dict]:
+        """
+        This yields the steps of the walk one at a time. A walk which can no longer fulfill its stop condition
+        raises a PathGeneratorException instead of ending early or looping forever.
+
+        Returns:
+            steps: The generator of steps.
+        """
+        graph = self.graph
+        if graph.start_id in graph.edges:
+            yield self._step(graph.start_id, True)
+            target = graph.edges[graph.start_id].get('targetVertexId')
+            if target not in graph.vertices:
+                unfulfilled = next((name for name, c in self.generators if not c.fulfilled(self)), None)
+                if unfulfilled:
+                    raise self._dead_end(unfulfilled)
+                return
+            yield self._step(target, False)
+        else:
+            yield self._step(graph.start_id, False)
+
+        for name, condition in self.generators:
+            self.component = self.components[self.current['id']]
+            self.reachable_vertices, self.reachable_edges = graph.reachable(self.current['id'])
+            if not condition.attainable(self):
+                raise PathGeneratorException(f"The stop condition of '{name}' can never be fulfilled in the model "
+                                             f"{graph.name} - check for unreachable elements.")
+            self.plan.clear()
+            while not condition.fulfilled(self):
+                if not graph.out_edges[self.current['id']]:
+                    raise self._dead_end(name)
+                edge = self.next_edge(name, condition)
+                yield self._step(edge, True)
+                target = graph.edges[edge].get('targetVertexId')
+                if target not in graph.vertices:
+                    raise self._dead_end(name)
+                yield self._step(target, False)
+                if self._entered_loop() and not condition.attainable(self):
+                    raise PathGeneratorException(f"The stop condition of '{name}' can no longer be fulfilled from "
+                                                 f"{self.current['name']} in the model {graph.name} - the walk can "
+                                                 f"not leave it to reach the missing elements.")
+
+
+GENERATORS = ('random', 'weighted_random', 'quick_random', 'a_star', 'chinese_postman')
+
+
+def iter_path(models: Dict, generator: str = None, seed=None) -> Iterator[Dict]:
+    """
+    This walks a model and yields its steps one at a time.
+
+    Args:
+        models: The {'models': [...]} json of a model.
+        generator: The generator expression - defaults to the one stored in the model.
+        seed (None|int): The seed for the random choices.
+
+    Returns:
+        steps: The generator of steps ({'id', 'name', 'modelName'[, 'actions']}).
+    """
+    model = next((m for m in models['models'] if m.get('startElementId')), None)
+    if not model:
+        raise PathGeneratorException('No model with a startElementId was found.')
+    generator = generator or model.get('generator') or 'random(edge_coverage(100))'
+    return iter(Walk(ModelGraph(model), parse_generator(generator), seed))
+
+
+def generate_path(models: Dict, generator: str = None, seed=None) -> List[Dict]:
+    """
+    This walks a model, the in process replacement for 'altwalker offline'.
+
+    Args:
+        models: The {'models': [...]} json of a model.
+        generator: The generator expression - defaults to the one stored in the model.
+        seed (None|int): The seed for the random choices.
+
+    Returns:
+        steps: The list of steps ({'id', 'name', 'modelName'[, 'actions']}).
+    """
+    return list(iter_path(models, generator, seed))
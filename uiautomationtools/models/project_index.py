@@ -0,0 +1,405 @@
+from typing import Dict, List, Optional, Set
+import os
+import hashlib
+import warnings
+
+from uiautomationtools.models.drawio_decoder import decode_drawio
+import uiautomationtools.helpers.directory_helpers as dh
+
+INDEX_VERSION = 1
+SCOPES = ('tests', 'validations')
+MODEL_EXTENSIONS = ('.drawio', '.txt')
+
+
+class ProjectIndexException(Exception):
+    """Exception when the project index can not resolve a file."""
+
+
+def model_imports(model_file: str) -> Set[str]:
+    """
+    This reads the models imported (i_name -> test_name) by a model.
+
+    Args:
+        model_file: The path of the drawio/txt model.
+
+    Returns:
+        imports: The names of the imported models.
+    """
+    if model_file.endswith('.drawio'):
+        names = [(a.get('value') or '').split('|')[0] for a in decode_drawio(model_file).values()]
+    else:
+        with open(model_file) as fp:
+            names = [line.split('/')[0].strip() for line in fp]
+    return {f'test_{n[2:]}' for n in names if n[:2] == 'i_'}
+
+
+def file_hash(path: str) -> str:
+    """
+    This hashes the content of a file.
+
+    Args:
+        path: The path of the file.
+
+    Returns:
+        hash: The sha256 hex digest.
+    """
+    digest = hashlib.sha256()
+    with open(path, 'rb') as fp:
+        for chunk in iter(lambda: fp.read(1 << 16), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class ProjectIndex(object):
+    """
+    An index of the models, steps, test modules and references of a project. It is persisted in
+    <root>/.uiautomationtools/index.json and refreshed from the directory mtimes, so only the directories that
+    changed since the last run are listed again. The imports of a model are only read when first needed.
+    """
+
+    def __init__(self, root: str = None):
+        """
+        Init method.
+
+        Args:
+            root: The root dir of the project - defaults to dh.get_root_dir().
+        """
+        self.root = root or dh.get_root_dir()
+        self.path = f'{self.root}/.uiautomationtools/index.json'
+        self.dirs = {}
+        self.models = {}
+        self.tables = {}
+        self.duplicates = {}
+        self.changed_models = set()
+        self.unsaved = False
+
+        stored = dh.load_json(self.path)
+        if stored.get('version') == INDEX_VERSION:
+            self.dirs = stored['dirs']
+            self.models = stored['models']
+
+    def refresh(self) -> bool:
+        """
+        This lists the new/changed directories again and updates the metadata of the changed models. The models
+        added, removed or whose content changed are added to changed_models, where they accumulate until taken with
+        pop_changed_models - so a refresh made by another caller does not hide them. Newly found duplicated model
+        names are reported with a warning.
+
+        Returns:
+            changed: Whether anything changed since the last refresh.
+        """
+        changed = False
+        seen = set()
+        stack = [f'{self.root}/{scope}' for scope in SCOPES]
+        while stack:
+            directory = stack.pop()
+            try:
+                mtime = os.stat(directory).st_mtime
+            except OSError:
+                continue
+            seen.add(directory)
+            entry = self.dirs.get(directory)
+            if not entry or entry['mtime'] != mtime:
+                files, dirs = [], []
+                for e in os.scandir(directory):
+                    if e.name[0] == '.' or e.name == '__pycache__':
+                        continue
+                    (dirs if e.is_dir() else files).append(e.name)
+                entry = self.dirs[directory] = {'mtime': mtime, 'files': sorted(files), 'dirs': sorted(dirs)}
+                changed = True
+            stack.extend(f'{directory}/{d}' for d in reversed(entry['dirs']))
+
+        for directory in [d for d in self.dirs if d not in seen]:
+            self.dirs.pop(directory)
+            changed = True
+
+        models = {}
+        changed_models = set()
+        for directory in sorted(self.dirs):
+            for name in self.dirs[directory]['files']:
+                path = f'{directory}/{name}'
+                if self._classify(path)[0] == 'models':
+                    try:
+                        mtime = os.stat(path).st_mtime
+                    except OSError:
+                        continue
+                    model = self.models.get(path)
+                    if not model or model['mtime'] != mtime:
+                        digest = file_hash(path)
+                        if not model or model['hash'] != digest:
+                            changed_models.add(path)
+                        model = {'path': path, 'mtime': mtime, 'hash': digest}
+                        changed = True
+                    models[path] = model
+        changed_models.update(models.keys() ^ self.models.keys())
+        changed = changed or bool(changed_models)
+        self.models = models
+        self.changed_models |= changed_models
+
+        if changed or not self.tables:
+            reported = set(self.duplicates)
+            self._build_tables()
+            for name in sorted(self.duplicates.keys() - reported):
+                warnings.warn(f'Model: {name} found {len(self.duplicates[name])} occurences. '
+                              f'Please ensure each filename is unique: {self.duplicates[name]}', stacklevel=2)
+        if changed or self.unsaved:
+            self.save()
+        return changed
+
+    def pop_changed_models(self) -> Set[str]:
+        """
+        Returns the models changed since the last call and clears them.
+
+        Returns:
+            changed_models: The paths of the models added, removed or changed.
+        """
+        changed_models, self.changed_models = self.changed_models, set()
+        return changed_models
+
+    def save(self):
+        """
+        This persists the index.
+        """
+        dh.make_json({'version': INDEX_VERSION, 'dirs': self.dirs, 'models': self.models}, self.path, atomic=True)
+        self.unsaved = False
+
+    def imports(self, path: str) -> List[str]:
+        """
+        Returns the models imported by a model - read on first use and kept with its entry.
+
+        Args:
+            path: The path of the model.
+
+        Returns:
+            imports: The sorted names of the imported models.
+        """
+        model = self.models.get(path)
+        if model is None:
+            return sorted(model_imports(path))
+        if 'imports' not in model:
+            model['imports'] = sorted(model_imports(path))
+            self.unsaved = True
+        return model['imports']
+
+    def _classify(self, path: str) -> tuple:
+        """
+        This finds the table of a file from the project layout.
+
+        Args:
+            path: The path of the file.
+
+        Returns:
+            kind: 'models', 'steps', 'tests', 'references' or None.
+            scope: The app (or app/platform of the references).
+        """
+        parts = path[len(self.root) + 1:].split('/')
+        if parts[0] == 'tests' and len(parts) > 2:
+            if parts[2] == 'models' and path.endswith(MODEL_EXTENSIONS):
+                return 'models', parts[1]
+            if parts[2] == 'steps' and path.endswith('.json'):
+                return 'steps', parts[1]
+            if path.endswith('.py'):
+                return 'tests', parts[1]
+        elif parts[0] == 'validations' and len(parts) > 3 and path.endswith('.json'):
+            return 'references', f'{parts[1]}/{parts[2]}'
+        return None, None
+
+    def _build_tables(self):
+        """
+        This builds the lookup tables (kind > scope > file name > paths) and detects the duplicated models.
+        """
+        self.tables = {}
+        self.duplicates = {}
+        for directory in sorted(self.dirs):
+            for name in self.dirs[directory]['files']:
+                self.add_file(f'{directory}/{name}')
+
+    def add_file(self, path: str):
+        """
+        This registers a file written by the current process.
+
+        Args:
+            path: The path of the file.
+        """
+        kind, scope = self._classify(path)
+        if not kind:
+            return
+        paths = self.tables.setdefault(kind, {}).setdefault(scope, {}).setdefault(os.path.basename(path), [])
+        if path not in paths:
+            paths.append(path)
+            if kind == 'models' and len(paths) > 1:
+                self.duplicates[f'{scope}/{os.path.basename(path)}'] = paths
+
+    def _lookup(self, kind: str, scope: Optional[str], names: List[str], refresh: bool = True) -> List[str]:
+        """
+        This finds the paths of file names. A miss, or a path which no longer exists (moved or renamed), refreshes
+        the index once.
+
+        Args:
+            kind: The table.
+            scope: The app (or app/platform) - every scope when None.
+            names: The file names.
+            refresh: Whether to refresh the index on a miss.
+
+        Returns:
+            paths: The matching paths in the order of the names.
+        """
+        for attempt in range(1 + refresh):
+            tables = self.tables.get(kind, {})
+            scopes = list(tables.values()) if scope is None else [tables.get(scope, {})]
+            paths = [p for name in names for table in scopes for p in table.get(name, [])]
+            existing = [p for p in paths if os.path.exists(p)]
+            if attempt or (not paths and not refresh) or (paths and len(existing) == len(paths)):
+                return existing
+            self.refresh()
+
+    def files(self, kind: str, scope: str = None) -> Dict[str, List[str]]:
+        """
+        Returns the paths of a table.
+
+        Args:
+            kind: 'models', 'steps', 'tests' or 'references'.
+            scope: The app (or app/platform) - every scope when None.
+
+        Returns:
+            files: The paths by file name.
+        """
+        tables = self.tables.get(kind, {})
+        files = {}
+        for table in (tables.values() if scope is None else [tables.get(scope, {})]):
+            for name, paths in table.items():
+                files.setdefault(name, []).extend(paths)
+        return files
+
+    def model_paths(self, model_name: str, app_dir: str = None) -> List[str]:
+        """
+        Returns every path of a model (more than one is a duplicate).
+
+        Args:
+            model_name: The name of the model - with or without extension.
+            app_dir: App under test folder's name - every app when None.
+
+        Returns:
+            paths: The drawio then txt paths of the model.
+        """
+        if model_name.endswith(MODEL_EXTENSIONS):
+            return self._lookup('models', app_dir, [model_name])
+        return self._lookup('models', app_dir, [f'{model_name}{ext}' for ext in MODEL_EXTENSIONS])
+
+    def model(self, model_name: str, app_dir: str = None) -> Optional[Dict]:
+        """
+        Returns the path, mtime, content hash and imports of a model. Its imports are read when not known yet.
+
+        Args:
+            model_name: The name of the model - no extension needed.
+            app_dir: App under test folder's name - every app when None.
+
+        Returns:
+            model: The model entry or None when not found.
+        """
+        paths = self.model_paths(model_name, app_dir)
+        if not paths:
+            return None
+        duplicates = [p for p in paths if p.endswith(os.path.basename(paths[0]))]
+        if len(duplicates) > 1:
+            raise ProjectIndexException(f'Model: {os.path.basename(paths[0])} found {len(duplicates)} occurences. '
+                                        f'Please ensure each filename is unique: {duplicates}')
+        model = self.models.get(paths[0])
+        if model is None:
+            return {'path': paths[0]}
+        self.imports(paths[0])
+        if self.unsaved:
+            self.save()
+        return model
+
+    def dependents(self, model_names: Set[str], app_dir: str) -> Set[str]:
+        """
+        Returns the models importing (directly or transitively) the given models.
+
+        Args:
+            model_names: The names of the models - no extension.
+            app_dir: App under test folder's name.
+
+        Returns:
+            dependents: The names of the importing models, without the given ones.
+        """
+        importers = {}
+        for path, model in self.models.items():
+            if self._classify(path)[1] == app_dir:
+                name = os.path.basename(path).split('.')[0]
+                for imported in self.imports(path):
+                    importers.setdefault(imported, set()).add(name)
+        if self.unsaved:
+            self.save()
+
+        dependents = set()
+        stack = list(model_names)
+        while stack:
+            for name in importers.get(stack.pop(), ()):
+                if name not in dependents:
+                    dependents.add(name)
+                    stack.append(name)
+        return dependents - set(model_names)
+
+    def steps_file(self, model_name: str, app_dir: str, refresh: bool = False) -> Optional[str]:
+        """
+        Returns the steps file of a model. A miss is expected for new models so it does not refresh by default -
+        the steps written by generate_steps are registered with add_file.
+
+        Args:
+            model_name: The name of the model - no extension needed.
+            app_dir: App under test folder's name.
+            refresh: Whether to refresh the index on a miss.
+
+        Returns:
+            path: The steps json or None when not generated yet.
+        """
+        return next(iter(self._lookup('steps', app_dir, [f'{model_name}.json'], refresh)), None)
+
+    def test_module(self, module_name: str, app_dir: str) -> Optional[str]:
+        """
+        Returns the path of a test module.
+
+        Args:
+            module_name: The module name - no extension needed.
+            app_dir: App under test folder's name.
+
+        Returns:
+            path: The py file or None when not found.
+        """
+        return next(iter(self._lookup('tests', app_dir, [f'{module_name}.py'])), None)
+
+    def reference(self, reference_name: str, app_dir: str, platform_name: str) -> Optional[str]:
+        """
+        Returns the path of stored references.
+
+        Args:
+            reference_name: The json file name.
+            app_dir: App under test folder's name.
+            platform_name: The platform of the driver.
+
+        Returns:
+            path: The json file or None when not found.
+        """
+        return next(iter(self._lookup('references', f'{app_dir}/{platform_name}', [reference_name])), None)
+
+
+_indexes = {}
+
+
+def get_index(root: str = None) -> ProjectIndex:
+    """
+    Returns the index of a project - built (or loaded and refreshed) once per process.
+
+    Args:
+        root: The root dir of the project - defaults to dh.get_root_dir().
+
+    Returns:
+        index: The project index.
+    """
+    root = root or dh.get_root_dir()
+    index = _indexes.get(root)
+    if index is None:
+        index = _indexes[root] = ProjectIndex(root)
+        index.refresh()
+    return index
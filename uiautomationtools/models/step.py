@@ -0,0 +1,119 @@
+import sys
+from types import MappingProxyType
+from collections.abc import Mapping
+from typing import Dict, Iterator, Tuple
+
+_FIELDS = ('id', 'name', 'modelName', 'actions', 'ancestors')
+
+
+class Step(Mapping):
+    """
+    A read only model step. The strings are interned, the ancestors are a tuple and the actions are parsed once
+    into an immutable mapping, so the steps of an import can be shared by every occurrence instead of copied.
+    It reads like the step dictionaries ('name' in step, step['actions'], step.get('ancestors', [])) - use
+    to_dict() for a mutable copy.
+    """
+
+    __slots__ = ('id', 'name', 'modelName', 'actions', 'ancestors', 'extra')
+
+    def __init__(self, id: str, name: str, modelName: str, actions: Mapping = None, ancestors: Tuple[str] = (),
+                 extra: Dict = None):
+        """
+        Init method.
+
+        Args:
+            id: The id of the model element.
+            name: The step name (e_, v_, i_, iv_).
+            modelName: The name of the model of the step.
+            actions: The parsed actions.
+            ancestors: The imports (i_) the step comes from - outermost first.
+            extra: Any other keys of the step.
+        """
+        self.id = id
+        self.name = sys.intern(name)
+        self.modelName = sys.intern(modelName) if modelName else modelName
+        self.actions = actions if actions is None or type(actions) is MappingProxyType else MappingProxyType(actions)
+        self.ancestors = tuple(sys.intern(a) for a in ancestors)
+        self.extra = extra
+
+    @classmethod
+    def from_dict(cls, step: Mapping, parse_actions=None) -> 'Step':
+        """
+        Builds a step from a step dictionary.
+
+        Args:
+            step: The step e.g. from the steps json.
+            parse_actions: The function parsing a list of action strings.
+
+        Returns:
+            step: The step object.
+        """
+        if type(step) is Step:
+            return step
+        actions = step.get('actions')
+        if actions is not None and not isinstance(actions, Mapping):
+            actions = parse_actions(actions) if actions else None
+        extra = {k: v for k, v in step.items() if k not in _FIELDS} or None
+        return cls(step.get('id'), step['name'], step.get('modelName'), actions, step.get('ancestors') or (), extra)
+
+    def imported(self, name: str, actions: Mapping = None) -> 'Step':
+        """
+        Returns the step as part of an import occurrence.
+
+        Args:
+            name: The i_ step name of the import.
+            actions: The parsed actions of the i_ step - they override the actions of the step.
+
+        Returns:
+            step: The step with the import in its ancestors and the merged actions.
+        """
+        merged = self.actions
+        if actions:
+            merged = actions if not merged else MappingProxyType({**merged, **actions})
+        ancestors = self.ancestors if name in self.ancestors else self.ancestors + (sys.intern(name),)
+        step = Step.__new__(Step)
+        step.id, step.name, step.modelName, step.extra = self.id, self.name, self.modelName, self.extra
+        step.actions, step.ancestors = merged, ancestors
+        return step
+
+    def to_dict(self) -> Dict:
+        """
+        Returns the step as a (mutable) dictionary.
+
+        Returns:
+            step: The step dictionary.
+        """
+        step = dict(self)
+        if 'actions' in step:
+            step['actions'] = dict(step['actions'])
+        if 'ancestors' in step:
+            step['ancestors'] = list(step['ancestors'])
+        return step
+
+    def __getitem__(self, key: str):
+        if key in _FIELDS:
+            value = getattr(self, key)
+            if value is None or value == ():
+                raise KeyError(key)
+            return value
+        if self.extra and key in self.extra:
+            return self.extra[key]
+        raise KeyError(key)
+
+    def __iter__(self) -> Iterator[str]:
+        for key in _FIELDS:
+            value = getattr(self, key)
+            if value is not None and value != ():
+                yield key
+        if self.extra:
+            yield from self.extra
+
+    def __len__(self) -> int:
+        return sum(1 for _ in self)
+
+    def __repr__(self) -> str:
+        return f'Step({dict(self)!r})'
+
+    def __reduce__(self):
+        return Step, (self.id, self.name, self.modelName, dict(self.actions) if self.actions is not None else None,
+                      self.ancestors, self.extra)
@@ -0,0 +1,145 @@
+import os
+import json
+import hashlib
+from typing import Dict, List
+
+import uiautomationtools.helpers.directory_helpers as dh
+
+try:
+    from importlib.metadata import version
+except ImportError:
+    version = None
+
+
+def tool_version() -> str:
+    """
+    Returns the installed version of ui-automation-tools-mbt.
+
+    Returns:
+        version: The version or 'dev' when not installed.
+    """
+    try:
+        return version('ui-automation-tools-mbt')
+    except Exception:
+        return 'dev'
+
+
+class StepsCache(object):
+    """
+    A content addressed store of generated steps. An entry is keyed by the model file contents, the model name (written
+    in the modelName of the steps), the generator, the seed, the backend and the tool version, so an unchanged model never has to be converted or walked again.
+    """
+
+    def __init__(self, directory: str, max_bytes: int = 64 * 1024 * 1024, max_entries: int = 2000):
+        """
+        Init method.
+
+        Args:
+            directory: Where the entries are stored e.g. tests/<app>/steps/.cache.
+            max_bytes: The total size of the entries before the least recently used are evicted.
+            max_entries: The number of entries before the least recently used are evicted.
+        """
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.max_entries = max_entries
+
+    def key(self, model_file: str, generator: str, seed: int = None, backend: str = 'python',
+            model_name: str = None) -> str:
+        """
+        Computes the cache key of a model.
+
+        Args:
+            model_file: The path of the drawio/txt model.
+            generator: The generator expression.
+            seed: The seed of the path generator.
+            backend: The path generator backend.
+            model_name: The name of the model - defaults to the file name without extension.
+
+        Returns:
+            key: The hex digest identifying the steps.
+        """
+        digest = hashlib.sha256()
+        with open(model_file, 'rb') as fp:
+            for chunk in iter(lambda: fp.read(1 << 16), b''):
+                digest.update(chunk)
+        model_name = model_name or os.path.splitext(os.path.basename(model_file))[0]
+        digest.update(json.dumps([model_name, generator, seed, backend, tool_version()]).encode('utf-8'))
+        return digest.hexdigest()
+
+    def path(self, key: str) -> str:
+        """
+        Returns the path of an entry.
+
+        Args:
+            key: The cache key.
+
+        Returns:
+            path: The json file of the entry.
+        """
+        return f'{self.directory}/{key}.json'
+
+    def lock(self, key: str):
+        """
+        Returns the lock of a key so only one process generates the same steps.
+
+        Args:
+            key: The cache key.
+
+        Returns:
+            lock: The context manager holding the lock.
+        """
+        return dh.file_lock(f'{self.directory}/locks/{key}.lock')
+
+    def get(self, key: str) -> List[Dict]:
+        """
+        Returns the cached steps and marks them as recently used.
+
+        Args:
+            key: The cache key.
+
+        Returns:
+            steps: The steps or None on a cache miss.
+        """
+        path = self.path(key)
+        try:
+            with open(path) as fp:
+                steps = json.load(fp)
+            os.utime(path)
+        except (OSError, ValueError):
+            return None
+        return steps
+
+    def put(self, key: str, steps: List[Dict]):
+        """
+        Stores steps atomically then evicts the least recently used entries.
+
+        Args:
+            key: The cache key.
+            steps: The generated steps.
+        """
+        dh.make_json(steps, self.path(key), atomic=True)
+        self.evict()
+
+    def evict(self):
+        """
+        Removes the least recently used entries above max_bytes/max_entries. The lock files are left in place:
+        another process may hold or wait on one, and a new one would not be mutually exclusive with it.
+        """
+        entries = []
+        for entry in os.scandir(self.directory):
+            if entry.is_file() and entry.name.endswith('.json'):
+                try:
+                    stat = entry.stat()
+                except OSError:
+                    continue
+                entries.append((stat.st_mtime, stat.st_size, entry.path))
+
+        entries.sort()
+        total = sum(e[1] for e in entries)
+        while entries and (total > self.max_bytes or len(entries) > self.max_entries):
+            _, size, path = entries.pop(0)
+            total -= size
+            try:
+                os.remove(path)
+            except OSError:
+                pass
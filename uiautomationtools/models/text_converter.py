@@ -1,7 +1,10 @@
+import io
 import json
 import os
-import random
-import string
+import hashlib
+from glob import iglob
+from typing import Iterable, Iterator, List, Tuple
+from concurrent.futures import ProcessPoolExecutor
 
 
 class TextConverterException(Exception):
@@ -10,17 +13,18 @@ class TextConverterException(Exception):
 
 class TextConverter:
 
+    states = {"e_": "v_", "i_": "iv_"}
+    actions = ('e_', 'v_', 'i_', 'iv_')
+
     def __init__(self, debug: bool = False):
         """
         Init method
-        
+
         Args:
             debug: True to have always same ID patterns.
         """
         self.reset()
-        self.letters = string.ascii_letters + string.digits
-        if debug:
-            self.letters = "A"
+        self.debug = debug
 
     def reset(self):
         """
@@ -29,6 +33,7 @@ class TextConverter:
         self.content = []
         self.parsed_content = []
         self.path_file = ""
+        self.content_hash = ""
 
     def read_content(self, path_file: str):
         """
@@ -40,124 +45,153 @@ class TextConverter:
         Raises:
             TextConverterException: Raised when file to be open is not found
         """
-
-        def clean_line(line: str) -> str:
-            line = line.lstrip(' ')
-            i = 0
-            while i < len(line):
-                if line[i] not in [' ', '\t']:
-                    break
-                i += 1
-            return line[i:len(line)]
-
         self.reset()
         self.path_file = path_file
         if not os.path.exists(path_file):
             raise TextConverterException(f"File: '{path_file}' not found.")
         with open(path_file, 'r') as file:
-            self.content = file.readlines()
-        self.content = [clean_line(x) for x in self.content]
+            self.content = [line.lstrip(' \t') for line in file]
 
-    def process_content(self):
+    def tokenize(self, lines: Iterable[str]) -> Iterator[Tuple[str, List[str], int]]:
         """
-        Process the current content to make it json friendly.
+        Parses the lines of a text model in a single pass.
+
+        Args:
+            lines: The lines of the file (e.g. the file object itself).
+
+        Returns:
+            tokens: The generator of (action, params, line number) tuples.
+
+        Raises:
+            TextConverterException: Raised when the content is not a valid text model.
         """
-        def has_params(line_position: int) -> bool:
-            return '/' in self.content[line_position]
-
-        def is_an_action(line_position: int) -> bool:
-            actions = ['e_', 'v_', 'i_', 'iv_']
-            if has_params(line_position):
-                return True
-            if any((self.content[line_position].startswith(x)) for x in actions):
-                if '=' not in self.content[line_position]:
-                    return True
-            return False
-
-        def is_empty(line: str) -> str:
-            return len(line) < 2
-
-        i = 0
-        start_found = False
-        # Start
-        while i < len(self.content):
-            if not is_empty(self.content[i]):
-                if self.content[i].title().startswith("Start"):
-                    start_found = True
-                    i += 1
-                    break
-            i += 1
-        if not start_found:
-            raise TextConverterException(
-                f"The {self.path_file} does not have 'Start' entry point format.\nCheck the example how test formats are supported")
+        def is_an_action(line: str) -> bool:
+            return '/' in line or (line.startswith(self.actions) and '=' not in line)
 
-        # steps
-        state = {"e_": "v_", "i_": "iv_"}
+        def lines_params(action: str, params: List[str], action_line_no: int) -> tuple:
+            if len(params) == 0:
+                raise TextConverterException(
+                    f"Error parsing at line: {action_line_no} | Expected a method with parameters. If not, do not use the '/' at the end of the line")
+            return action, params, action_line_no
+
+        line_no = 0
+        started = False
         status = ""
-        while i < len(self.content):
-            if is_empty(self.content[i]):
-                i += 1
+        found = False
+        collecting = None
+        for line_no, line in enumerate(lines, 1):
+            line = line.lstrip(' \t')
+            if collecting:
+                if not is_an_action(line):
+                    collecting[1].append(line.rstrip('\n'))
+                    continue
+                yield lines_params(*collecting)
+                collecting = None
+
+            if len(line) < 2:
                 continue
+            # Start
+            if not started:
+                started = line.title().startswith("Start")
+                continue
+
+            # steps
             if status != "":
-                if self.content[i].startswith(state[status]):
+                if line.startswith(self.states[status]):
                     status = ""
                 else:
                     raise TextConverterException(
-                        f"Error parsing at line: {str(i + 1)} | Expected a method which starts with '{state[status]}' but received the method: {self.content[i]}")
+                        f"Error parsing at line: {line_no} | Expected a method which starts with '{self.states[status]}' but received the method: {line}")
+            elif line.startswith("e_") or line.startswith("i_"):
+                status = line[0:2]
             else:
-                if self.content[i].startswith("e_") or self.content[i].startswith("i_"):
-                    status = self.content[i][0:2]
-                else:
-                    raise TextConverterException(
-                        f"Error parsing at line: {str(i + 1)} | Expected a method which starts with 'e_' or 'i_' but received the method: {self.content[i]}")
-            if has_params(i):
-                action = self.content[i].split('/')[0].replace(' ', '')
-                params_raw = self.content[i].rstrip('\n').split('/')[1]
-                params = []
-                if ";" in params_raw:
-                    # inline parameters,
-                    params = [f"{x.lstrip(' ').rstrip(' ')};" for x in params_raw.split(';') if x != '']
-                    i += 1
-                else:
-                    i += 1
-                    while i < len(self.content):
-                        if is_an_action(i):
-                            break
-                        params.append(self.content[i].lstrip(' ').rstrip('\n'))
-                        i += 1
-
-                if len(params) == 0:
-                    raise TextConverterException(
-                        f"Error parsing at line: {str(i)} | Expected a method with parameters. If not, do not use the '/' at the end of the line")
-                self.parsed_content.append((action, params))
+                raise TextConverterException(
+                    f"Error parsing at line: {line_no} | Expected a method which starts with 'e_' or 'i_' but received the method: {line}")
+
+            found = True
+            if '/' not in line:
+                yield line.replace('\n', '').replace(' ', ''), [], line_no
+                continue
+
+            action = line.split('/')[0].replace(' ', '')
+            params_raw = line.rstrip('\n').split('/')[1]
+            if ";" in params_raw:
+                # inline parameters,
+                params = [f"{x.strip(' ')};" for x in params_raw.split(';') if x != '']
+                yield lines_params(action, params, line_no)
             else:
-                self.parsed_content.append(
-                    (self.content[i].replace('\n', '').replace(' ', ''), []))
-                i += 1
+                collecting = (action, [], line_no)
+
+        if collecting:
+            yield lines_params(*collecting)
+
+        if not started:
+            raise TextConverterException(
+                f"The {self.path_file} does not have 'Start' entry point format.\nCheck the example how test formats are supported")
 
         if status != "":
             raise TextConverterException(
-                f"Error parsing at line: {str(i + 1)} | Expected a method which starts with '{state[status]}' but reached the end of the file (EOL)")
+                f"Error parsing at line: {line_no + 1} | Expected a method which starts with '{self.states[status]}' but reached the end of the file (EOL)")
 
-        if len(self.parsed_content) == 0:
+        if not found:
             raise TextConverterException(f"Error parsing file: {self.path_file} | No methods found.")
 
-    def convert_to_JSON(self, path_to_file: str, generator: str = "random(edge_coverage(100))"):
+    def process_content(self):
         """
-        Converts the data to Json format and stores it in a file.
+        Process the current content to make it json friendly.
+        """
+        self.parsed_content = [(action, params) for action, params, _ in self.tokenize(self.content)]
+
+    def parse(self, path_to_file: str) -> Iterator[Tuple[str, List[str], int]]:
+        """
+        Parses a text model file - the file is read and hashed at once then tokenized line by line.
 
         Args:
-            path_file: Path to the file.
+            path_to_file: Path to the file.
+
+        Returns:
+            tokens: The generator of (action, params, line number) tuples.
+        """
+        self.reset()
+        self.path_file = path_to_file
+        if not os.path.exists(path_to_file):
+            raise TextConverterException(f"File: '{path_to_file}' not found.")
+
+        with open(path_to_file, 'rb') as file:
+            data = file.read()
+        self.content_hash = hashlib.sha1(data).hexdigest()
+        yield from self.tokenize(io.StringIO(data.decode('utf-8'), newline=None))
+
+    def generate_id(self) -> str:
+        """
+        Generates the prefix of the element IDs from the content of the parsed file, so the same model always
+        gives the same json.
+
+        Returns:
+            id: The 20 characters ID.
+        """
+        if self.debug:
+            return "A" * 20
+        return self.content_hash[:20]
+
+    def to_model(self, path_to_file: str, generator: str = "random(edge_coverage(100))") -> dict:
+        """
+        Converts the data to the graphwalker json model format.
+
+        Args:
+            path_to_file: Path to the file.
             generator: The mode the graphwalker will generate the steps.
+
+        Returns:
+            data: The {'models': [...]} json of the text model.
         """
         vertex_defaults = {'properties': {
             'x': 0.0, 'y': 0.0, 'description': ''}}
         edge_defaults = {'properties': {'description': ''},
                          'weight': 0.0, 'dependency': 0}
 
-        self.read_content(path_to_file)
-        self.process_content()
-        general_id = ''.join(random.choice(self.letters) for _ in range(20))
+        self.parsed_content = [(action, params) for action, params, _ in self.parse(path_to_file)]
+        general_id = self.generate_id()
         basename = os.path.splitext(os.path.basename(path_to_file))[0]
         id = ""
         vertices = []
@@ -197,7 +231,80 @@ class TextConverter:
                 }
             ]
         }
+        return data
+
+    def to_steps(self, path_to_file: str) -> list:
+        """
+        Converts the data straight into the steps of the model. A text model is a linear chain so the walk covering
+        it is known - this gives the steps the path generators produce without building the graph.
+
+        Args:
+            path_to_file: Path to the file.
+
+        Returns:
+            steps: The steps in the altwalker steps format.
+        """
+        self.parsed_content = [(action, params) for action, params, _ in self.parse(path_to_file)]
+        general_id = self.generate_id()
+        basename = os.path.splitext(os.path.basename(path_to_file))[0]
+        steps = []
+        for action_counter, (action, params) in enumerate(self.parsed_content, 1):
+            if action.startswith('e_') or action.startswith('i_'):
+                step = {'id': f"e/{general_id}-{action_counter}", 'name': action, 'modelName': basename}
+                if len(params) > 0:
+                    step['actions'] = params
+            elif action.startswith('v_') or action.startswith('iv_'):
+                step = {'id': f"n/{general_id}-{action_counter}", 'name': action, 'modelName': basename}
+            else:
+                raise TextConverterException(
+                    f'Unexpected entry received: {action}')
+            steps.append(step)
+        return steps
+
+    def convert_to_JSON(self, path_to_file: str, generator: str = "random(edge_coverage(100))"):
+        """
+        Converts the data to Json format and stores it in a file.
 
+        Args:
+            path_file: Path to the file.
+            generator: The mode the graphwalker will generate the steps.
+        """
+        data = self.to_model(path_to_file, generator)
+        basename = os.path.splitext(os.path.basename(path_to_file))[0]
         dirname = os.path.dirname(path_to_file)
         with open(f'{dirname}{os.sep}{basename}.json', 'w') as outfile:
             json.dump(data, outfile, indent=4)
+
+
+def _convert_file(path_to_file: str, generator: str) -> str:
+    """
+    Converts one text model (in a worker process).
+
+    Args:
+        path_to_file: Path to the file.
+        generator: The mode the graphwalker will generate the steps.
+
+    Returns:
+        path: The path of the json model.
+    """
+    TextConverter().convert_to_JSON(path_to_file, generator)
+    return f'{os.path.splitext(path_to_file)[0]}.json'
+
+
+def convert_directory(directory: str, generator: str = "random(edge_coverage(100))", workers: int = None) -> List[str]:
+    """
+    Converts every text model of a directory (recursively) to Json in a process pool.
+
+    Args:
+        directory: The directory of the text models.
+        generator: The mode the graphwalker will generate the steps.
+        workers: The number of processes.
+
+    Returns:
+        paths: The paths of the json models.
+    """
+    files = sorted(iglob(f'{directory}/**/*.txt', recursive=True))
+    if not files:
+        return []
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        return list(executor.map(_convert_file, files, [generator] * len(files)))
@@ -0,0 +1,95 @@
+import sys
+import ast
+import pytest
+sys.path.append("..")
+
+from uiautomationtools.models.code_generator import CodeGenerator, CodeGeneratorException
+
+
+def drawio(*names):
+    cells = ['<mxCell id="0"/><mxCell id="1" parent="0"/><mxCell id="s" value="Start" parent="1" vertex="1"/>']
+    source = 's'
+    for i, (edge, vertex) in enumerate(zip(names[::2], names[1::2])):
+        cells.append(f'<mxCell id="v{i}" value="{vertex}" parent="1" vertex="1"/>'
+                     f'<mxCell id="e{i}" parent="1" source="{source}" target="v{i}" edge="1"/>'
+                     f'<mxCell id="l{i}" value="{edge}" parent="e{i}" vertex="1"/>')
+        source = f'v{i}'
+    return f'<mxfile><diagram id="d"><mxGraphModel><root>{"".join(cells)}</root></mxGraphModel></diagram></mxfile>'
+
+
+@pytest.fixture
+def project(tmp_path, monkeypatch):
+    models_dir = tmp_path / 'tests' / 'app' / 'models'
+    models_dir.mkdir(parents=True)
+    (tmp_path / 'Pipfile').write_text('')
+    (models_dir / 'test_login.drawio').write_text(drawio('e_open', 'v_open', 'e_login', 'v_home'))
+    (models_dir / 'test_cart.drawio').write_text(drawio('i_login', 'iv_login', 'e_add', 'v_cart'))
+    monkeypatch.chdir(tmp_path)
+    return tmp_path
+
+
+class TestCodeGenerator:
+
+    def test_build(self, project):
+        # Arrange
+        code = CodeGenerator('app')
+        # Act
+        created_files = code.build()
+        # Assert
+        classes_dir = project / 'tests' / 'app' / 'ui_automation'
+        assert {str(classes_dir / name) for name in ('__init__.py', 'test_login.py', 'test_cart.py')} == \
+               set(created_files)
+        content = (classes_dir / 'test_login.py').read_text()
+        assert 'class TestLogin(AppiumBasePytest):' in content
+        assert ['e_login', 'e_open', 'v_home', 'v_open'] == [line.split('(')[0][8:] for line in content.split('\n')
+                                                              if line.startswith('    def ')]
+        assert [] == code.build()
+
+    def test_add_missing_methods(self, project):
+        # Arrange
+        code = CodeGenerator('app')
+        code.build()
+        models_dir = project / 'tests' / 'app' / 'models'
+        test_module = project / 'tests' / 'app' / 'ui_automation' / 'test_login.py'
+        user_code = test_module.read_text().replace('raise NotImplementedError("The e_open method has not been '
+                                                    'implemented yet.")', 'self.open()  # user code')
+        test_module.write_text(user_code)
+        (models_dir / 'test_login.drawio').write_text(drawio('e_open', 'v_open', 'e_logout', 'v_home'))
+        # Act
+        report = code.add_missing_methods(dry_run=True)
+        unchanged = test_module.read_text()
+        added = code.add_missing_methods()
+        # Assert
+        assert {str(test_module): {'TestLogin': ['e_logout']}} == report == added
+        assert user_code == unchanged
+        content = test_module.read_text()
+        assert content.startswith(user_code.rstrip('\n'))
+        assert content.endswith('    def e_logout(self):\n        raise NotImplementedError("The e_logout method has '
+                                'not been implemented yet.")\n\n')
+        assert {} == code.add_missing_methods()
+
+    def test_add_missing_methods_inline_pass(self, project):
+        # Arrange
+        code = CodeGenerator('app')
+        code.build()
+        test_module = project / 'tests' / 'app' / 'ui_automation' / 'test_cart.py'
+        test_module.write_text('from base import Base\n\n\nclass TestCart(Base): pass\n')
+        # Act
+        added = code.add_missing_methods()
+        # Assert
+        assert {str(test_module): {'TestCart': ['e_add', 'v_cart']}} == added
+        content = test_module.read_text()
+        assert content.startswith('from base import Base\n\n\nclass TestCart(Base):\n    def e_add(self):\n'
+                                  '        raise NotImplementedError(')
+        assert ['e_add', 'v_cart'] == [n.name for n in ast.parse(content).body[1].body]
+        assert {} == code.add_missing_methods()
+
+    def test_build_FAIL_missing_import(self, project):
+        # Arrange
+        models_dir = project / 'tests' / 'app' / 'models'
+        (models_dir / 'test_checkout.drawio').write_text(drawio('i_payment', 'iv_payment'))
+        # Act
+        with pytest.raises(CodeGeneratorException) as e:
+            CodeGenerator('app').build()
+        # Assert
+        assert 'Imported models not found: test_checkout imports test_payment' == str(e.value)
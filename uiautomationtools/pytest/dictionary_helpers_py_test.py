@@ -0,0 +1,71 @@
+import sys
+sys.path.append("..")
+
+from uiautomationtools.helpers.dictionary_helpers import compare_dictionaries, async_compare_dictionaries, \
+    merkle_compare_dictionaries, merkle_tree, MERKLE_KEY
+
+STORED = {'login': [{'id': 'login', 'text': 'Log in', 'tag': 'button', 'bounds': '1'}], 'write_time': 'a',
+          'banner': [{'tag': 'img'}]}
+CURRENT = {'login': [{'id': 'login', 'text': 'LOG IN', 'tag': 'a', 'bounds': '2', 'class': 'primary'}],
+           'write_time': 'b', 'footer': [{'tag': 'div'}]}
+
+
+class TestDictionaryHelpers:
+
+    def test_compare_dictionaries(self):
+        # Act
+        mismatches = compare_dictionaries(STORED, CURRENT, ['write_time', 'bounds'])
+        # Assert
+        expected = {'keys': {'f1_not_in_f2': ['banner.0.tag'], 'f2_not_in_f1': ['login.0.class', 'footer.0.tag']},
+                    'values': [{'key': 'login.0.text', 'd1': 'Log in', 'd2': 'LOG IN'},
+                               {'key': 'login.0.tag', 'd1': 'button', 'd2': 'a'}],
+                    'skipped_keys': ['write_time', 'bounds', 'login.0.bounds', 'write_time']}
+        assert expected == mismatches
+
+    def test_async_compare_dictionaries(self):
+        # Arrange
+        skipped_keys = ['write_time', 'bounds']
+        # Act
+        mismatches = async_compare_dictionaries(STORED, CURRENT, skipped_keys, normalize=True)
+        # Assert
+        expected = {'skipped_keys': ['write_time', 'bounds', 'login.0.bounds'],
+                    'keys': ['banner', 'footer', 'login.0.class'],
+                    'values': [{'key': 'login.0.tag', 'd1': 'button', 'd2': 'a'}]}
+        assert expected == mismatches
+        assert ['write_time', 'bounds'] == skipped_keys
+
+    def test_merkle_compare_dictionaries(self):
+        # Arrange
+        stored = dict(STORED, **{f'item_{i}': [{'tag': 'li', 'text': f'{i}'}] for i in range(300)})
+        current = dict(CURRENT, **{f'item_{i}': [{'tag': 'li', 'text': f'{i}'}] for i in range(300)})
+        # Act
+        mismatches = merkle_compare_dictionaries(stored, current, ['write_time', 'bounds'], normalize=True,
+                                                 untracked=['write_time'])
+        unchanged = merkle_compare_dictionaries(stored, dict(stored, write_time='c'), ['write_time'],
+                                                untracked=['write_time'])
+        # Assert
+        expected = async_compare_dictionaries(stored, current, ['write_time', 'bounds'], normalize=True)
+        assert sorted(expected['keys']) == sorted(mismatches['keys'])
+        assert expected['values'] == mismatches['values']
+        assert {'skipped_keys': ['write_time']} == unchanged
+
+    def test_merkle_compare_dictionaries_stale_tree(self):
+        # Arrange
+        stored = dict(STORED, **{MERKLE_KEY: merkle_tree(CURRENT, untracked=['write_time'])})
+        current = dict(CURRENT, **{MERKLE_KEY: merkle_tree(CURRENT, untracked=['write_time'])})
+        # Act
+        mismatches = merkle_compare_dictionaries(stored, current, ['write_time', 'bounds'], normalize=True,
+                                                 untracked=['write_time'])
+        # Assert
+        expected = async_compare_dictionaries(STORED, CURRENT, ['write_time', 'bounds'], normalize=True)
+        assert sorted(expected['keys']) == sorted(mismatches['keys'])
+        assert expected['values'] == mismatches['values']
+
+    def test_merkle_compare_dictionaries_given_trees(self):
+        # Arrange
+        tree1 = merkle_tree(STORED, untracked=['write_time'])
+        tree2 = merkle_tree(dict(STORED, write_time='b'), untracked=['write_time'])
+        # Act
+        mismatches = merkle_compare_dictionaries(STORED, CURRENT, ['write_time'], tree1=tree1, tree2=tree2)
+        # Assert
+        assert {'skipped_keys': ['write_time']} == mismatches
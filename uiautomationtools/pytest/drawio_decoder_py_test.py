@@ -0,0 +1,138 @@
+import os
+import re
+import sys
+import zlib
+import base64
+import pytest
+from html.parser import HTMLParser
+from urllib.parse import unquote
+import xml.etree.ElementTree as ET
+sys.path.append("..")
+
+from uiautomationtools.models.drawio_decoder import decode_drawio
+
+tests_data_path = os.path.join(os.path.dirname(__file__), 'tests_data', 'drawio_decoder')
+
+
+class _TextParser(HTMLParser):
+    """Collects the text of html markup like BeautifulSoup(...).text."""
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.parts = []
+
+    def handle_data(self, data):
+        self.parts.append(data)
+
+
+def _html_text(markup):
+    parser = _TextParser()
+    parser.feed(markup)
+    parser.close()
+    return ''.join(parser.parts)
+
+
+def baseline_decode(path):
+    """
+    The former find_drawio_xml_nodes (ElementTree > base64 > raw deflate > unquote > parse > clean values) with
+    the standard library in place of BeautifulSoup, applied to every page.
+    """
+
+    def clean_values(n):
+        value = n.get('value')
+        if not value:
+            return n
+        step_name = re.findall(r'[evi]+(?:_[a-z0-9]+)+', value) or [value]
+        step_name = step_name[0]
+        actions = value.replace(step_name, '')
+        if '=' in actions:
+            text = _html_text(actions).strip()
+            actions = f'|{text[1:].strip()}'
+        n['value'] = f'{step_name}{actions}'
+        return n
+
+    nodes = {}
+    for diagram in ET.parse(path).getroot().iter('diagram'):
+        if (diagram.text or '').strip():
+            xml = zlib.decompress(base64.b64decode(diagram.text), -15)
+            page = ET.fromstring(unquote(xml.decode('utf-8')))
+        else:
+            page = diagram
+        nodes.update({n.attrib['id']: clean_values(dict(n.attrib)) for n in page.iter('mxCell')})
+    return nodes
+
+
+def legacy_find_drawio_xml_nodes(path):
+    """
+    The former find_drawio_xml_nodes - first compressed page only.
+    """
+    from bs4 import BeautifulSoup
+
+    def clean_values(n):
+        value = n.get('value')
+        if not value:
+            return n
+        step_name = re.findall(r'[evi]+(?:_[a-z0-9]+)+', value) or [value]
+        step_name = step_name[0]
+        actions = value.replace(step_name, '')
+        if '=' in actions:
+            text = BeautifulSoup(actions, 'lxml').text.strip()
+            actions = f'|{text[1:].strip()}'
+        n['value'] = f'{step_name}{actions}'
+        return n
+
+    data = list(ET.parse(path).getroot())[0].text
+    xml = unquote(zlib.decompress(base64.b64decode(data), -15).decode('utf-8'))
+    bs = BeautifulSoup(xml, 'lxml')
+    return {n.attrs['id']: clean_values(n.attrs) for n in bs.find_all('mxcell')}
+
+
+class TestDrawioDecoder:
+
+    @pytest.mark.parametrize('file_name', ['compressed.drawio', 'uncompressed.drawio', 'multiple_pages.drawio'])
+    def test_decode_drawio_matches_baseline(self, file_name):
+        # Arrange
+        path = f'{tests_data_path}/{file_name}'
+        # Act
+        nodes = decode_drawio(path)
+        # Assert
+        assert baseline_decode(path) == nodes
+
+    def test_decode_drawio_compressed_matches_uncompressed(self):
+        # Arrange
+        # Act
+        compressed = decode_drawio(f'{tests_data_path}/compressed.drawio')
+        uncompressed = decode_drawio(f'{tests_data_path}/uncompressed.drawio')
+        # Assert
+        assert uncompressed == compressed
+
+    def test_decode_drawio_labels(self):
+        # Arrange
+        # Act
+        nodes = decode_drawio(f'{tests_data_path}/compressed.drawio')
+        # Assert
+        assert 'e_login' == nodes['e0']['value']
+        assert 'v_home<b></b>' == nodes['v1']['value']
+        assert 'e_open_home|user="J&J";\xa0count=2;' == nodes['e1']['value']
+        assert 'e_search|query="Zürich 東京";' == nodes['e2']['value']
+        assert 'start' == nodes['e0']['source']
+
+    def test_decode_drawio_multiple_pages(self):
+        # Arrange
+        # Act
+        nodes = decode_drawio(f'{tests_data_path}/multiple_pages.drawio', workers=2)
+        # Assert
+        assert {'p0-e2', 'p1-e1', 'p2-e0'} <= nodes.keys()
+        assert 'e_add|item=<book>;' == nodes['p1-e0']['value']
+        assert 'Überblick – 概要' == nodes['p1-v1']['value']
+        assert 'e_write_note|text="naïve café";' == nodes['p2-e0']['value']
+
+    def test_decode_drawio_matches_legacy(self):
+        # Arrange
+        pytest.importorskip('bs4')
+        pytest.importorskip('lxml')
+        path = f'{tests_data_path}/compressed.drawio'
+        # Act
+        nodes = decode_drawio(path)
+        # Assert
+        assert legacy_find_drawio_xml_nodes(path) == nodes
@@ -0,0 +1,71 @@
+import re
+import sys
+import pytest
+sys.path.append("..")
+
+from uiautomationtools.helpers.html_helpers import build_references, build_element_references, script_elements
+
+PAGE = ('<div id="main" class="page  wide"><h1>Shop</h1>\n<form name="search"><input placeholder="Search here" '
+        'class=""><button>Go &amp; find</button></form><a rel="noopener external" href="/cart">Cart<br>&#150; 2</a>'
+        '<ul><li>Item</li><li>Item</li></ul><script>var a = 1;</script><!-- promo --><pre>\n</pre></div>')
+
+
+def soup_references(html, skipped_tags=None):
+    from bs4 import BeautifulSoup
+    skipped_tags = skipped_tags or []
+    references = {}
+    for d in BeautifulSoup(html, 'html.parser').descendants:
+        if 'Tag' not in str(type(d)):
+            continue
+        attrs = {k: v for k, v in d.attrs.items() if v}
+        if attrs.get('class'):
+            attrs['class'] = ' '.join(attrs['class'])
+        text = re.sub(r'\n+', '', getattr(d, 'text', ''))
+        if text:
+            attrs['text'] = text
+        attrs['tag'] = d.name
+        context = attrs.get('id') or attrs.get('name') or attrs.get('placeholder') or attrs.get('text') or 'no_key'
+        context = re.sub(r'(\W|_)+', '_', context.lower())
+        if any(t in f"{attrs.get('tag')},{attrs.get('class')},{context}" for t in skipped_tags):
+            continue
+        if attrs not in references.setdefault(context, []):
+            references[context].append(attrs)
+    return references
+
+
+class TestHtmlHelpers:
+
+    def test_build_references(self):
+        # Act
+        references = build_references(PAGE, skipped_tags=['script'])
+        # Assert
+        assert ['main', 'shop', 'search', 'search_here', 'go_find', 'cart_2', 'no_key', 'itemitem', 'item'] == \
+               list(references)
+        assert [{'id': 'main', 'class': 'page wide', 'text': 'ShopGo & findCart– 2ItemItem', 'tag': 'div'}] == \
+               references['main']
+        assert [{'rel': ['noopener', 'external'], 'href': '/cart', 'text': 'Cart– 2', 'tag': 'a'}] == \
+               references['cart_2']
+        assert [{'text': 'Item', 'tag': 'li'}] == references['item']
+        assert [{'tag': 'br'}, {'tag': 'pre'}] == references['no_key']
+
+    def test_build_references_soup_equivalence(self):
+        # Arrange
+        pytest.importorskip('bs4')
+        html = PAGE + ('<p>&foo; <b>a<br/>b</b><template><i>t</i></template><br></br><td headers="a b">'
+                       '<![CDATA[x]]>&#x80;&#0;</td><ruby>k<rt>r</rt></ruby></div></p> ') * 3
+        # Act
+        references = build_references(html, skipped_tags=['ul', 'no_key'])
+        # Assert
+        assert soup_references(html, skipped_tags=['ul', 'no_key']) == references
+
+    def test_build_element_references_script_elements(self):
+        # Arrange
+        html = '<a rel="noopener external" href="/cart">Cart</a><div class="list"><li>Item</li><li>Item</li></div>'
+        page = {'lines': ['Cart', 'Item'], 'texts': [[0, 1], [1], []], 'ranges': [[0, 4], [2, 4], [4, 4]],
+                'elements': [['a', ['rel', 'noopener external', 'href', '/cart'], 'Cart'],
+                             ['div', ['class', 'list'], 'ItemItem'], ['li', [], 'Item'], ['li', [], 'Item']]}
+        # Act
+        references = build_element_references(script_elements(page), skipped_tags=['list'])
+        # Assert
+        assert build_references(html, skipped_tags=['list']) == references
+        assert script_elements({'lines': [], 'texts': [[]], 'ranges': [[0, 0]], 'elements': []}) is None
@@ -0,0 +1,101 @@
+import sys
+import pytest
+sys.path.append("..")
+
+from uiautomationtools.models.model_analyzer import analyze_project, check_model, strongly_connected_components, \
+    ModelAnalyzerException
+
+
+def drawio(*cells):
+    root = '<mxCell id="0"/><mxCell id="1" parent="0"/><mxCell id="s" value="Start" parent="1" vertex="1"/>'
+    cells = root + ''.join(cells)
+    return f'<mxfile><diagram id="d"><mxGraphModel><root>{cells}</root></mxGraphModel></diagram></mxfile>'
+
+
+def vertex(id, name):
+    return f'<mxCell id="{id}" value="{name}" parent="1" vertex="1"/>'
+
+
+def edge(id, name, source, target=None):
+    target = f' target="{target}"' if target else ''
+    return (f'<mxCell id="{id}" parent="1" source="{source}"{target} edge="1"/>'
+            f'<mxCell id="l{id}" value="{name}" parent="{id}" vertex="1"/>')
+
+
+@pytest.fixture
+def project(tmp_path, monkeypatch):
+    models_dir = tmp_path / 'tests' / 'app' / 'models'
+    models_dir.mkdir(parents=True)
+    (tmp_path / 'Pipfile').write_text('')
+    (models_dir / 'test_login.drawio').write_text(drawio(
+        vertex('a', 'v_open'), vertex('b', 'v_home'), edge('e1', 'e_open', 's', 'a'), edge('e2', 'e_login', 'a', 'b'),
+        edge('e3', 'e_logout', 'b', 'a')))
+    (models_dir / 'test_cart.txt').write_text('Start:\ni_login / user="foo";\niv_login\ne_add\nv_add\n')
+    monkeypatch.chdir(tmp_path)
+    return tmp_path
+
+
+class TestModelAnalyzer:
+
+    def test_analyze_project(self, project):
+        # Act
+        diagnostics = analyze_project(str(project))
+        # Assert
+        assert [] == diagnostics
+
+    def test_analyze_project_broken_models(self, project):
+        # Arrange
+        models_dir = project / 'tests' / 'app' / 'models'
+        (models_dir / 'test_login.drawio').write_text(drawio(
+            vertex('a', 'v_open'), vertex('b', 'v_home'), vertex('c', 'v_lost'), vertex('d', 'v_error'),
+            edge('e1', 'e_open', 's', 'a'), edge('e2', 'e_login', 'a', 'b'), edge('e3', 'e_fail', 'a', 'd'),
+            edge('e4', 'e_retry', 'a')))
+        (models_dir / 'test_search.txt').write_text('Start:\ni_checkout\niv_checkout\n')
+        # Act
+        diagnostics = analyze_project(str(project))
+        # Assert
+        login = str(models_dir / 'test_login.drawio')
+        expected = [('error', login, 'The edge e_retry (le4) has no target vertex.'),
+                    ('error', login, "The vertices are not reachable from 'Start': v_lost."),
+                    ('error', str(models_dir / 'test_search.txt'), 'The imported model test_checkout is not found.')]
+        assert expected == [d for d in diagnostics if d.level == 'error']
+        expected = [f'The walk can not leave the dead end: {name} - the edges outside of it may never be covered.'
+                    for name in ('v_error', 'v_home')]
+        assert expected == sorted(d.message for d in diagnostics if d.level == 'warning')
+
+    def test_check_model_FAIL_import_cycle(self, project):
+        # Arrange
+        models_dir = project / 'tests' / 'app' / 'models'
+        (models_dir / 'test_login.txt').write_text('Start:\ni_cart\niv_cart\n')
+        (models_dir / 'test_login.drawio').unlink()
+        # Act
+        with pytest.raises(ModelAnalyzerException) as e:
+            check_model('test_cart', 'app', str(project))
+        # Assert
+        assert str(e.value).endswith('Import cycle detected between the models: test_cart, test_login')
+
+    @pytest.mark.parametrize('content, error', [
+        ('<mxfile><diagram id="d">bm90IGJhc2U2NA</diagram></mxfile>', 'Incorrect padding'),
+        ('<mxfile><diagram id="d">Z2FyYmFnZQ==</diagram></mxfile>', 'Error -3 while decompressing data'),
+        ('<mxfile><diagram id="d"><mxGraphModel><root>', 'no element found'),
+    ])
+    def test_analyze_project_corrupt_drawio(self, project, content, error):
+        # Arrange
+        login = project / 'tests' / 'app' / 'models' / 'test_login.drawio'
+        login.write_text(content)
+        # Act
+        diagnostics = analyze_project(str(project))
+        with pytest.raises(ModelAnalyzerException) as e:
+            check_model('test_cart', 'app', str(project))
+        # Assert
+        assert [('error', str(login))] == [d[:2] for d in diagnostics]
+        assert diagnostics[0].message.startswith(f'The drawio file can not be decoded: {error}')
+        assert str(diagnostics[0]) in str(e.value)
+
+    def test_strongly_connected_components(self):
+        # Arrange
+        graph = {'a': ['b'], 'b': ['c', 'd'], 'c': ['a'], 'd': ['e'], 'e': ['d'], 'f': []}
+        # Act
+        components = strongly_connected_components(graph, graph.__getitem__)
+        # Assert
+        assert [['d', 'e'], ['a', 'b', 'c'], ['f']] == [sorted(c) for c in components]
@@ -0,0 +1,117 @@
+import sys
+import os
+import threading
+import pytest
+sys.path.append("..")
+
+import uiautomationtools.models.model_compiler as model_compiler
+from uiautomationtools.models.model_compiler import precompile, recompile, import_levels, ModelCompilerException, \
+    ModelWatcher
+from uiautomationtools.models.project_index import get_index
+
+
+@pytest.fixture
+def project(tmp_path, monkeypatch):
+    models_dir = tmp_path / 'tests' / 'app' / 'models'
+    models_dir.mkdir(parents=True)
+    (tmp_path / 'Pipfile').write_text('')
+    (models_dir / 'test_login.txt').write_text('Start:\ne_open\nv_open\n')
+    (models_dir / 'test_cart.txt').write_text('Start:\ni_login / user="foo";\niv_login\ne_add\nv_add\n')
+    (models_dir / 'test_checkout.txt').write_text('Start:\ni_cart\niv_cart\ne_pay\nv_pay\n')
+    monkeypatch.chdir(tmp_path)
+    return tmp_path
+
+
+class TestModelCompiler:
+
+    def test_precompile(self, project):
+        # Act
+        timings = precompile(workers=1)
+        # Assert
+        assert {'app/test_login', 'app/test_cart', 'app/test_checkout'} == set(timings)
+        for name in ('test_login', 'test_cart', 'test_checkout'):
+            assert os.path.exists(project / 'tests' / 'app' / 'steps' / f'{name}.json')
+
+    def test_precompile_skips_fresh_steps(self, project):
+        # Arrange
+        precompile(workers=1)
+        model = project / 'tests' / 'app' / 'models' / 'test_cart.txt'
+        os.utime(model, (model.stat().st_atime, model.stat().st_mtime + 10))
+        # Act
+        timings = precompile(workers=1)
+        # Assert
+        assert ['app/test_cart', 'app/test_checkout'] == list(timings)
+
+    def test_recompile_dependents(self, project):
+        # Arrange
+        precompile(workers=1)
+        index = get_index(str(project))
+        index.pop_changed_models()
+        model = project / 'tests' / 'app' / 'models' / 'test_login.txt'
+        model.write_text('Start:\ne_open\nv_open\ne_close\nv_close\n')
+        index.refresh()
+        changed_models = sorted(index.pop_changed_models())
+        # Act
+        timings = recompile(changed_models)
+        # Assert
+        assert [str(model)] == changed_models
+        assert ['app/test_login', 'app/test_cart', 'app/test_checkout'] == list(timings)
+
+    def test_watcher_edit_during_recompile(self, project, monkeypatch):
+        # Arrange
+        precompile(workers=1)
+        models_dir = project / 'tests' / 'app' / 'models'
+        calls = []
+        done = threading.Event()
+
+        def fake_recompile(model_files, *args):
+            calls.append([os.path.basename(f) for f in model_files])
+            if len(calls) == 1:
+                (models_dir / 'test_checkout.txt').write_text('Start:\ni_cart\niv_cart\ne_pay\nv_pay\ne_ship\n')
+                recompile(model_files, *args)
+            else:
+                done.set()
+
+        index = get_index(str(project))
+        polled = threading.Event()
+        pop_changed_models = index.pop_changed_models
+
+        def fake_pop_changed_models():
+            changed_models = pop_changed_models()
+            polled.set()
+            return changed_models
+
+        monkeypatch.setattr(model_compiler, 'recompile', fake_recompile)
+        monkeypatch.setattr(index, 'pop_changed_models', fake_pop_changed_models)
+        watcher = ModelWatcher(interval=0.01, debounce=0)
+        watcher.start()
+        # Act
+        try:
+            polled.wait(5)
+            (models_dir / 'test_login.txt').write_text('Start:\ne_open\nv_open\ne_close\nv_close\n')
+            done.wait(5)
+        finally:
+            watcher.stop()
+        # Assert
+        assert [['test_login.txt'], ['test_checkout.txt']] == calls[:2]
+
+    def test_import_levels(self, project):
+        # Arrange
+        models_dir = project / 'tests' / 'app' / 'models'
+        models = {p.stem: str(p) for p in models_dir.iterdir()}
+        # Act
+        levels = import_levels(models)
+        # Assert
+        assert [['test_login'], ['test_cart'], ['test_checkout']] == levels
+
+    def test_import_levels_FAIL_cycle(self, project):
+        # Arrange
+        models_dir = project / 'tests' / 'app' / 'models'
+        (models_dir / 'test_login.txt').write_text('Start:\ni_checkout\niv_checkout\n')
+        models = {p.stem: str(p) for p in models_dir.iterdir()}
+        # Act
+        with pytest.raises(ModelCompilerException) as e:
+            import_levels(models)
+        # Assert
+        expected = 'Import cycle detected between the models: test_cart, test_checkout, test_login'
+        assert expected == str(e.value)
@@ -0,0 +1,200 @@
+import sys
+import json
+import random
+import pytest
+sys.path.append("..")
+
+from uiautomationtools.models.model_conversion import prune_steps, actions_to_dict, step_expander, \
+    expand_pruned_steps, clear_import_cache, iter_pruned_steps, iter_prepared_steps, generate_steps, apply_params, \
+    ModelConversionException
+
+
+def legacy_prune_steps(model_steps, decision_map=None):
+    """The former numpy based implementation (np.where replaced by a comprehension)."""
+    def flatten(value):
+        return [i for v in value for i in flatten(v)] if isinstance(value, list) else [value]
+
+    default_map = (decision_map or {}).copy()
+    default_map = {k: range(v) if type(v) is int and v > 0 else v for k, v in default_map.items()}
+
+    e_v_model_steps = [m for m in model_steps if m['name'][:2] in ['e_', 'v_']]
+    ancestors = [m.get('ancestors', [m['name']])[0] for m in e_v_model_steps]
+    hist = {a: [i for i, b in enumerate(ancestors) if a == b] for a in ancestors}
+    indices = {k: [i for i in range(len(v)) if abs(v[i] - v[i - 1]) > 1] + [len(v)] for k, v in hist.items()}
+    indices = {k: [v[indices[k][i - 1]: indices[k][i]] for i in range(1, len(indices[k]))] or
+                  [v[:indices[k][0]]] for k, v in hist.items()}
+    filtered_indices = [v[default_map[k]] if k in default_map else v for k, v in indices.items()]
+    filtered_indices = sorted(flatten(filtered_indices))
+    pruned_steps = [e_v_model_steps[i] for i in filtered_indices]
+    for p in pruned_steps.copy():
+        if 'delete' in p['name'].lower():
+            index = pruned_steps.index(p)
+            pruned_steps.append(pruned_steps.pop(index))
+    return pruned_steps
+
+
+def random_steps(rng, size):
+    imports = ['i_login', 'i_cart', 'i_search']
+    steps = []
+    while len(steps) < size:
+        if rng.random() < 0.3:
+            name = rng.choice(imports)
+            steps.append({'name': name, 'modelName': 'test_root'})
+            steps.append({'name': f'iv_{name[2:]}', 'modelName': 'test_root'})
+            for _ in range(rng.randint(0, 6)):
+                prefix = rng.choice(['e_', 'v_', 'i_'])
+                steps.append({'name': f"{prefix}{rng.choice(['open', 'close', 'delete_item'])}",
+                              'modelName': f'test_{name[2:]}', 'ancestors': [name]})
+        else:
+            prefix = rng.choice(['e_', 'v_'])
+            steps.append({'name': f"{prefix}{rng.choice(['home', 'delete_all', 'menu'])}", 'modelName': 'test_root'})
+    return steps
+
+
+def random_decision_map(rng):
+    keys = ['i_login', 'i_cart', 'i_search', 'e_home', 'v_menu']
+    decisions = [0, -1, slice(1, None), slice(None, 2), slice(None, None, 2)]
+    return {k: rng.choice(decisions) for k in rng.sample(keys, rng.randint(0, len(keys)))}
+
+
+@pytest.fixture
+def project(tmp_path, monkeypatch):
+    models_dir = tmp_path / 'tests' / 'app' / 'models'
+    models_dir.mkdir(parents=True)
+    (tmp_path / 'Pipfile').write_text('')
+    (models_dir / 'test_login.txt').write_text('Start:\ne_open / user="foo";\nv_open\ne_delete_item\nv_deleted\n')
+    (models_dir / 'test_cart.txt').write_text('Start:\ni_login / user="bar";\niv_login\ne_add\nv_add\n')
+    (models_dir / 'test_search.txt').write_text('Start:\ne_find\nv_find\n')
+    monkeypatch.chdir(tmp_path)
+    clear_import_cache()
+    yield tmp_path
+    clear_import_cache()
+
+
+class TestModelConversion:
+
+    def test_prune_steps_equivalence(self):
+        # Arrange
+        rng = random.Random(5)
+        for _ in range(500):
+            steps = random_steps(rng, rng.randint(0, 60))
+            decision_map = random_decision_map(rng)
+            # Act
+            try:
+                expected = legacy_prune_steps(steps, decision_map)
+            except IndexError:
+                with pytest.raises(IndexError):
+                    prune_steps(steps, decision_map)
+                continue
+            current = prune_steps(steps, decision_map)
+            # Assert
+            assert expected == current
+
+    def test_expand_pruned_steps_equivalence(self, project):
+        # Arrange
+        rng = random.Random(7)
+        for _ in range(200):
+            steps = []
+            for _ in range(rng.randint(0, 12)):
+                name = rng.choice(['i_login', 'i_cart', 'i_search', 'e_home', 'e_delete_all'])
+                step = {'name': name, 'modelName': 'test_root'}
+                if rng.random() < 0.5:
+                    step['actions'] = [f'user="{rng.choice(["baz", "qux"])}";']
+                steps.append(step)
+                steps.append({'name': f'{"iv" if name[0] == "i" else "v"}_{name[2:]}', 'modelName': 'test_root'})
+            decision_map = random_decision_map(rng)
+            # Act
+            try:
+                expected = prune_steps(step_expander(steps, app_dir='app'), decision_map)
+            except IndexError:
+                with pytest.raises(IndexError):
+                    expand_pruned_steps(steps, decision_map, app_dir='app')
+                continue
+            current = expand_pruned_steps(steps, decision_map, app_dir='app')
+            # Assert
+            assert expected == current
+
+    def test_iter_pruned_steps_equivalence(self):
+        # Arrange
+        rng = random.Random(9)
+        for _ in range(500):
+            steps = random_steps(rng, rng.randint(0, 60))
+            decision_map = random_decision_map(rng)
+            if rng.random() < 0.5:
+                decision_map = {k: rng.choice([0, 2, slice(None, 3), slice(0, None)]) for k in decision_map}
+            # Act
+            try:
+                expected = prune_steps(steps, decision_map)
+            except IndexError:
+                with pytest.raises(IndexError):
+                    list(iter_pruned_steps(iter(steps), decision_map))
+                continue
+            current = list(iter_pruned_steps(iter(steps), decision_map))
+            # Assert
+            assert expected == current
+
+    def test_iter_prepared_steps(self, project):
+        # Arrange
+        models_dir = project / 'tests' / 'app' / 'models'
+        (models_dir / 'test_shop.txt').write_text('Start:\ni_cart\niv_cart\ni_cart / user="baz";\niv_cart\n'
+                                                  'e_delete_cart\nv_empty\ni_search\niv_search\n')
+        decision_map = {'i_cart': 0}
+        # Act
+        streamed = iter_prepared_steps('test_shop', decision_map, app_dir='app')
+        first = next(streamed)
+        # Assert
+        expected = expand_pruned_steps(generate_steps('test_shop', True, app_dir='app'), decision_map, app_dir='app')
+        assert expected == [first] + list(streamed)
+
+    def test_expand_pruned_steps_plain_dicts(self, project):
+        # Arrange
+        steps = [{'name': 'i_cart', 'modelName': 'test_shop'}, {'name': 'iv_cart', 'modelName': 'test_shop'},
+                 {'name': 'i_cart', 'modelName': 'test_shop'}, {'name': 'iv_cart', 'modelName': 'test_shop'}]
+        # Act
+        expanded = expand_pruned_steps(steps, app_dir='app')
+        expanded[0]['actions']['user'] = 'qux'
+        expanded[0]['checked'] = True
+        # Assert
+        assert all(type(s) is dict for s in expanded + step_expander(steps, app_dir='app'))
+        assert json.loads(json.dumps(expanded)) == expanded
+        assert {'user': 'bar'} == [s for s in expanded if s['name'] == 'e_open'][1]['actions']
+        assert {'user': 'bar'} == expand_pruned_steps(steps, app_dir='app')[0]['actions']
+
+    def test_apply_params(self, project):
+        # Arrange
+        steps = [{'name': 'i_cart', 'modelName': 'test_shop'}, {'name': 'iv_cart', 'modelName': 'test_shop'},
+                 {'name': 'e_search', 'modelName': 'test_shop', 'actions': ['query="shoes"; page="1";']}]
+        compiled_steps = expand_pruned_steps(steps, app_dir='app')
+        # Act
+        variant = apply_params(compiled_steps, {'user': 'qux', 'query': 'hats'})
+        # Assert
+        expected = [{'user': 'qux'}, {'user': 'qux'}, None, None, {'query': 'hats', 'page': 1},
+                    {'user': 'qux'}, {'user': 'qux'}]
+        assert expected == [s.get('actions') for s in variant]
+        assert compiled_steps[2] is variant[2]
+        assert {'user': 'bar'} == compiled_steps[0]['actions']
+
+    def test_generate_steps_a_star_text_model(self, project):
+        # Act
+        with pytest.raises(ModelConversionException) as e:
+            generate_steps('test_login', True, 'a_star(edge_coverage(100))', app_dir='app')
+        steps = generate_steps('test_login', True, 'a_star(reached_vertex(v_open))', app_dir='app')
+        # Assert
+        assert 'The a_star generator needs a reached_vertex or reached_edge condition.' in str(e.value)
+        assert ['e_open', 'v_open'] == [s['name'] for s in steps]
+
+    def test_prune_steps_keeps_leading_runs(self):
+        # Arrange
+        steps = [{'name': 'e_a', 'ancestors': ['i_login']}, {'name': 'e_b'},
+                 {'name': 'e_a', 'ancestors': ['i_login']}, {'name': 'e_c'},
+                 {'name': 'e_a', 'ancestors': ['i_login']}]
+        # Act
+        pruned = prune_steps(steps, {'i_login': 2})
+        # Assert
+        assert ['e_a', 'e_b', 'e_a', 'e_c'] == [s['name'] for s in pruned]
+
+    def test_actions_to_dict(self):
+        # Act
+        actions = actions_to_dict(['\nuser="foo"; url="a=b";', 'items="[1, 2]";'])
+        # Assert
+        assert {'user': 'foo', 'url': 'a=b', 'items': [1, 2]} == actions
@@ -0,0 +1,150 @@
+import sys
+import json
+import pytest
+sys.path.append("..")
+
+from uiautomationtools.models.path_generator import generate_path, parse_generator, covers_whole_model, \
+    PathGeneratorException
+
+base_test_path = './uiautomationtools/pytest'
+expected_data_path = f'{base_test_path}/expected_data/text_converter'
+
+
+def branching_model(generator="random(edge_coverage(100))"):
+    vertices = [{'id': f'n/{i}', 'name': f'v_{i}'} for i in range(4)]
+    edges = [{'id': 'e/start', 'name': 'e_start', 'targetVertexId': 'n/0'},
+             {'id': 'e/a', 'name': 'e_a', 'sourceVertexId': 'n/0', 'targetVertexId': 'n/1'},
+             {'id': 'e/b', 'name': 'e_b', 'sourceVertexId': 'n/0', 'targetVertexId': 'n/2'},
+             {'id': 'e/c', 'name': 'e_c', 'sourceVertexId': 'n/1', 'targetVertexId': 'n/0'},
+             {'id': 'e/d', 'name': 'e_d', 'sourceVertexId': 'n/2', 'targetVertexId': 'n/0'},
+             {'id': 'e/e', 'name': 'e_e', 'sourceVertexId': 'n/2', 'targetVertexId': 'n/3',
+              'actions': ['\nparam="foo";']},
+             {'id': 'e/f', 'name': 'e_f', 'sourceVertexId': 'n/3', 'targetVertexId': 'n/0'}]
+    return {'models': [{'name': 'test_branching', 'id': '', 'startElementId': 'e/start', 'generator': generator,
+                        'vertices': vertices, 'edges': edges}]}
+
+
+class TestPathGenerator:
+
+    def test_linear_model(self):
+        # Arrange
+        with open(f'{expected_data_path}/only_8_actions_with_inline_params.json') as f:
+            models = json.load(f)
+        # Act
+        steps = generate_path(models)
+        # Assert
+        expected = ['e_action1', 'v_action1', 'i_action2', 'iv_action2',
+                    'e_action3', 'v_action3', 'i_action4', 'iv_action4']
+        assert expected == [s['name'] for s in steps]
+        assert {'only_8_actions_with_inline_params'} == {s['modelName'] for s in steps}
+        assert ['param=1;'] == steps[0]['actions']
+        assert 'actions' not in steps[1]
+
+    def test_edge_coverage(self):
+        # Arrange
+        models = branching_model()
+        # Act
+        steps = generate_path(models, seed=3)
+        # Assert
+        assert {e['id'] for e in models['models'][0]['edges']} <= {s['id'] for s in steps}
+        assert steps[-1]['id'].startswith('n/')
+
+    def test_seed_is_deterministic(self):
+        # Arrange
+        models = branching_model("random(length(40))")
+        # Act
+        first = generate_path(models, seed=7)
+        second = generate_path(models, seed=7)
+        # Assert
+        assert first == second
+        assert 40 <= len(first)
+
+    def test_a_star_shortest_path(self):
+        # Arrange
+        models = branching_model()
+        # Act
+        steps = generate_path(models, "a_star(reached_vertex(v_3))")
+        # Assert
+        assert ['e_start', 'v_0', 'e_b', 'v_2', 'e_e', 'v_3'] == [s['name'] for s in steps]
+
+    def test_chinese_postman_shortest_coverage(self):
+        # Arrange
+        models = branching_model("chinese_postman(edge_coverage(100))")
+        edges = {e['id']: e for e in models['models'][0]['edges']}
+        # Act
+        steps = generate_path(models)
+        # Assert
+        assert set(edges) <= {s['id'] for s in steps}
+        assert 16 == len(steps)
+        for edge, vertex in zip(steps[2::2], steps[1::2]):
+            assert vertex['id'] == edges[edge['id']]['sourceVertexId']
+
+    def test_quick_random_and_sequence(self):
+        # Arrange
+        models = branching_model()
+        # Act
+        steps = generate_path(models, "quick_random(edge_coverage(50)) weighted_random(vertex_coverage(100))", seed=1)
+        # Assert
+        assert {'v_0', 'v_1', 'v_2', 'v_3'} == {s['name'] for s in steps if s['name'].startswith('v_')}
+
+    def test_parse_generator_conditions(self):
+        # Act
+        generators = parse_generator("random(edge_coverage(100) and (length(5) || reached_vertex(v_x)))")
+        # Assert
+        assert 1 == len(generators)
+        assert 'random' == generators[0][0]
+        assert 'AllOf' == type(generators[0][1]).__name__
+
+    def test_covers_whole_model(self):
+        # Act
+        covers = [covers_whole_model(g) for g in ("random(edge_coverage(100))",
+                                                  "quick_random(vertex_coverage(100)) chinese_postman(edge_coverage(100))",
+                                                  "a_star(edge_coverage(100))",
+                                                  "random(edge_coverage(100) or length(3))")]
+        # Assert
+        assert [True, True, False, False] == covers
+
+    def test_parse_generator_FAIL_unknown_condition(self):
+        # Act
+        with pytest.raises(PathGeneratorException) as e:
+            parse_generator("random(requirement_coverage(100))")
+        # Assert
+        expected = "Unsupported stop condition 'requirement_coverage' in: random(requirement_coverage(100))"
+        assert expected == str(e.value)
+
+    def test_unreachable_coverage_FAIL(self):
+        # Arrange
+        models = branching_model()
+        models['models'][0]['edges'].append({'id': 'e/x', 'name': 'e_x', 'sourceVertexId': 'n/9',
+                                             'targetVertexId': 'n/0'})
+        # Act
+        with pytest.raises(PathGeneratorException) as e:
+            generate_path(models)
+        # Assert
+        assert 'can never be fulfilled' in str(e.value)
+
+    def test_sink_component_FAIL(self):
+        # Arrange
+        models = branching_model()
+        models['models'][0]['edges'].append({'id': 'e/g', 'name': 'e_g', 'sourceVertexId': 'n/1',
+                                             'targetVertexId': 'n/4'})
+        models['models'][0]['edges'].append({'id': 'e/h', 'name': 'e_h', 'sourceVertexId': 'n/4',
+                                             'targetVertexId': 'n/4'})
+        models['models'][0]['vertices'].append({'id': 'n/4', 'name': 'v_4'})
+        # Act
+        with pytest.raises(PathGeneratorException) as e:
+            for seed in range(20):
+                generate_path(models, seed=seed)
+        # Assert
+        assert 'can no longer be fulfilled from v_4' in str(e.value)
+
+    def test_dead_end_FAIL(self):
+        # Arrange
+        models = branching_model("random(vertex_coverage(100))")
+        models['models'][0]['edges'].append({'id': 'e/g', 'name': 'e_g', 'sourceVertexId': 'n/1'})
+        # Act
+        with pytest.raises(PathGeneratorException) as e:
+            for seed in range(20):
+                generate_path(models, seed=seed)
+        # Assert
+        assert "The walk of 'random' reached the edge without target vertex e_g" in str(e.value)
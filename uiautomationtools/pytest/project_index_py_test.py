@@ -0,0 +1,94 @@
+import sys
+import os
+import pytest
+sys.path.append("..")
+
+from uiautomationtools.models.project_index import ProjectIndex, ProjectIndexException
+
+
+@pytest.fixture
+def project(tmp_path):
+    models_dir = tmp_path / 'tests' / 'app' / 'models'
+    (models_dir / 'feature').mkdir(parents=True)
+    (tmp_path / 'tests' / 'app' / 'ui_automation').mkdir()
+    (tmp_path / 'validations' / 'app' / 'chrome').mkdir(parents=True)
+    (models_dir / 'test_login.txt').write_text('Start:\ne_open\nv_open\n')
+    (models_dir / 'feature' / 'test_cart.txt').write_text('Start:\ni_login / user="foo";\niv_login\n')
+    (tmp_path / 'tests' / 'app' / 'ui_automation' / 'test_cart.py').write_text('')
+    (tmp_path / 'validations' / 'app' / 'chrome' / 'home.json').write_text('{}')
+    return tmp_path
+
+
+class TestProjectIndex:
+
+    def test_lookups(self, project):
+        # Arrange
+        root = str(project)
+        index = ProjectIndex(root)
+        # Act
+        index.refresh()
+        # Assert
+        model = index.model('test_cart', 'app')
+        assert f'{root}/tests/app/models/feature/test_cart.txt' == model['path']
+        assert ['test_login'] == model['imports']
+        assert f'{root}/tests/app/ui_automation/test_cart.py' == index.test_module('test_cart', 'app')
+        assert f'{root}/validations/app/chrome/home.json' == index.reference('home.json', 'app', 'chrome')
+        assert index.model('test_checkout', 'app') is None
+
+    def test_incremental_refresh(self, project):
+        # Arrange
+        root = str(project)
+        ProjectIndex(root).refresh()
+        index = ProjectIndex(root)
+        # Act
+        unchanged = index.refresh()
+        (project / 'tests' / 'app' / 'models' / 'test_checkout.txt').write_text('Start:\ne_pay\nv_pay\n')
+        # Assert
+        assert not unchanged
+        assert f'{root}/tests/app/models/test_checkout.txt' == index.model('test_checkout', 'app')['path']
+        assert os.path.exists(f'{root}/.uiautomationtools/index.json')
+
+    def test_model_FAIL_duplicates(self, project):
+        # Arrange
+        (project / 'tests' / 'app' / 'models' / 'test_cart.txt').write_text('Start:\ne_add\nv_add\n')
+        index = ProjectIndex(str(project))
+        with pytest.warns(UserWarning, match='Model: app/test_cart.txt found 2 occurences.'):
+            index.refresh()
+        # Act
+        with pytest.raises(ProjectIndexException) as e:
+            index.model('test_cart', 'app')
+        # Assert
+        assert 'Model: test_cart.txt found 2 occurences.' in str(e.value)
+        assert ['app/test_cart.txt'] == list(index.duplicates)
+
+    def test_lazy_imports(self, project):
+        # Arrange
+        root = str(project)
+        index = ProjectIndex(root)
+        # Act
+        index.refresh()
+        unread = [m for m in index.models.values() if 'imports' in m]
+        dependents = index.dependents({'test_login'}, 'app')
+        # Assert
+        assert [] == unread
+        assert {'test_cart'} == dependents
+        assert ['test_login'] == ProjectIndex(root).models[f'{root}/tests/app/models/feature/test_cart.txt']['imports']
+
+    def test_lookup_moved_file(self, project):
+        # Arrange
+        root = str(project)
+        index = ProjectIndex(root)
+        index.refresh()
+        index.model('test_cart', 'app')
+        index.test_module('test_cart', 'app')
+        ui_automation = project / 'tests' / 'app' / 'ui_automation'
+        (ui_automation / 'cart').mkdir()
+        (ui_automation / 'test_cart.py').rename(ui_automation / 'cart' / 'test_cart.py')
+        (project / 'tests' / 'app' / 'models' / 'feature' / 'test_cart.txt').rename(
+            project / 'tests' / 'app' / 'models' / 'test_cart.txt')
+        # Act
+        test_module = index.test_module('test_cart', 'app')
+        model = index.model('test_cart', 'app')
+        # Assert
+        assert f'{root}/tests/app/ui_automation/cart/test_cart.py' == test_module
+        assert f'{root}/tests/app/models/test_cart.txt' == model['path']
@@ -0,0 +1,65 @@
+import sys
+import json
+sys.path.append("..")
+
+from uiautomationtools.validations.reference_store import ReferenceStore, get_reference_store
+
+LOGIN = {'login': [{'id': 'login', 'text': 'Log in', 'tag': 'button'}], 'write_time': 'a'}
+
+
+class TestReferenceStore:
+
+    def test_put_get(self, tmp_path):
+        # Arrange
+        store = ReferenceStore(str(tmp_path / 'references.db'), cache_size=1)
+        # Act
+        store.put('login.json', LOGIN)
+        store.put('home', {'home': []})
+        # Assert
+        assert ['home'] == list(store.cache)
+        assert LOGIN == store.get('feature/login.json')
+        assert ['login'] == list(store.cache)
+        assert {} == store.get('cart')
+        assert ['home', 'login'] == store.names()
+
+    def test_get_returns_copies(self, tmp_path):
+        # Arrange
+        store = ReferenceStore(str(tmp_path / 'references.db'))
+        references = {**LOGIN}
+        store.put('login', references)
+        # Act
+        references['write_time'] = 'b'
+        first = store.get('login')
+        first['write_time'] = 'c'
+        first['login'][0]['text'] = 'Sign in'
+        # Assert
+        assert LOGIN == store.get('login')
+        assert store.get('login') is not store.get('login')
+
+    def test_writes_of_other_connections(self, tmp_path):
+        # Arrange
+        store = get_reference_store('app', 'chrome', root=str(tmp_path))
+        other = ReferenceStore(store.path)
+        store.put('login', LOGIN)
+        other.get('login')
+        # Act
+        store.put('login', {**LOGIN, 'write_time': 'b'})
+        # Assert
+        assert 'b' == other.get('login')['write_time']
+        assert store is get_reference_store('app', 'chrome', root=str(tmp_path))
+        assert str(tmp_path / 'validations' / 'app' / 'chrome' / 'references.db') == store.path
+
+    def test_import_export_json(self, tmp_path):
+        # Arrange
+        (tmp_path / 'chrome' / 'feature').mkdir(parents=True)
+        (tmp_path / 'chrome' / 'feature' / 'login.json').write_text(json.dumps(LOGIN))
+        (tmp_path / 'chrome' / 'home.json').write_text('{}')
+        store = ReferenceStore(str(tmp_path / 'references.db'))
+        # Act
+        names = store.import_json(str(tmp_path / 'chrome'))
+        paths = ReferenceStore(store.path).export_json(str(tmp_path / 'exported'))
+        # Assert
+        assert ['home', 'login'] == names
+        assert [str(tmp_path / 'exported' / 'feature' / 'login.json'), str(tmp_path / 'exported' / 'home.json')] == \
+               sorted(paths)
+        assert LOGIN == json.loads((tmp_path / 'exported' / 'feature' / 'login.json').read_text())
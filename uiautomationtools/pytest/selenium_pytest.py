@@ -2,12 +2,24 @@ import os
 import shutil
 import importlib
 from glob import iglob
+from types import MethodType
+from time import perf_counter
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
 
 import uiautomationtools.models.model_conversion as mc
+import uiautomationtools.models.model_analyzer as ma
+from uiautomationtools.models.project_index import get_index
 import uiautomationtools.helpers.string_helpers as sh
 import uiautomationtools.helpers.directory_helpers as dh
 
 
+NO_STEPS_MESSAGE = ("No model steps were generated - check the model drawio and json files. "
+                    "If the issue seems unexplainable, don't try to fix it - in new drawio files, "
+                    "just redraw the model and it's imports.")
+
+
 class PytestHelper(object):
     app = None
     PARAMS = {}
@@ -22,14 +34,28 @@ class PytestHelper(object):
     test_data = None
     credentials = {}
     model_steps = None
+    original_model_steps = None
     selectors = {}
     new_steps = True
     decision_map = None
+    steps_backend = 'python'
+    pipelined_setup = False
+    stream_steps = False
+    parameter_sets = None
+    analyze_models = False
+    steps_future = None
+    setup_started = None
+    setup_timings = {}
 
     def setup_class(self):
         """
-        Setup that runs before any 'test_' methods.
+        Setup that runs before any 'test_' methods. With pipelined_setup the model steps are prepared in a
+        background thread while the fixtures (e.g. test_app starting the driver) run, and joined before the first
+        step (or at teardown when the class fails before). With stream_steps they are generated while they run.
+        With analyze_models the model and its imports are checked first so a broken diagram fails before any step
+        is generated.
         """
+        self.setup_started = perf_counter()
         self.root_dir = self.root_dir or dh.get_root_dir()
         self.app_dir = dh.get_src_app_dir()
         self.calling_test = self.calling_test or os.environ.get('PYTEST_CURRENT_TEST').split('::')[0]
@@ -37,101 +63,308 @@ class PytestHelper(object):
             self.test_path = f"{self.root_dir}/{self.calling_test}"
 
         self.test_data = f"{self.root_dir}/tests/{self.app_dir}/data/"
+        if self.analyze_models:
+            ma.check_model(self.calling_test.split('/')[-1].split('.')[0], self.app_dir, self.root_dir)
 
-        files = iglob(f'{self.root_dir}/credentials//**', recursive=True)
-        if not self.credentials:
-            self.credentials = {os.path.basename(f).split('.')[0]: dh.load_json(f)
-                                for f in files if os.path.basename(f)}
+        if self.stream_steps:
+            self.steps_future = None
+            self.load_credentials()
+        elif self.pipelined_setup:
+            executor = ThreadPoolExecutor(max_workers=1)
+            self.steps_future = executor.submit(self.prepare_model_steps)
+            executor.shutdown(wait=False)
+        else:
+            self.steps_future = None
+            self.setup_timings = {'steps': self.prepare_model_steps()}
 
-        model_name = self.calling_test.split('/')[-1].split('.')[0]
-        self.model_steps = self.model_steps or mc.prepare_steps(model_name, self.new_steps, self.decision_map)
-        self.original_model_steps = self.model_steps[:] # deepcopy if doesnt work
+    @classmethod
+    def load_credentials(cls):
+        """
+        This loads the credentials of the project.
+        """
+        files = iglob(f'{cls.root_dir}/credentials//**', recursive=True)
+        if not cls.credentials:
+            cls.credentials = {os.path.basename(f).split('.')[0]: dh.load_json(f)
+                               for f in files if os.path.basename(f)}
 
-        if self.skip_validations:
-            self.model_steps = [s for s in self.model_steps if not s['name'].startswith('v_')]
+    @classmethod
+    def filter_steps(cls, model_steps):
+        """
+        This removes the validations (skip_validations) and the skipped steps.
+
+        Args:
+            model_steps (iterable): The model steps.
 
-        if self.skipped_steps:
-            filtered_models = []
-            for step in self.model_steps:
-                if any(ancestor in self.skipped_steps for ancestor in step.get('ancestors', [])):
+        Returns:
+            model_steps (generator): The steps to run.
+        """
+        for step in model_steps:
+            if cls.skip_validations and step['name'].startswith('v_'):
+                continue
+            if cls.skipped_steps:
+                if any(ancestor in cls.skipped_steps for ancestor in step.get('ancestors', [])):
                     continue
-                if any(name in self.skipped_steps for name in step.get('name', [])):
+                if any(name in cls.skipped_steps for name in step.get('name', [])):
                     continue
-                filtered_models.append(step)
-            self.model_steps = filtered_models
-        if not self.model_steps:
-            raise Exception("No model steps were generated - check the model drawio and json files. "
-                            "If the issue seems unexplainable, don't try to fix it - in new drawio files, "
-                            "just redraw the model and it's imports.")
+            yield step
+
+    @staticmethod
+    def record_steps(model_steps, recorded):
+        """
+        This keeps the steps of a stream as they are generated (stream_steps).
+
+        Args:
+            model_steps (iterable): The model steps.
+            recorded (list): The list the steps are appended to.
+
+        Returns:
+            model_steps (generator): The same steps.
+        """
+        for step in model_steps:
+            recorded.append(step)
+            yield step
+
+    @classmethod
+    def prepare_model_steps(cls):
+        """
+        This loads the credentials and prepares the model steps of the calling test.
+
+        Returns:
+            seconds (float): The time spent.
+        """
+        start = perf_counter()
+        cls.load_credentials()
+
+        model_name = cls.calling_test.split('/')[-1].split('.')[0]
+        cls.model_steps = cls.model_steps or mc.prepare_steps(model_name, cls.new_steps, cls.decision_map,
+                                                              cls.steps_backend, cls.app_dir)
+        cls.original_model_steps = cls.model_steps[:] # deepcopy if doesnt work
+        cls.model_steps = list(cls.filter_steps(cls.model_steps))
+        if not cls.model_steps:
+            raise Exception(NO_STEPS_MESSAGE)
+        return perf_counter() - start
+
+    @classmethod
+    def join_setup(cls):
+        """
+        This waits for the model steps prepared in the background (pipelined_setup) and records the time the
+        overlap saved: the steps preparation and the foreground setup (fixtures, driver) would have run one after
+        the other.
+
+        Returns:
+            setup_timings (dict): The seconds spent preparing the steps, in the foreground, overall and saved.
+        """
+        if cls.steps_future is None:
+            return cls.setup_timings
+        foreground = perf_counter() - cls.setup_started
+        steps = cls.steps_future.result()
+        wall = perf_counter() - cls.setup_started
+        cls.steps_future = None
+        cls.setup_timings = {'steps': steps, 'foreground': foreground, 'wall': wall,
+                             'overlap': max(steps + foreground - wall, 0.0)}
+        return cls.setup_timings
+
+    @classmethod
+    def cancel_setup(cls):
+        """
+        This cancels the model steps prepared in the background (pipelined_setup) when they were never joined, or
+        waits for them when they already started, so they don't run into the next class.
+        """
+        future, cls.steps_future = cls.steps_future, None
+        if future is None or future.cancel():
+            return
+        try:
+            future.result()
+        except Exception:
+            pass
 
     def teardown_class(self):
         """
         Teardown that runs after 'test_' methods.
         """
+        self.cancel_setup()
         if self.app.driver.custom_proxy and self.app.driver.custom_proxy.process.poll() is None:
             self.app.driver.proxy_dump.stop_proxy_dump()
         for store in self.store.values():
             store['app'].driver.quit()
 
-    def test_run_steps(self, test_app, target):
+    def resolve_step(self, step, classes):
         """
-        This iterates through and runs the model steps.
+        This finds the method of a step: a method of the test itself or one defined by the class of the imported
+        model, bound to the test.
+
+        Args:
+            step (dict): The model step.
+            classes (dict): The classes already imported by model name.
+
+        Returns:
+            method (callable): The bound method, None when not found.
+            test_class (str): The name of the class where the method is expected.
+        """
+        test_module = step['modelName']
+        if not step.get('ancestors'):
+            test_module = 'self'
+        step_name = step['name']
+
+        if test_module == 'self' or test_module == self.test_path.split('/')[-1]:
+            return getattr(self, step_name, None), 'self'
+
+        if test_module not in classes:
+            test_path = get_index(self.root_dir).test_module(test_module, self.app_dir)
+            if not test_path:
+                classes[test_module] = None
+            else:
+                test_module_path = '.'.join(test_path.replace(self.root_dir, '').split('/')[1:-1])
+                module = importlib.import_module(f"{test_module_path}.{test_module}")
+                classes[test_module] = getattr(module, sh.delimiter_to_camelcase(test_module))
+        my_class = classes[test_module]
+        method = my_class and my_class.__dict__.get(step_name)
+        return method and MethodType(method, self), sh.delimiter_to_camelcase(test_module)
+
+    def compile_steps(self, model_steps):
+        """
+        This resolves the method of every step once, before the first step runs.
+
+        Args:
+            model_steps (list): The model steps.
+
+        Returns:
+            compiled_steps (list<tuple>): The (step, bound method) pairs.
+        """
+        classes = {}
+        compiled_steps = []
+        missing = []
+        for step in model_steps:
+            method, test_class = self.resolve_step(step, classes)
+            if method:
+                compiled_steps.append((step, method))
+            else:
+                missing.append(f"{test_class}.{step['name']}")
+
+        if missing:
+            raise Exception(f"The methods of these steps were not found: {', '.join(dict.fromkeys(missing))}")
+        return compiled_steps
+
+    def iter_compiled_steps(self, model_steps):
+        """
+        This resolves the methods of a stream of steps as they come (stream_steps).
+
+        Args:
+            model_steps (iterable): The model steps.
+
+        Returns:
+            compiled_steps (generator<tuple>): The (step, bound method) pairs.
+        """
+        classes = {}
+        methods = {}
+        for step in model_steps:
+            key = (step['modelName'], step['name'], bool(step.get('ancestors')))
+            method = methods.get(key)
+            if method is None:
+                method, test_class = self.resolve_step(step, classes)
+                if not method:
+                    raise Exception(f"The methods of these steps were not found: {test_class}.{step['name']}")
+                methods[key] = method
+            yield step, method
+
+    def fail_run(self, target, e):
+        """
+        This logs a failure of the run and moves its logs to the fail folder.
+
+        Args:
+            target (str): The key of the run in the store.
+            e (Exception): The failure.
+        """
+        fail_path = self.store[target]['logs_path'].replace('/pass/', '/fail/')
+        self.app.driver.logger.error(e, exc_info=True)
+        shutil.move(self.store[target]['logs_path'], fail_path)
+        raise Exception(e)
+
+    @pytest.fixture
+    def param_set(self):
+        """
+        The parameter set of the run - None unless parameter_sets are given.
+        """
+        return None
+
+    def pytest_generate_tests(self, metafunc):
+        """
+        This runs test_run_steps once per parameter set of parameter_sets.
+
+        Args:
+            metafunc (Metafunc): The pytest test function being collected.
+        """
+        if self.parameter_sets and 'param_set' in metafunc.fixturenames:
+            parameter_sets = mc.load_parameter_sets(self.parameter_sets)
+            metafunc.parametrize('param_set', list(parameter_sets.values()), ids=list(parameter_sets))
+
+    def test_run_steps(self, test_app, target, param_set):
+        """
+        This iterates through and runs the model steps. Their methods are resolved first so a missing method fails
+        the run before any step - with stream_steps the steps are generated and resolved while they run. Then
+        model_steps stays None and original_model_steps gets the steps of the run as they are generated (all of
+        them once the run is over).
 
         Args:
             target (str): The pytest target command line param (can set in pytest.ini).
+            param_set (dict): The parameter set substituted into the steps (parameter_sets).
         """
         if not self.app:
             raise Exception('No app driver detected!')
 
+        if param_set is not None:
+            target = f"{target}[{', '.join(f'{k}={v}' for k, v in param_set.items())}]"
         self.store[target] = {'app': self.app, 'steps_completed': [],
                               'step_pass': [False], 'traceback': None,
-                              'logs_path': self.app.driver.logging.log_file_path}
-
-        current_test_module = ''
-        my_class = None
-
-        py_test_path = f'{self.root_dir}/tests/{self.app_dir}'
-        all_test_paths = [py_test for py_test in iglob(f'{py_test_path}//**', recursive=True)
-                          if py_test.split('.')[-1] == 'py']
+                              'logs_path': self.app.driver.logging.log_file_path,
+                              'setup_timings': {}}
 
         if PytestHelper.model_steps:
             self.model_steps = PytestHelper.model_steps
 
-        for step in self.model_steps:
-            self.store[target]['step_pass'][-1] = False
+        try:
+            setup_timings = self.store[target]['setup_timings'] = self.join_setup()
+            if 'overlap' in setup_timings:
+                self.app.driver.logger.info(
+                    f"{type(self).__name__} setup: steps {setup_timings['steps']:.2f}s, fixtures and driver "
+                    f"{setup_timings['foreground']:.2f}s, total {setup_timings['wall']:.2f}s - "
+                    f"{setup_timings['overlap']:.2f}s saved by the pipelined setup")
 
-            actions = step.get('actions')
-            if actions:
-                self.PARAMS.update(actions)
-
-            test_module = step['modelName']
-            if not step.get('ancestors'):
-                test_module = 'self'
-            step_name = step['name']
+            if self.stream_steps and not self.model_steps:
+                model_name = self.calling_test.split('/')[-1].split('.')[0]
+                model_steps = mc.iter_prepared_steps(model_name, self.decision_map, self.steps_backend,
+                                                     app_dir=self.app_dir, new_steps=self.new_steps)
+                self.original_model_steps = []
+                model_steps = self.record_steps(model_steps, self.original_model_steps)
+                if param_set:
+                    model_steps = mc.iter_params(model_steps, param_set)
+                compiled_steps = self.iter_compiled_steps(self.filter_steps(model_steps))
+            else:
+                model_steps = mc.apply_params(self.model_steps, param_set) if param_set else self.model_steps
+                compiled_steps = iter(self.compile_steps(model_steps))
+        except Exception as e:
+            self.fail_run(target, e)
 
+        store = self.store[target]
+        params = self.PARAMS
+        if param_set:
+            params.update(param_set)
+        while True:
             try:
-                if test_module == 'self' or test_module == self.test_path.split('/')[-1]:
-                    eval(f"self.{step_name}()")
-                else:
-                    if test_module != current_test_module:
-                        test_path = dh.find_reference_in_list(f'{test_module}.py', all_test_paths)
-                        test_module_path = '.'.join(test_path.replace(self.root_dir, '').split('/')[1:-1])
-
-                        module = importlib.import_module(f"{test_module_path}.{test_module}")
-                        class_name = sh.delimiter_to_camelcase(test_module)
-                        my_class = getattr(module, class_name)
-                        current_test_module = test_module
-
-                    method_name = my_class.__dict__.get(step_name)
-                    if not method_name:
-                        my_class.PARAMS.update(self.PARAMS)
-                        method_name = my_class.__dict__.get(step_name)
-                    method_name(self)
-
-                self.store[target]['steps_completed'].append(step)
-                self.store[target]['step_pass'][-1] = True
+                step, method = next(compiled_steps, (None, None))
+                if step is None:
+                    break
+                store['step_pass'][-1] = False
+
+                actions = step.get('actions')
+                if actions:
+                    params.update(actions)
+
+                method()
+                store['steps_completed'].append(step)
+                store['step_pass'][-1] = True
             except Exception as e:
-                fail_path = self.store[target]['logs_path'].replace('/pass/', '/fail/')
-                self.app.driver.logger.error(e, exc_info=True)
-                shutil.move(self.store[target]['logs_path'], fail_path)
-                raise Exception(e)
+                self.fail_run(target, e)
+
+        if not store['steps_completed']:
+            self.fail_run(target, Exception(NO_STEPS_MESSAGE))
@@ -0,0 +1,200 @@
+import sys
+import logging
+import threading
+from types import SimpleNamespace
+import pytest
+sys.path.append("..")
+
+from uiautomationtools.pytest.selenium_pytest import PytestHelper
+import uiautomationtools.models.model_conversion as mc
+
+
+class LoginModel(PytestHelper):
+    calls = []
+
+    def e_open(self):
+        self.calls.append(('e_open', dict(self.PARAMS)))
+
+
+@pytest.fixture
+def helper(tmp_path, monkeypatch):
+    classes_dir = tmp_path / 'tests' / 'app' / 'ui_automation'
+    classes_dir.mkdir(parents=True)
+    (classes_dir / 'test_cart_dispatch.py').write_text('class TestCartDispatch:\n'
+                                                       '    def e_add(self):\n'
+                                                       '        self.calls.append(("e_add", dict(self.PARAMS)))\n')
+    monkeypatch.syspath_prepend(str(tmp_path))
+    helper = LoginModel()
+    helper.root_dir, helper.app_dir, helper.test_path = str(tmp_path), 'app', f'{tmp_path}/tests/app/test_login.py'
+    helper.calls = []
+    return helper
+
+
+def fake_app(tmp_path):
+    (tmp_path / 'logs' / 'pass').mkdir(parents=True)
+    (tmp_path / 'logs' / 'fail').mkdir()
+    log_file_path = tmp_path / 'logs' / 'pass' / 'run.log'
+    log_file_path.write_text('')
+    return SimpleNamespace(driver=SimpleNamespace(logger=logging.getLogger('selenium_pytest_py_test'),
+                                                  logging=SimpleNamespace(log_file_path=str(log_file_path)),
+                                                  custom_proxy=None, quit=lambda: None))
+
+
+class TestPytestHelper:
+
+    def test_compile_steps(self, helper):
+        # Arrange
+        steps = [{'name': 'e_open', 'modelName': 'test_login'},
+                 {'name': 'e_add', 'modelName': 'test_cart_dispatch', 'ancestors': ['i_cart_dispatch']}]
+        # Act
+        compiled_steps = helper.compile_steps(steps)
+        for step, method in compiled_steps:
+            method()
+        # Assert
+        assert steps == [step for step, _ in compiled_steps]
+        assert ['e_open', 'e_add'] == [name for name, _ in helper.calls]
+
+    def test_compile_steps_FAIL_missing_methods(self, helper):
+        # Arrange
+        steps = [{'name': 'e_close', 'modelName': 'test_login'},
+                 {'name': 'e_open', 'modelName': 'test_login'},
+                 {'name': 'e_pay', 'modelName': 'test_cart_dispatch', 'ancestors': ['i_cart_dispatch']},
+                 {'name': 'e_pay', 'modelName': 'test_cart_dispatch', 'ancestors': ['i_cart_dispatch']}]
+        # Act
+        with pytest.raises(Exception) as e:
+            helper.compile_steps(steps)
+        # Assert
+        assert 'The methods of these steps were not found: self.e_close, TestCartDispatch.e_pay' == str(e.value)
+
+    def test_iter_compiled_steps_is_lazy(self, helper):
+        # Arrange
+        def model_steps():
+            yield {'name': 'e_open', 'modelName': 'test_login'}
+            yield {'name': 'e_close', 'modelName': 'test_login'}
+
+        compiled_steps = helper.iter_compiled_steps(model_steps())
+        # Act
+        step, method = next(compiled_steps)
+        method()
+        with pytest.raises(Exception) as e:
+            next(compiled_steps)
+        # Assert
+        assert ['e_open'] == [name for name, _ in helper.calls]
+        assert 'The methods of these steps were not found: self.e_close' == str(e.value)
+
+    def test_pipelined_setup(self, tmp_path, monkeypatch):
+        # Arrange
+        started, release = threading.Event(), threading.Event()
+        calls = []
+
+        def prepare_steps(*args):
+            calls.append(args)
+            started.set()
+            assert release.wait(5)
+            return [{'name': 'e_open', 'modelName': 'test_login'}]
+
+        class PipelinedModel(PytestHelper):
+            pipelined_setup = True
+            root_dir = str(tmp_path)
+            calling_test = 'tests/app/test_login.py'
+
+        monkeypatch.setattr(mc, 'prepare_steps', prepare_steps)
+        # Act
+        PipelinedModel.setup_class(PipelinedModel)
+        assert started.wait(5)
+        running = not PipelinedModel.steps_future.done()
+        release.set()
+        setup_timings = PipelinedModel.join_setup()
+        # Assert
+        assert running
+        assert [{'name': 'e_open', 'modelName': 'test_login'}] == PipelinedModel.model_steps
+        assert PipelinedModel.app_dir == calls[0][-1]
+        assert {'steps', 'foreground', 'wall', 'overlap'} == set(setup_timings)
+
+    def test_pipelined_setup_teardown(self, tmp_path, monkeypatch):
+        # Arrange
+        started, release, finished = threading.Event(), threading.Event(), threading.Event()
+
+        def prepare_steps(*args):
+            started.set()
+            assert release.wait(5)
+            finished.set()
+            return [{'name': 'e_open', 'modelName': 'test_login'}]
+
+        class PipelinedModel(PytestHelper):
+            pipelined_setup = True
+            root_dir = str(tmp_path)
+            calling_test = 'tests/app/test_login.py'
+            app = SimpleNamespace(driver=SimpleNamespace(custom_proxy=None))
+            store = {}
+
+        monkeypatch.setattr(mc, 'prepare_steps', prepare_steps)
+        PipelinedModel.setup_class(PipelinedModel)
+        assert started.wait(5)
+        # Act
+        release.set()
+        PipelinedModel.teardown_class(PipelinedModel)
+        # Assert
+        assert finished.is_set()
+        assert PipelinedModel.steps_future is None
+
+    def test_run_steps_FAIL_pipelined_setup(self, tmp_path, monkeypatch):
+        # Arrange
+        def prepare_steps(*args):
+            raise Exception('The model is broken.')
+
+        class PipelinedModel(PytestHelper):
+            pipelined_setup = True
+            root_dir = str(tmp_path)
+            calling_test = 'tests/app/test_login.py'
+            app = fake_app(tmp_path)
+            store = {}
+
+        monkeypatch.setattr(mc, 'prepare_steps', prepare_steps)
+        PipelinedModel.setup_class(PipelinedModel)
+        # Act
+        with pytest.raises(Exception) as e:
+            PipelinedModel().test_run_steps(PipelinedModel.app, 'chrome', None)
+        # Assert
+        assert 'The model is broken.' == str(e.value)
+        assert {} == PipelinedModel.store['chrome']['setup_timings']
+        assert (tmp_path / 'logs' / 'fail' / 'run.log').exists()
+
+    def test_run_steps_stream_steps(self, tmp_path, monkeypatch):
+        # Arrange
+        steps = [{'name': 'e_open', 'modelName': 'test_login', 'actions': {'user': 'foo'}},
+                 {'name': 'v_home', 'modelName': 'test_login'},
+                 {'name': 'e_close', 'modelName': 'test_login'}]
+        calls = []
+
+        def iter_prepared_steps(model_name, *args, **kwargs):
+            calls.append(model_name)
+            yield from steps
+
+        class StreamModel(PytestHelper):
+            stream_steps = True
+            skip_validations = True
+            root_dir = str(tmp_path)
+            calling_test = 'tests/app/test_login.py'
+            app = fake_app(tmp_path)
+            store = {}
+            PARAMS = {}
+
+            def e_open(self):
+                calls.append(('e_open', dict(self.PARAMS)))
+
+            def e_close(self):
+                calls.append(('e_close', dict(self.PARAMS)))
+
+        monkeypatch.setattr(mc, 'iter_prepared_steps', iter_prepared_steps)
+        StreamModel.setup_class(StreamModel)
+        helper = StreamModel()
+        # Act
+        helper.test_run_steps(StreamModel.app, 'chrome', {'user': 'bob'})
+        StreamModel.teardown_class(StreamModel)
+        # Assert
+        assert ['test_login', ('e_open', {'user': 'bob'}), ('e_close', {'user': 'bob'})] == calls
+        assert ['e_open', 'e_close'] == [s['name'] for s in StreamModel.store['chrome[user=bob]']['steps_completed']]
+        assert steps == helper.original_model_steps
+        assert helper.model_steps is None
+        assert (tmp_path / 'logs' / 'pass' / 'run.log').exists()
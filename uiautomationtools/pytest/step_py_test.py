@@ -0,0 +1,41 @@
+import sys
+import pickle
+sys.path.append("..")
+
+from uiautomationtools.models.step import Step
+from uiautomationtools.models.model_conversion import actions_to_dict
+
+
+class TestStep:
+
+    def test_from_dict(self):
+        # Arrange
+        step = {'id': 'e/1', 'name': 'e_login', 'modelName': 'test_login', 'actions': ['user="foo";']}
+        # Act
+        result = Step.from_dict(step, actions_to_dict)
+        # Assert
+        assert {**step, 'actions': {'user': 'foo'}} == result
+        assert 'ancestors' not in result
+        assert [] == result.get('ancestors', [])
+
+    def test_imported(self):
+        # Arrange
+        step = Step('e/1', 'e_login', 'test_login', {'user': 'foo'})
+        # Act
+        child = step.imported('i_login')
+        overridden = child.imported('i_cart', {'user': 'bar'})
+        # Assert
+        assert step.actions is child.actions
+        assert ('i_login',) == child['ancestors']
+        assert {'user': 'bar'} == overridden['actions']
+        assert ('i_login', 'i_cart') == overridden['ancestors']
+
+    def test_to_dict(self):
+        # Arrange
+        step = Step('e/1', 'e_login', 'test_login', {'user': 'foo'}, ('i_login',), {'weight': 1})
+        # Act
+        result = step.to_dict()
+        # Assert
+        assert {'id': 'e/1', 'name': 'e_login', 'modelName': 'test_login', 'actions': {'user': 'foo'},
+                'ancestors': ['i_login'], 'weight': 1} == result
+        assert step == pickle.loads(pickle.dumps(step))
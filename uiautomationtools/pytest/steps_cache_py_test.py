@@ -0,0 +1,71 @@
+import sys
+import os
+import pytest
+sys.path.append("..")
+
+from uiautomationtools.models.steps_cache import StepsCache
+from uiautomationtools.models.model_conversion import generate_steps
+import uiautomationtools.models.model_conversion as mc
+
+
+@pytest.fixture
+def project(tmp_path, monkeypatch):
+    models_dir = tmp_path / 'tests' / 'app' / 'models'
+    models_dir.mkdir(parents=True)
+    (tmp_path / 'Pipfile').write_text('')
+    (models_dir / 'test_a.txt').write_text('Start:\ne_open\nv_open\n')
+    (models_dir / 'test_b.txt').write_text('Start:\ne_open\nv_open\n')
+    monkeypatch.chdir(tmp_path)
+    return tmp_path
+
+
+class TestStepsCache:
+
+    def test_evict_keeps_lock_files(self, tmp_path):
+        # Arrange
+        cache = StepsCache(str(tmp_path), max_entries=1)
+        with cache.lock('old'):
+            cache.put('old', [{'name': 'e_open'}])
+        os.utime(cache.path('old'), (0, 0))
+        # Act
+        with cache.lock('new'):
+            cache.put('new', [{'name': 'e_close'}])
+        # Assert
+        assert cache.get('old') is None
+        assert [{'name': 'e_close'}] == cache.get('new')
+        assert {'old.lock', 'new.lock'} == set(os.listdir(tmp_path / 'locks'))
+
+    def test_keys(self, tmp_path):
+        # Arrange
+        model_file = tmp_path / 'test_a.txt'
+        model_file.write_text('Start:\ne_open\nv_open\n')
+        cache = StepsCache(str(tmp_path / '.cache'))
+        key = cache.key(str(model_file), 'random(edge_coverage(100))')
+        # Act
+        keys = [cache.key(str(model_file), 'random(edge_coverage(100))'),
+                cache.key(str(model_file), 'random(edge_coverage(100))', model_name='test_b'),
+                cache.key(str(model_file), 'random(length(2))'),
+                cache.key(str(model_file), 'random(edge_coverage(100))', seed=1),
+                cache.key(str(model_file), 'random(edge_coverage(100))', backend='altwalker')]
+        # Assert
+        assert key == keys[0]
+        assert 5 == len(set(keys[1:]) | {key})
+
+    def test_generate_steps_cache_hit(self, project, monkeypatch):
+        # Arrange
+        first = generate_steps('test_a', True, app_dir='app')
+        monkeypatch.setattr(mc, '_walk_model', lambda *args: pytest.fail('the model was walked again'))
+        # Act
+        second = generate_steps('test_a', True, app_dir='app')
+        # Assert
+        assert first == second
+        assert {'test_a'} == {s['modelName'] for s in second}
+
+    def test_generate_steps_same_content(self, project):
+        # Act
+        steps_a = generate_steps('test_a', True, app_dir='app')
+        steps_b = generate_steps('test_b', True, app_dir='app')
+        # Assert
+        assert {'test_a'} == {s['modelName'] for s in steps_a}
+        assert {'test_b'} == {s['modelName'] for s in steps_b}
+        assert steps_b == generate_steps('test_b', True, app_dir='app', use_cache=False)
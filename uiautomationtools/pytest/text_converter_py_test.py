@@ -5,7 +5,8 @@ import json
 import pytest
 sys.path.append("..")
 
-from uiautomationtools.models.text_converter import TextConverter, TextConverterException
+from uiautomationtools.models.text_converter import TextConverter, TextConverterException, convert_directory
+from uiautomationtools.models.path_generator import generate_path
 
 base_test_path = './uiautomationtools/pytest'
 test_path = f"{base_test_path}/tests/text_converter"
@@ -197,6 +198,44 @@ class TestTextConverter:
         expected = "Error parsing at line: 4 | Expected a method with parameters. If not, do not use the '/' at the end of the line"
         assert expected == str(e.value)
 
+    @pytest.mark.parametrize("test_name", ["only_8_actions", "only_8_actions_with_inline_params",
+                                           "only_8_actions_with_lines_params"])
+    def test_to_steps(self, test_name):
+        # Arrange
+        models = TextConverter(debug=True).to_model(f'{self.test_path}/{test_name}.txt')
+        # Act
+        steps = TextConverter(debug=True).to_steps(f'{self.test_path}/{test_name}.txt')
+        # Assert
+        assert generate_path(models) == steps
+
+    def test_parse_line_numbers(self):
+        # Act
+        tokens = list(TextConverter().parse(f'{self.test_path}/only_8_actions_with_lines_params.txt'))
+        # Assert
+        assert ('e_action1', ['param=1;'], 2) == tokens[0]
+        assert [2, 4, 5, 8, 9, 12, 14, 16] == [line_no for _, _, line_no in tokens]
+
+    def test_to_model_deterministic_ids(self):
+        # Act
+        first = TextConverter().to_model(f'{self.test_path}/only_8_actions.txt')
+        second = TextConverter().to_model(f'{self.test_path}/only_8_actions.txt')
+        # Assert
+        assert first == second
+        assert 'e/AAAAAAAAAAAAAAAAAAAA-1' != first['models'][0]['startElementId']
+
+    def test_convert_directory(self):
+        # Arrange
+        directory = f'{self.test_path}/batch'
+        os.makedirs(directory, exist_ok=True)
+        for test_name in ["only_8_actions", "only_8_actions_with_inline_params"]:
+            shutil.copy(f'{self.test_path}/{test_name}.txt', directory)
+        # Act
+        paths = convert_directory(directory, workers=2)
+        # Assert
+        assert [f'{directory}/only_8_actions.json', f'{directory}/only_8_actions_with_inline_params.json'] == paths
+        with open(paths[0]) as f:
+            assert TextConverter().to_model(f'{directory}/only_8_actions.txt') == json.load(f)
+
 
 @pytest.fixture(scope="module")
 def clean_environment():
@@ -208,4 +247,11 @@ def create_environment():
     test_data = f'{base_test_path}/tests_data/text_converter/'
     if not os.path.exists(test_data):
         raise Exception("Invalid test environment to be used in the test")
+    shutil.rmtree(test_path, ignore_errors=True)
     shutil.copytree(test_data, test_path)
+    yield
+    shutil.rmtree(test_path, ignore_errors=True)
+    try:
+        os.rmdir(os.path.dirname(test_path))
+    except OSError:
+        pass
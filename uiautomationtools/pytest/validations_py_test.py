@@ -0,0 +1,76 @@
+import sys
+import json
+import logging
+import pytest
+sys.path.append("..")
+
+import uiautomationtools.helpers.dictionary_helpers as dict_helpers
+from uiautomationtools.validations.validations import Validations, MERKLE_SUFFIX
+
+PAGE = '<div id="main"><h1>Shop</h1><button id="login">Log in</button><a id="cart">Cart</a></div>'
+
+
+class FakeDriver(object):
+    logger = logging.getLogger('validations_py_test')
+    platform_name = 'android'
+    context = 'NATIVE_APP'
+
+    def __init__(self, html):
+        self.html = html
+
+    def get_page_source(self):
+        return self.html
+
+
+@pytest.fixture
+def project(tmp_path, monkeypatch):
+    (tmp_path / 'Pipfile').write_text('')
+    monkeypatch.chdir(tmp_path)
+    return tmp_path
+
+
+class TestValidations:
+
+    def test_validate_references_stored_tree(self, project, monkeypatch):
+        # Arrange
+        validations = Validations(FakeDriver(PAGE))
+        file_path = f'{project}/validations/{validations.app_dir}/android/shop.json'
+        validations.build_references_appium(file_path)
+        hashed = []
+        merkle_tree = dict_helpers.merkle_tree
+        monkeypatch.setattr(dict_helpers, 'merkle_tree', lambda d, u=None: hashed.append(d) or merkle_tree(d, u))
+        # Act
+        unchanged = validations.validate_references('shop')
+        validations.driver.html = PAGE.replace('Cart', 'Basket')
+        changed = validations.validate_references('shop', safe=True)
+        # Assert
+        assert 'keys' not in unchanged and 'values' not in unchanged
+        assert ['cart.0.text', 'main.0.text'] == sorted(v['key'] for v in changed['values'])
+        assert 2 == len(hashed)
+        assert json.loads(open(f'{file_path}{MERKLE_SUFFIX}').read())['tree']['root']
+
+    def test_validate_references_edited_baseline(self, project):
+        # Arrange
+        validations = Validations(FakeDriver(PAGE))
+        file_path = f'{project}/validations/{validations.app_dir}/android/shop.json'
+        references = validations.build_references_appium(file_path)
+        references['cart'][0]['text'] = 'Basket'
+        with open(file_path, 'w') as fp:
+            json.dump(references, fp)
+        # Act
+        mismatches = validations.validate_references('shop', safe=True)
+        # Assert
+        assert [{'key': 'cart.0.text', 'd1': 'Basket', 'd2': 'Cart'}] == mismatches['values']
+
+    def test_validate_references_store(self, project):
+        # Arrange
+        validations = Validations(FakeDriver(PAGE), reference_store=True)
+        validations.build_references_appium(f'{project}/validations/{validations.app_dir}/android/shop.json')
+        # Act
+        unchanged = validations.validate_references('shop')
+        validations.driver.html = PAGE.replace('Cart', 'Basket')
+        changed = validations.validate_references('shop', safe=True)
+        # Assert
+        assert validations.reference_store.tree('shop')['root']
+        assert 'values' not in unchanged
+        assert ['cart.0.text', 'main.0.text'] == sorted(v['key'] for v in changed['values'])
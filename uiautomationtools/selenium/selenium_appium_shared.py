@@ -4,7 +4,8 @@ import selenium.common.exceptions as sce
 from selenium.webdriver.common.action_chains import ActionChains
 
 from uiautomationtools.logging.logger import Logger
-from uiautomationtools.helpers.list_helpers import unique_subsets
+import uiautomationtools.helpers.html_helpers as html_helpers
+from uiautomationtools.helpers.list_helpers import encompassing_indexes
 
 
 class SeleniumAppiumShared(object):
@@ -123,18 +124,41 @@ class SeleniumAppiumShared(object):
             elements = [[[t.strip() for t in re.split(r'\n+', e[0]) if t.strip()], e[1]] for e in elements]
             elements = [e for e in elements if len(e[0]) > 0]
 
-            text = [e[0] for e in elements]
-            unique_text = list(dict.fromkeys([t2 for t1 in text for t2 in t1 if t2]))
-            if ''.join(unique_text):
-                all_encompassing, unique_text = unique_subsets(text, unique_text)
+            indexes = encompassing_indexes([e[0] for e in elements])
+            if indexes is not None:
+                return ''.join(elements[i][1] for i in indexes)
 
-                # TODO - need a better way to decide on data and grab leftovers
-                if unique_text:
-                    leftovers = [subset for subset in text if set(unique_text) <= set(subset)]
-                    not leftovers or all_encompassing.append(leftovers[0])
+        if not safe:
+            self.logger.error('\n')
+            error_message = f'Unable to find the page source within {timeout} seconds.'
+            self.logger.error(f'{error_message}\n')
+            raise self.driver_exceptions.NoSuchElementException(error_message)
+        return {}
+
+    def get_page_references(self, value='div', skipped_tags=None, timeout=15, safe=False):
+        """
+        This builds the references of the page in the browser: the dom of the elements get_page_source would pick
+        is walked by a single script returning the text, attributes and tag of their descendants instead of the
+        inner html to parse.
 
-                sources = [elements[i][1] for i in [text.index(a) for a in all_encompassing]]
-                return ''.join(sources)
+        Args:
+            value (str): The css selector of the elements.
+            skipped_tags (None|list): The element tags to skip.
+            timeout (int): The max time to check for a page change.
+            safe (bool): Whether to raise errors on no new page source found.
+
+        Returns:
+            references (dict): The references of the page.
+        """
+        attribute = None
+        if value != 'body':
+            attribute = 'accessible' if self.platform_name == 'ios' else 'class'
+
+        if self.find_element_explicitly(value, 'css selector', safe=True, timeout=timeout):
+            page = self.execute_script(html_helpers.ELEMENTS_SCRIPT, value, attribute)
+            elements = html_helpers.script_elements(page)
+            if elements is not None:
+                return html_helpers.build_element_references(elements, skipped_tags)
 
         if not safe:
             self.logger.error('\n')
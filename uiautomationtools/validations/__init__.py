@@ -1 +1,2 @@
 from uiautomationtools.validations.validations import Validations
+from uiautomationtools.validations.reference_store import ReferenceStore, get_reference_store
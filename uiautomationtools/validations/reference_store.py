@@ -0,0 +1,280 @@
+import os
+import json
+import zlib
+import hashlib
+import sqlite3
+import threading
+from collections import OrderedDict
+
+import uiautomationtools.helpers.directory_helpers as dir_helpers
+from uiautomationtools.models.steps_cache import tool_version
+
+STORE_NAME = 'references.db'
+
+
+class ReferenceStore(object):
+    """
+    This stores the references of an app and platform in a single sqlite file: one compressed row per page looked up
+    by its name. Each page is decompressed when read and the most recently read pages are kept in memory until another
+    process (e.g. a pytest-xdist worker) writes to the store - as json, so every read returns its own copy. The writes are atomic transactions. A page can keep the
+    merkle tree of its references, trusted while the digest of its row and the tool version match.
+    """
+
+    def __init__(self, path, cache_size=32, timeout=30):
+        """
+        The constructor for ReferenceStore.
+
+        Args:
+            path (str): The path of the sqlite file.
+            cache_size (int): The number of pages kept in memory.
+            timeout (int|float): The max time to wait for the writes of the other processes.
+        """
+        self.path = path
+        self.cache_size = cache_size
+        self.timeout = timeout
+        self.cache = OrderedDict()
+        self.data_version = None
+        self.lock = threading.RLock()
+        self._connection = None
+        self._pid = None
+
+    @property
+    def connection(self):
+        """
+        This opens the connection of the process (in write ahead logging mode) and creates the table if needed.
+
+        Returns:
+            connection (sqlite3.Connection): The connection to the store.
+        """
+        if self._connection is None or self._pid != os.getpid():
+            dir_helpers.safe_mkdirs(os.path.dirname(self.path))
+            connection = sqlite3.connect(self.path, timeout=self.timeout, check_same_thread=False)
+            connection.execute('PRAGMA journal_mode=WAL')
+            connection.execute('PRAGMA synchronous=NORMAL')
+            with connection:
+                connection.execute('CREATE TABLE IF NOT EXISTS refs '
+                                   '(name TEXT PRIMARY KEY, path TEXT NOT NULL, data BLOB NOT NULL, merkle TEXT)')
+                columns = [row[1] for row in connection.execute('PRAGMA table_info(refs)')]
+                if 'merkle' not in columns:
+                    connection.execute('ALTER TABLE refs ADD COLUMN merkle TEXT')
+            self._connection, self._pid = connection, os.getpid()
+            self.cache.clear()
+            self.data_version = None
+        return self._connection
+
+    def _refresh_cache(self):
+        """
+        This empties the cached pages when another connection wrote to the store since the last read.
+        """
+        data_version = self.connection.execute('PRAGMA data_version').fetchone()[0]
+        if data_version != self.data_version:
+            self.cache.clear()
+            self.data_version = data_version
+
+    def _cache(self, name, text):
+        """
+        This keeps a page in memory, evicting the least recently used.
+
+        Args:
+            name (str): The name of the page.
+            text (str): The json of the references of the page.
+        """
+        self.cache[name] = text
+        self.cache.move_to_end(name)
+        while len(self.cache) > self.cache_size:
+            self.cache.popitem(last=False)
+
+    def get(self, name):
+        """
+        This reads the references of a page.
+
+        Args:
+            name (str): The name of the page e.g. login or login.json.
+
+        Returns:
+            references (dict): The references of the page (a copy the caller may change) or an empty dict when not
+                               stored.
+        """
+        name = reference_name(name)
+        with self.lock:
+            self._refresh_cache()
+            text = self.cache.get(name)
+            if text is not None:
+                self.cache.move_to_end(name)
+            else:
+                row = self.connection.execute('SELECT data FROM refs WHERE name = ?', (name,)).fetchone()
+                if not row:
+                    return {}
+                text = zlib.decompress(row[0]).decode('utf-8')
+                self._cache(name, text)
+        return json.loads(text)
+
+    def tree(self, name):
+        """
+        This reads the merkle tree stored with the references of a page.
+
+        Args:
+            name (str): The name of the page e.g. login or login.json.
+
+        Returns:
+            tree (None|dict): The tree, None when not stored or stored for other references or another version.
+        """
+        name = reference_name(name)
+        with self.lock:
+            row = self.connection.execute('SELECT data, merkle FROM refs WHERE name = ?', (name,)).fetchone()
+        if not row or not row[1]:
+            return None
+        merkle = json.loads(row[1])
+        if merkle.get('version') != tool_version() or merkle.get('digest') != hashlib.sha1(row[0]).hexdigest():
+            return None
+        return merkle['tree']
+
+    def put(self, name, references, path=None, tree=None):
+        """
+        This writes the references of a page - replacing the stored ones.
+
+        Args:
+            name (str): The name of the page e.g. login or login.json.
+            references (dict): The references of the page.
+            path (None|str): The path of its json file relative to the exported directory - defaults to name.json.
+            tree (None|dict): The merkle tree of the references (dictionary_helpers.merkle_tree).
+        """
+        self.put_many([(name, references, path)], {reference_name(name): tree} if tree else None)
+
+    def put_many(self, pages, trees=None):
+        """
+        This writes the references of many pages in a single transaction.
+
+        Args:
+            pages (iterable<tuple>): The (name, references, path) of every page.
+            trees (None|dict): The merkle trees of the references by page name.
+        """
+        trees = trees or {}
+        rows = []
+        for name, references, path in pages:
+            name = reference_name(name)
+            text = json.dumps(references, ensure_ascii=False)
+            data = zlib.compress(text.encode('utf-8'))
+            merkle = None
+            if trees.get(name):
+                merkle = json.dumps({'version': tool_version(), 'digest': hashlib.sha1(data).hexdigest(),
+                                     'tree': trees[name]})
+            rows.append((name, path or f'{name}.json', data, merkle, text))
+
+        with self.lock:
+            self._refresh_cache()
+            with self.connection:
+                self.connection.executemany('INSERT OR REPLACE INTO refs (name, path, data, merkle) '
+                                            'VALUES (?, ?, ?, ?)', [row[:4] for row in rows])
+            for name, _, _, _, text in rows:
+                self._cache(name, text)
+
+    def delete(self, name):
+        """
+        This deletes the references of a page.
+
+        Args:
+            name (str): The name of the page e.g. login or login.json.
+        """
+        name = reference_name(name)
+        with self.lock:
+            with self.connection:
+                self.connection.execute('DELETE FROM refs WHERE name = ?', (name,))
+            self.cache.pop(name, None)
+
+    def names(self):
+        """
+        This lists the pages stored.
+
+        Returns:
+            names (list): The names of the pages.
+        """
+        with self.lock:
+            return [row[0] for row in self.connection.execute('SELECT name FROM refs ORDER BY name')]
+
+    def import_json(self, directory):
+        """
+        This imports the json references of a directory (e.g. validations/app/platform) - a page per json file
+        named after the file. The json files are left in place.
+
+        Args:
+            directory (str): The directory of the json references.
+
+        Returns:
+            names (list): The names of the pages imported.
+        """
+        pages = []
+        for parent, _, files in sorted(os.walk(directory)):
+            for file_name in sorted(files):
+                if file_name.endswith('.json'):
+                    file_path = os.path.join(parent, file_name)
+                    path = os.path.relpath(file_path, directory).replace(os.sep, '/')
+                    pages.append((file_name, dir_helpers.load_json(file_path), path))
+        self.put_many(pages)
+        return [reference_name(name) for name, _, _ in pages]
+
+    def export_json(self, directory):
+        """
+        This exports the stored pages to json files in the layout they were imported from.
+
+        Args:
+            directory (str): The directory to write the json references to.
+
+        Returns:
+            paths (list): The paths of the json files written.
+        """
+        with self.lock:
+            rows = self.connection.execute('SELECT path, data FROM refs ORDER BY name').fetchall()
+        paths = []
+        for path, data in rows:
+            file_path = os.path.join(directory, path)
+            dir_helpers.make_json(json.loads(zlib.decompress(data).decode('utf-8')), file_path, atomic=True)
+            paths.append(file_path)
+        return paths
+
+    def close(self):
+        """
+        This closes the connection of the process.
+        """
+        with self.lock:
+            if self._connection is not None and self._pid == os.getpid():
+                self._connection.close()
+            self._connection = None
+            self.cache.clear()
+
+
+def reference_name(name):
+    """
+    This converts a reference (file) name into the name of a stored page.
+
+    Args:
+        name (str): The reference name e.g. login.json or feature/login.json.
+
+    Returns:
+        name (str): The name of the page e.g. login.
+    """
+    return name.split('/')[-1].split('.')[0]
+
+
+_stores = {}
+
+
+def get_reference_store(app_dir, platform_name, root=None):
+    """
+    This opens the reference store of an app and platform (validations/<app>/<platform>/references.db) once per
+    process.
+
+    Args:
+        app_dir (str): The app under test folder's name.
+        platform_name (str): The platform of the driver.
+        root (None|str): The root dir of the project - defaults to dir_helpers.get_root_dir().
+
+    Returns:
+        store (ReferenceStore): The reference store.
+    """
+    root = root or dir_helpers.get_root_dir()
+    path = os.path.join(root, 'validations', app_dir, platform_name, STORE_NAME)
+    store = _stores.get(path)
+    if store is None:
+        store = _stores[path] = ReferenceStore(path)
+    return store
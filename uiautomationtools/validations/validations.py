@@ -1,11 +1,17 @@
 import os
-import re
-from glob import iglob
+import json
+import hashlib
 from datetime import datetime
-from bs4 import BeautifulSoup
 
 import uiautomationtools.helpers.dictionary_helpers as dict_helpers
+import uiautomationtools.helpers.html_helpers as html_helpers
 import uiautomationtools.helpers.directory_helpers as dir_helpers
+from uiautomationtools.models.project_index import get_index
+from uiautomationtools.models.steps_cache import tool_version
+from uiautomationtools.validations.reference_store import get_reference_store
+
+MERKLE_SUFFIX = '.merkle'
+UNTRACKED_KEYS = ['write_time']
 
 
 class Validations(object):
@@ -13,13 +19,15 @@ class Validations(object):
     This class holds all the ways we gather and use information for validations.
     """
 
-    def __init__(self, driver, debug=False):
+    def __init__(self, driver, debug=False, reference_store=False):
         """
         The constructor for Validations.
 
         Args:
             driver (webdriver): A selenium/appium webdriver.
             debug (bool): Whether to run in debug mode.
+            reference_store (bool): Whether to write and read the references in the store of the app and platform
+                                    (validations/<app>/<platform>/references.db) instead of json files.
         """
         self.driver = driver
         self.debug = debug
@@ -30,17 +38,67 @@ class Validations(object):
         self.references_file_paths = None
         self.update_reference_paths()
         self.skipped_keys = ['write_time', 'reference_name', 'bounds']
+        self.in_browser = False
+        self.reference_store = None
+        if reference_store:
+            self.reference_store = get_reference_store(self.app_dir, self.driver.platform_name)
 
     def update_reference_paths(self):
         app_dir = dir_helpers.get_src_app_dir()
         self.references_directory = f'{dir_helpers.get_root_dir()}/validations/' \
                                     f'{app_dir}/{self.driver.platform_name}'
-        self.references_file_paths = [ref for ref in iglob(f'{self.references_directory}//**', recursive=True)
-                                      if '.json' in ref]
+        self.app_dir = app_dir
+        self.index = get_index()
+        references = self.index.files('references', f'{app_dir}/{self.driver.platform_name}')
+        self.references_file_paths = [ref for refs in references.values() for ref in refs]
+
+    def _write_tree(self, file_path, references, raw=None):
+        """
+        This writes the merkle tree of the references of a json file next to it (<file>.json.merkle) with the
+        digest of the file, so validating against it does not hash the baseline again.
+
+        Args:
+            file_path (str): The path of the json references.
+            references (dict): The references of the file.
+            raw (None|bytes): The content of the file - read when None.
+
+        Returns:
+            tree (dict): The merkle tree of the references.
+        """
+        if raw is None:
+            with open(file_path, 'rb') as fp:
+                raw = fp.read()
+        tree = self.dict_helpers.merkle_tree(references, untracked=UNTRACKED_KEYS)
+        dir_helpers.make_json({'version': tool_version(), 'digest': hashlib.sha1(raw).hexdigest(), 'tree': tree},
+                              f'{file_path}{MERKLE_SUFFIX}', atomic=True)
+        return tree
+
+    def _load_references(self, file_path):
+        """
+        This reads stored json references and the merkle tree written next to them. A tree written for another
+        content (e.g. a baseline edited by hand) or another version is written again.
+
+        Args:
+            file_path (None|str): The path of the json references.
+
+        Returns:
+            references (dict): The references, empty when not found.
+            tree (None|dict): The merkle tree of the references.
+        """
+        if not file_path or not os.path.exists(file_path):
+            return {}, None
+        with open(file_path, 'rb') as fp:
+            raw = fp.read()
+        references = json.loads(raw)
+        merkle = dir_helpers.load_json(f'{file_path}{MERKLE_SUFFIX}')
+        if merkle.get('version') == tool_version() and merkle.get('digest') == hashlib.sha1(raw).hexdigest():
+            return references, merkle['tree']
+        return references, self._write_tree(file_path, references, raw)
 
     def _write_json(self, references, file_path=None):
         """
-        This will write the scraped references to a json file named 'reference_name' at the store path.
+        This will write the scraped references to a json file named 'reference_name' at the store path or to the
+        reference store under its name, with their merkle tree.
 
         Args:
             references (dict): The scraped elements from a page.
@@ -49,14 +107,24 @@ class Validations(object):
         if not file_path:
             return
 
+        if self.reference_store:
+            path = os.path.relpath(file_path, self.references_directory).replace(os.sep, '/')
+            path = os.path.basename(file_path) if path.startswith('..') else path
+            tree = self.dict_helpers.merkle_tree(references, untracked=UNTRACKED_KEYS)
+            self.reference_store.put(os.path.basename(file_path), references, path=path, tree=tree)
+            return
+
         directory = os.path.dirname(file_path)
         dir_helpers.safe_mkdirs(directory)
         dir_helpers.make_json(references, file_path)
+        self._write_tree(file_path, references)
         self.references_file_paths.append(file_path)
+        self.index.add_file(file_path)
 
     def _build_references(self, html, skipped_tags=None):
         """
-        This is the worker for building references.
+        This is the worker for building references. The html is parsed like BeautifulSoup(html, 'html.parser') in
+        a single pass.
 
         Args:
             html (str): HTML of a page.
@@ -65,39 +133,7 @@ class Validations(object):
         Returns:
             references (dict): The references of the page.
         """
-        skipped_tags = skipped_tags or []
-
-        references = {}
-        for d in BeautifulSoup(html, 'html.parser').descendants:
-            if 'Tag' not in str(type(d)):
-                continue
-
-            attrs = {k: v for k, v in d.attrs.items() if v}
-            attr_class = attrs.get('class')
-            if attr_class:
-                attrs['class'] = ' '.join(attr_class)
-
-            text = getattr(d, 'text', '')
-            text = re.sub(r'\n+', '', text)
-            if text:
-                attrs['text'] = text
-
-            if d.name:
-                attrs['tag'] = d.name
-
-            context = attrs.get('id') or attrs.get('name') or attrs.get('placeholder') or attrs.get('text') or 'no_key'
-            context = re.sub(r'(\W|_)+', '_', context.lower())
-
-            global_tags = f"{attrs.get('tag')},{attrs.get('class')},{context}"
-            if skipped_tags and any(t in global_tags for t in skipped_tags):
-                continue
-
-            if not references.get(context):
-                references[context] = [attrs]
-            elif attrs not in references[context]:
-                references[context].append(attrs)
-
-        return references
+        return html_helpers.build_references(html, skipped_tags)
 
     def build_references_appium(self, file_path=None, skipped_tags=None):
         """
@@ -117,7 +153,8 @@ class Validations(object):
         references = self._build_references(html, skipped_tags=skipped_tags)
         references['write_time'] = datetime.strftime(datetime.now(), '%Y-%m-%d_%H:%M:%S')
         self._write_json(references, file_path)
-        self.update_reference_paths()
+        if not self.reference_store:
+            self.update_reference_paths()
         self.logger.info(f'Built appium references for {file_path}.\n')
         return references
 
@@ -134,6 +171,8 @@ class Validations(object):
             kwargs:
                 iframe (bool): Whether the references being built live in an iframe.
                 body (bool): Whether the references being built live in the body.
+                in_browser (bool): Whether to build the references in the browser instead of from the page source
+                                   (defaults to self.in_browser).
 
         Returns:
             references (dict): The dictionary of the references.
@@ -141,6 +180,7 @@ class Validations(object):
         self.logger.info(f'\n')
         self.logger.info(f'Building selenium references for {file_path}.')
 
+        references = None
         if not html:
             value = 'div'
             if kwargs.get('iframe'):
@@ -149,16 +189,21 @@ class Validations(object):
                 self.driver.switch_to.frame(iframe_element)
             if kwargs.get('body'):
                 value = 'body'
-            html = self.driver.get_page_source(value=value, safe=True)
+            if kwargs.get('in_browser', self.in_browser):
+                references = self.driver.get_page_references(value=value, skipped_tags=skipped_tags, safe=True)
+            else:
+                html = self.driver.get_page_source(value=value, safe=True)
             if kwargs.get('iframe'):
                 self.driver.switch_to.default_content()
-        if not html:
+        if not html and not references:
             return {}
 
-        references = self._build_references(html, skipped_tags=skipped_tags)
+        if references is None:
+            references = self._build_references(html, skipped_tags=skipped_tags)
         references['write_time'] = datetime.strftime(datetime.now(), '%Y-%m-%d_%H:%M:%S')
         self._write_json(references, file_path)
-        self.update_reference_paths()
+        if not self.reference_store:
+            self.update_reference_paths()
         self.logger.info(f'Built selenium references for {file_path}.\n')
         return references
 
@@ -178,6 +223,7 @@ class Validations(object):
             kwargs:
                 iframe (bool): Whether the references being build live in an iframe.
                 body (bool): Whether the references being built live in the body.
+                in_browser (bool): Whether to build the current references in the browser.
 
         Returns:
             mismatches (dict): A record of any mismatching keys and or values.
@@ -187,19 +233,25 @@ class Validations(object):
         skipped_keys = skipped_keys or []
         skipped_keys.extend(self.skipped_keys)
 
+        stored_tree = None
         if not stored_references:
             if reference_name:
                 reference_name = f"{reference_name.split('.')[0]}.json"
-            reference_path = dir_helpers.find_reference_in_list(reference_name, self.references_file_paths)
-            stored_references = dir_helpers.load_json(reference_path)
+            if self.reference_store and reference_name:
+                stored_references = self.reference_store.get(reference_name)
+                stored_tree = stored_references and self.reference_store.tree(reference_name)
+            if not stored_references:
+                reference_path = self.index.reference(reference_name, self.app_dir, self.driver.platform_name)
+                stored_references, stored_tree = self._load_references(reference_path)
 
         if 'native' in self.driver.context.lower():
             current_references = self.build_references_appium(skipped_tags=skipped_tags)
         else:
             current_references = self.build_references_selenium(skipped_tags=skipped_tags, html=html, **kwargs)
 
-        mismatches = self.dict_helpers.async_compare_dictionaries(stored_references, current_references,
-                                                                  skipped_keys, normalize)
+        mismatches = self.dict_helpers.merkle_compare_dictionaries(stored_references, current_references,
+                                                                   skipped_keys, normalize, untracked=UNTRACKED_KEYS,
+                                                                   tree1=stored_tree)
         if (mismatches.get('keys') or mismatches.get('values')) and not safe:
             error_message = f'Validated references with mismatches {mismatches}.'
             self.fail(error_message)